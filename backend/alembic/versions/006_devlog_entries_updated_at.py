@@ -0,0 +1,42 @@
+"""devlog_entries に updated_at を追加
+
+公開ポートフォリオのETag/Last-Modified算出に使う。
+開発ログの編集を検知できるよう、プロジェクトと同様に更新日時を持たせる。
+既存行は created_at で埋める。
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "devlog_entries",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.execute("UPDATE devlog_entries SET updated_at = created_at WHERE created_at IS NOT NULL")
+    op.create_index(
+        "idx_devlog_entries_project_updated_at",
+        "devlog_entries",
+        ["project_id", "updated_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_devlog_entries_project_updated_at", table_name="devlog_entries")
+    op.drop_column("devlog_entries", "updated_at")
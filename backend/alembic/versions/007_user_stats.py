@@ -0,0 +1,55 @@
+"""user_stats テーブル追加
+
+ダッシュボードの件数（プロジェクト・開発ログ・ノートブック・有効なMCPトークン）を
+書き込み時に差分更新で保持する。既存ユーザー分は集計して埋める。
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column(
+            "user_id",
+            sa.String(36),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("project_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("devlog_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("notebook_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("active_mcp_token_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.execute("""
+        INSERT INTO user_stats
+            (user_id, project_count, devlog_count, notebook_count, active_mcp_token_count)
+        SELECT
+            u.id,
+            (SELECT count(*) FROM projects p WHERE p.user_id = u.id),
+            (SELECT count(*) FROM devlog_entries d WHERE d.user_id = u.id),
+            (SELECT count(*) FROM devlog_entries d
+              WHERE d.user_id = u.id
+                AND d.metadata IS NOT NULL
+                AND (d.metadata::jsonb ->> 'notebook_id') IS NOT NULL),
+            (SELECT count(*) FROM mcp_tokens t
+              WHERE t.user_id = u.id AND t.revoked_at IS NULL)
+        FROM users u
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats")
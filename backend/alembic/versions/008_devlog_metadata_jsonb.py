@@ -0,0 +1,77 @@
+"""devlog_entries.metadata を JSONB 化し、notebook_id / source_url を生成列に昇格
+
+ノートブック件数の集計（user_stats）は metadata ->> 'notebook_id' で絞り込むため、
+JSON型のままでは毎回全行をパースしていた。
+- metadata を JSONB に変換し、包含検索用に GIN（jsonb_path_ops）インデックスを張る
+- よく参照するキーは STORED 生成列にし、値を持つ行だけの部分インデックスを張る
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "devlog_entries",
+        "metadata",
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        postgresql_using="metadata::jsonb",
+    )
+    op.add_column(
+        "devlog_entries",
+        sa.Column(
+            "notebook_id", sa.Text(), sa.Computed("metadata ->> 'notebook_id'", persisted=True)
+        ),
+    )
+    op.add_column(
+        "devlog_entries",
+        sa.Column(
+            "source_url", sa.Text(), sa.Computed("metadata ->> 'source_url'", persisted=True)
+        ),
+    )
+    op.create_index(
+        "idx_devlog_entries_metadata_gin",
+        "devlog_entries",
+        ["metadata"],
+        postgresql_using="gin",
+        postgresql_ops={"metadata": "jsonb_path_ops"},
+    )
+    op.create_index(
+        "idx_devlog_entries_user_notebook",
+        "devlog_entries",
+        ["user_id"],
+        postgresql_where=sa.text("notebook_id IS NOT NULL"),
+    )
+    op.create_index(
+        "idx_devlog_entries_source_url",
+        "devlog_entries",
+        ["user_id", "source_url"],
+        postgresql_where=sa.text("source_url IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_devlog_entries_source_url", table_name="devlog_entries")
+    op.drop_index("idx_devlog_entries_user_notebook", table_name="devlog_entries")
+    op.drop_index("idx_devlog_entries_metadata_gin", table_name="devlog_entries")
+    op.drop_column("devlog_entries", "source_url")
+    op.drop_column("devlog_entries", "notebook_id")
+    op.alter_column(
+        "devlog_entries",
+        "metadata",
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        postgresql_using="metadata::json",
+    )
@@ -0,0 +1,51 @@
+"""projects / devlog_entries の technologies を JSONB 化し GIN インデックスを追加
+
+技術タグでの絞り込みは「いずれかを含む」をタグごとの @> のORで表す。
+jsonb_path_ops は @> 専用でサイズが小さいため、こちらを使う。
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+_TABLES = ("projects", "devlog_entries")
+
+
+def upgrade() -> None:
+    for table in _TABLES:
+        op.alter_column(
+            table,
+            "technologies",
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            postgresql_using="technologies::jsonb",
+        )
+        op.create_index(
+            f"idx_{table}_technologies_gin",
+            table,
+            ["technologies"],
+            postgresql_using="gin",
+            postgresql_ops={"technologies": "jsonb_path_ops"},
+        )
+
+
+def downgrade() -> None:
+    for table in _TABLES:
+        op.drop_index(f"idx_{table}_technologies_gin", table_name=table)
+        op.alter_column(
+            table,
+            "technologies",
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            postgresql_using="technologies::json",
+        )
@@ -0,0 +1,59 @@
+"""user_technology_stats テーブル追加
+
+ダッシュボード・公開ポートフォリオの「トップスキル」用に、
+ユーザー別・技術タグ別の開発ログ件数を書き込み時に差分更新で保持する。
+既存データは devlog_entries.technologies を展開して埋める
+（文字列以外・空文字の要素は除外し、1エントリ内の重複は1件と数える）。
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_technology_stats",
+        sa.Column(
+            "user_id",
+            sa.String(36),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("technology", sa.String(100), primary_key=True),
+        sa.Column("entry_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("public_entry_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    op.execute("""
+        INSERT INTO user_technology_stats
+            (user_id, technology, entry_count, public_entry_count, last_used_at)
+        SELECT
+            d.user_id,
+            left(t.elem #>> '{}', 100),
+            count(DISTINCT d.id),
+            count(DISTINCT d.id) FILTER (WHERE p.is_public),
+            max(d.created_at)
+        FROM devlog_entries d
+        JOIN projects p ON p.id = d.project_id
+        CROSS JOIN LATERAL jsonb_array_elements(
+            CASE WHEN jsonb_typeof(d.technologies) = 'array'
+                 THEN d.technologies ELSE '[]'::jsonb END
+        ) AS t(elem)
+        WHERE jsonb_typeof(t.elem) = 'string' AND t.elem #>> '{}' <> ''
+        GROUP BY d.user_id, left(t.elem #>> '{}', 100)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("user_technology_stats")
@@ -0,0 +1,133 @@
+"""usage_logs を月単位のレンジパーティションに変換し、利用量の日次・月次集計テーブルを追加
+
+- usage_logs は created_at の月ごとに分割する（主キーは (id, created_at)）。
+  既存行がある月から2か月先までのパーティションと DEFAULT パーティションを作成し、
+  既存データを移し替える。以降の月はアプリ起動時と1日ごとに
+  app.application.usage_rollup.maintain_usage_log_partitions で事前に作成する。
+- 別々だった user_id / created_at のインデックスを (user_id, created_at) にまとめる。
+- usage_daily_rollups / usage_monthly_rollups を作成し、既存ログから集計して埋める。
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def _create_rollup_table(name: str, period: str) -> None:
+    op.create_table(
+        name,
+        sa.Column(
+            "user_id",
+            sa.String(36),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(period, sa.Date, primary_key=True),
+        sa.Column("action", sa.String(50), primary_key=True),
+        sa.Column("tokens_used", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("event_count", sa.Integer, nullable=False, server_default="0"),
+    )
+
+
+def upgrade() -> None:
+    op.drop_index("idx_usage_logs_user_id", table_name="usage_logs")
+    op.drop_index("idx_usage_logs_created_at", table_name="usage_logs")
+    op.rename_table("usage_logs", "usage_logs_legacy")
+    op.execute(
+        "ALTER TABLE usage_logs_legacy RENAME CONSTRAINT usage_logs_pkey TO usage_logs_legacy_pkey"
+    )
+
+    op.execute("""
+        CREATE TABLE usage_logs (
+            id VARCHAR(36) NOT NULL,
+            user_id VARCHAR(36) NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            action VARCHAR(50) NOT NULL,
+            tokens_used INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("CREATE TABLE usage_logs_default PARTITION OF usage_logs DEFAULT")
+    op.execute("""
+        DO $$
+        DECLARE
+            -- 月の区切りはUTC（セッションのタイムゾーンに依存させない）
+            month timestamp := date_trunc(
+                'month',
+                coalesce((SELECT min(created_at) FROM usage_logs_legacy), now()) AT TIME ZONE 'UTC'
+            );
+            last_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC')
+                + interval '2 months';
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE usage_logs_%s PARTITION OF usage_logs FOR VALUES FROM (%L) TO (%L)',
+                    to_char(month, 'YYYY_MM'),
+                    to_char(month, 'YYYY-MM-DD') || ' 00:00:00+00',
+                    to_char(month + interval '1 month', 'YYYY-MM-DD') || ' 00:00:00+00'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+    op.create_index("idx_usage_logs_user_created_at", "usage_logs", ["user_id", "created_at"])
+
+    op.execute("""
+        INSERT INTO usage_logs (id, user_id, action, tokens_used, created_at)
+        SELECT id, user_id, action, tokens_used, coalesce(created_at, now())
+        FROM usage_logs_legacy
+    """)
+    op.drop_table("usage_logs_legacy")
+
+    _create_rollup_table("usage_daily_rollups", "day")
+    _create_rollup_table("usage_monthly_rollups", "month")
+    op.execute("""
+        INSERT INTO usage_daily_rollups (user_id, day, action, tokens_used, event_count)
+        SELECT user_id, (created_at AT TIME ZONE 'UTC')::date, action, sum(tokens_used), count(*)
+        FROM usage_logs
+        GROUP BY 1, 2, 3
+    """)
+    op.execute("""
+        INSERT INTO usage_monthly_rollups (user_id, month, action, tokens_used, event_count)
+        SELECT user_id, date_trunc('month', day)::date, action, sum(tokens_used), sum(event_count)
+        FROM usage_daily_rollups
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("usage_monthly_rollups")
+    op.drop_table("usage_daily_rollups")
+
+    op.rename_table("usage_logs", "usage_logs_partitioned")
+    op.execute(
+        "ALTER TABLE usage_logs_partitioned RENAME CONSTRAINT usage_logs_pkey "
+        "TO usage_logs_partitioned_pkey"
+    )
+    op.create_table(
+        "usage_logs",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column(
+            "user_id", sa.String(36), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("action", sa.String(50), nullable=False),
+        sa.Column("tokens_used", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.execute("""
+        INSERT INTO usage_logs (id, user_id, action, tokens_used, created_at)
+        SELECT id, user_id, action, tokens_used, created_at FROM usage_logs_partitioned
+    """)
+    # パーティションは親テーブルと一緒に削除される
+    op.drop_table("usage_logs_partitioned")
+    op.create_index("idx_usage_logs_user_id", "usage_logs", ["user_id"])
+    op.create_index("idx_usage_logs_created_at", "usage_logs", ["created_at"])
@@ -0,0 +1,76 @@
+"""stripe_webhook_events をWebhookの受信箱にする
+
+受信時は検証済みの生イベントを保存して即座に応答し、
+バックグラウンドワーカーが顧客ごとの順序・再試行付きで処理する。
+これまでモデルのみでマイグレーションが無かったため、テーブルが無ければ作成し、
+既存のテーブルには列を追加する（既存行は処理済みとして扱う）。
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision = "012"
+down_revision = "011"
+branch_labels = None
+depends_on = None
+
+_INBOX_COLUMNS = (
+    ("payload", postgresql.JSONB, {}),
+    ("customer_id", sa.String(255), {}),
+    ("stripe_created_at", sa.DateTime(timezone=True), {}),
+    ("status", sa.String(20), {"nullable": False, "server_default": "pending"}),
+    ("attempts", sa.Integer, {"nullable": False, "server_default": "0"}),
+    ("next_attempt_at", sa.DateTime(timezone=True), {"server_default": sa.func.now()}),
+    ("locked_until", sa.DateTime(timezone=True), {}),
+    ("last_error", sa.Text, {}),
+    ("received_at", sa.DateTime(timezone=True), {"server_default": sa.func.now()}),
+)
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("stripe_webhook_events"):
+        for name, type_, options in _INBOX_COLUMNS:
+            op.add_column("stripe_webhook_events", sa.Column(name, type_, **options))
+        # 既存行は同期処理の完了記録なので処理済みにする
+        op.execute("UPDATE stripe_webhook_events SET status = 'processed', attempts = 1")
+        op.alter_column("stripe_webhook_events", "processed_at", server_default=None)
+    else:
+        op.create_table(
+            "stripe_webhook_events",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("stripe_event_id", sa.String(255), nullable=False, unique=True),
+            sa.Column("event_type", sa.String(100), nullable=False),
+            *(sa.Column(name, type_, **options) for name, type_, options in _INBOX_COLUMNS),
+            sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index(
+            "idx_stripe_webhook_events_stripe_event_id",
+            "stripe_webhook_events",
+            ["stripe_event_id"],
+        )
+
+    op.create_index(
+        "idx_stripe_webhook_events_status_next_attempt",
+        "stripe_webhook_events",
+        ["status", "next_attempt_at"],
+    )
+    op.create_index(
+        "idx_stripe_webhook_events_customer_created",
+        "stripe_webhook_events",
+        ["customer_id", "stripe_created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_stripe_webhook_events_customer_created", "stripe_webhook_events")
+    op.drop_index("idx_stripe_webhook_events_status_next_attempt", "stripe_webhook_events")
+    # 未処理のイベントは失われるため、ダウングレード前にワーカーで処理し切ること
+    op.execute("DELETE FROM stripe_webhook_events WHERE status <> 'processed'")
+    for name, _, _ in reversed(_INBOX_COLUMNS):
+        op.drop_column("stripe_webhook_events", name)
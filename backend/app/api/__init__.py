@@ -1,6 +1,11 @@
 """API Layer - RESTful APIエンドポイント（MEX App）"""
 
-from fastapi import APIRouter
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException, status
+
+from app.config import get_settings
+from app.performance.metrics import collect_metrics
 
 from .auth import router as auth_router
 from .billing import router as billing_router
@@ -25,3 +30,16 @@ router.include_router(billing_router)
 async def health_check():
     """ヘルスチェックエンドポイント"""
     return {"status": "healthy"}
+
+
+@router.get("/metrics")
+async def metrics(authorization: str | None = Header(None)):
+    """内部メトリクス（利用量ライターのカウンタ等）"""
+    settings = get_settings()
+    token = settings.metrics_token
+    # 本番でトークン未設定なら公開しない（存在自体を隠す）
+    if not token and settings.app_env == "production":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if token and not secrets.compare_digest(authorization or "", f"Bearer {token}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+    return collect_metrics()
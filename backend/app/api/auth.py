@@ -7,24 +7,39 @@ import hashlib
 import logging
 import re
 from datetime import timedelta
+from typing import TYPE_CHECKING
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
+from app.application.cache_events import emit_portfolio_changed
+from app.application.user_stats import apply_stats_delta
 from app.auth.dependencies import CurrentUser, get_current_user_dependency
 from app.auth.jwt import JWTService
 from app.infrastructure.database.models import MCPToken, User, utc_now
 from app.infrastructure.database.session import get_db
 from app.rate_limit import limiter
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
 router = APIRouter(prefix="/auth", tags=["Auth"])
 logger = logging.getLogger(__name__)
 
-# パスワードハッシュ
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# パスワードハッシュ（passlibは登録・ログインの初回まで読み込まない）
+_pwd_context: "CryptContext | None" = None
+
+
+def get_pwd_context() -> "CryptContext":
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
 
 # JWTサービス
 _jwt_service = JWTService()
@@ -117,7 +132,7 @@ async def register(request: Request, body: RegisterRequest, db: Session = Depend
         user = User(
             email=normalized_email,
             display_name=body.display_name,
-            hashed_password=pwd_context.hash(body.password),
+            hashed_password=get_pwd_context().hash(body.password),
             auth_provider="email",
             plan="free",
         )
@@ -163,7 +178,7 @@ async def login(request: Request, body: LoginRequest, db: Session = Depends(get_
                 detail="メールアドレスまたはパスワードが正しくありません",
             )
 
-        if not pwd_context.verify(body.password, user.hashed_password):
+        if not get_pwd_context().verify(body.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="メールアドレスまたはパスワードが正しくありません",
@@ -275,6 +290,7 @@ async def create_api_token(
             name=request.name if request else None,
         )
         db.add(mcp_token)
+        apply_stats_delta(db, current_user.user_id, mcp_tokens=1)
         db.commit()
         db.refresh(mcp_token)
         token_id = mcp_token.id
@@ -343,6 +359,7 @@ async def revoke_mcp_token(
         )
 
     token_record.revoked_at = utc_now()
+    apply_stats_delta(db, current_user.user_id, mcp_tokens=-1)
     db.commit()
 
     return {"message": "トークンを無効化しました", "token_id": request.token_id}
@@ -400,5 +417,6 @@ async def update_profile(
 
     db.commit()
     db.refresh(user)
+    emit_portfolio_changed(user.id, reason="profile_updated")
 
     return _user_response(user)
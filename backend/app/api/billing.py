@@ -5,16 +5,16 @@ Stripe Checkout Session / Customer Portal / Webhook
 
 import logging
 
-import stripe
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.application.billing_service import BillingService
+from app.application.webhook_inbox import enqueue_event, get_webhook_worker
 from app.auth.dependencies import CurrentUser, get_current_user_dependency
 from app.config import get_settings
-from app.infrastructure.database.models import StripeWebhookEvent
 from app.infrastructure.database.session import get_db
+from app.infrastructure.stripe import StripeUnavailableError
 from app.rate_limit import limiter
 
 logger = logging.getLogger(__name__)
@@ -63,6 +63,8 @@ class PlanInfoResponse(BaseModel):
     plan: str
     project_limit: int | None
     project_count: int
+    monthly_token_limit: int | None
+    monthly_tokens_used: int
     llm_model: str
     subscription_status: str | None
     current_period_end: str | None
@@ -74,13 +76,13 @@ async def get_plan_info(
     db: Session = Depends(get_db),
 ):
     """現在のプラン情報と利用状況を返す"""
-    from app.auth.plan_guards import FREE_PROJECT_LIMIT
-    from app.infrastructure.database.models import Project, Subscription, User
+    from app.application.entitlements import resolve_entitlement
+    from app.application.usage_rollup import get_monthly_usage
+    from app.auth.plan_guards import FREE_MONTHLY_TOKEN_LIMIT
+    from app.infrastructure.database.models import Subscription
 
-    user = db.query(User).filter(User.id == current_user.user_id).first()
-    plan = user.plan if user else "free"
-
-    project_count = db.query(Project).filter(Project.user_id == current_user.user_id).count()
+    entitlement = resolve_entitlement(db, current_user.user_id)
+    plan = entitlement.plan
 
     sub = db.query(Subscription).filter(Subscription.user_id == current_user.user_id).first()
 
@@ -88,8 +90,10 @@ async def get_plan_info(
 
     return PlanInfoResponse(
         plan=plan,
-        project_limit=FREE_PROJECT_LIMIT if is_free else None,
-        project_count=project_count,
+        project_limit=entitlement.project_limit,
+        project_count=entitlement.project_count,
+        monthly_token_limit=FREE_MONTHLY_TOKEN_LIMIT if is_free else None,
+        monthly_tokens_used=get_monthly_usage(db, current_user.user_id).tokens_used,
         llm_model="gpt-4o-mini" if is_free else "gpt-4o",
         subscription_status=sub.status if sub else None,
         current_period_end=sub.current_period_end.isoformat()
@@ -114,6 +118,8 @@ async def create_checkout_session(
         return CheckoutResponse(checkout_url=url)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except StripeUnavailableError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -136,6 +142,8 @@ async def create_portal_session(
         return PortalResponse(portal_url=url)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except StripeUnavailableError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -146,45 +154,35 @@ async def create_portal_session(
 @router.post("/webhook")
 @limiter.limit("30/minute")
 async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
-    """Stripe Webhook処理（冪等性保証付き）"""
+    """
+    Stripe Webhook受信（冪等性保証付き）
+
+    署名を検証したイベントを受信箱に保存して即座に応答する。
+    処理はバックグラウンドワーカーが顧客ごとの順序で行う（app.application.webhook_inbox）。
+    """
+    import stripe
+
     settings = get_settings()
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature", "")
 
     try:
-        event = stripe.Webhook.construct_event(payload, sig_header, settings.stripe_webhook_secret)
+        stripe.Webhook.construct_event(payload, sig_header, settings.stripe_webhook_secret)
     except stripe.SignatureVerificationError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid signature")
 
-    # --- 冪等性チェック: 同一イベントの二重処理を防止 ---
-    stripe_event_id = event["id"]
-    existing = (
-        db.query(StripeWebhookEvent)
-        .filter(StripeWebhookEvent.stripe_event_id == stripe_event_id)
-        .first()
-    )
-    if existing:
-        logger.info("Stripe webhook event already processed: %s", stripe_event_id)
-        return {"status": "ok", "duplicate": True}
-
-    service = get_service()
-
-    if event["type"] == "checkout.session.completed":
-        await service.handle_checkout_completed(event["data"]["object"])
-    elif event["type"] in (
-        "customer.subscription.updated",
-        "customer.subscription.deleted",
-    ):
-        await service.handle_subscription_updated(event["data"]["object"])
-
-    # 処理完了後にイベントを記録
-    db.add(
-        StripeWebhookEvent(
-            stripe_event_id=stripe_event_id,
-            event_type=event["type"],
-        )
-    )
+    # stripe_event_id の一意制約で同一イベントの二重登録を防止
+    try:
+        inserted = enqueue_event(db, payload)
+    except (ValueError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid payload")
     db.commit()
 
-    logger.info("Stripe webhook processed: %s (%s)", stripe_event_id, event["type"])
-    return {"status": "ok"}
+    if not inserted:
+        logger.info("Stripe webhook event already received")
+        return {"status": "ok", "duplicate": True}
+
+    # ワーカー無効時（別プロセスで処理する構成）はシングルトンを作らない
+    if settings.stripe_webhook_worker_enabled:
+        get_webhook_worker().notify()
+    return {"status": "ok", "duplicate": False}
@@ -5,9 +5,14 @@ from pydantic import BaseModel
 
 from app.application.usage_service import DashboardData, DashboardService
 from app.auth.dependencies import CurrentUser, get_current_user_dependency
+from app.infrastructure.database.session import read_intent
+from app.performance.query_monitor import query_budget
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+# ダッシュボードのクエリ予算（初回表示時のuser_stats作成を含む）
+DASHBOARD_QUERY_BUDGET = 8
+
 _service: DashboardService | None = None
 
 
@@ -46,13 +51,21 @@ class DashboardProjectResponse(BaseModel):
     updated_at: str
 
 
+class DashboardSkillResponse(BaseModel):
+    name: str
+    entry_count: int
+    last_used_at: str | None
+
+
 class DashboardResponse(BaseModel):
     user: DashboardUserResponse
     stats: DashboardStatsResponse
     recent_projects: list[DashboardProjectResponse]
+    top_skills: list[DashboardSkillResponse]
 
 
-@router.get("", response_model=DashboardResponse)
+@router.get("", response_model=DashboardResponse, dependencies=[Depends(read_intent)])
+@query_budget(DASHBOARD_QUERY_BUDGET)
 async def get_dashboard(
     current_user: CurrentUser = Depends(get_current_user_dependency),
 ):
@@ -96,4 +109,12 @@ def _to_response(data: DashboardData) -> DashboardResponse:
             )
             for p in data.recent_projects
         ],
+        top_skills=[
+            DashboardSkillResponse(
+                name=s.name,
+                entry_count=s.entry_count,
+                last_used_at=s.last_used_at.isoformat() if s.last_used_at else None,
+            )
+            for s in data.top_skills
+        ],
     )
@@ -5,6 +5,7 @@ from pydantic import BaseModel, Field
 
 from app.application.devlog_service import DevLogCreate, DevLogService, DevLogSummary, DevLogUpdate
 from app.auth.dependencies import CurrentUser, get_current_user_dependency
+from app.infrastructure.database.session import read_intent
 
 router = APIRouter(prefix="/devlogs", tags=["DevLogs"])
 
@@ -69,15 +70,18 @@ class DevLogListResponse(BaseModel):
     total: int
 
 
-@router.get("/{project_id}", response_model=DevLogListResponse)
+@router.get("/{project_id}", response_model=DevLogListResponse, dependencies=[Depends(read_intent)])
 async def list_devlogs(
     project_id: str,
     limit: int | None = Query(None, ge=1, le=200, description="取得件数（1〜200）"),
+    technologies: list[str] | None = Query(None, description="いずれかを含む開発ログに絞り込む"),
     current_user: CurrentUser = Depends(get_current_user_dependency),
 ):
     try:
         service = get_service()
-        entries, total = service.list_entries(current_user.user_id, project_id, limit=limit)
+        entries, total = service.list_entries(
+            current_user.user_id, project_id, limit=limit, technologies=technologies
+        )
         return DevLogListResponse(
             entries=[
                 DevLogListEntry(
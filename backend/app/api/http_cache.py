@@ -0,0 +1,96 @@
+"""
+HTTP条件付きGET（ETag / Last-Modified / Cache-Control）
+
+公開ページのようにCDNで吸収させたいレスポンス向けのヘルパー。
+レスポンス本体を組み立てる前に安価なバージョントークンでETagを算出し、
+If-None-Match（必要に応じて If-Modified-Since）が一致すれば304を返す。
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+from app.config import get_settings
+
+
+def compute_etag(*parts: object) -> str:
+    """バージョントークンを構成する値から弱いETagを生成"""
+    digest = hashlib.sha256("|".join(_token_part(p) for p in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _token_part(value: object) -> str:
+    if isinstance(value, datetime):
+        return _as_utc(value).isoformat()
+    return "" if value is None else str(value)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLiteなどtimezoneを保持しないDBではnaiveで返るためUTCとみなす
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def latest(*values: datetime | None) -> datetime | None:
+    """Noneを除いた最新の日時"""
+    present = [_as_utc(v) for v in values if v is not None]
+    return max(present) if present else None
+
+
+def public_cache_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    """公開レスポンス用のキャッシュヘッダー"""
+    settings = get_settings()
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={settings.portfolio_cache_max_age}, "
+            f"stale-while-revalidate={settings.portfolio_cache_stale_while_revalidate}"
+        ),
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            _as_utc(last_modified).replace(microsecond=0), usegmt=True
+        )
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """
+    条件付きリクエストがキャッシュ済みの表現と一致するか判定する
+
+    RFC 9110に従い、If-None-Matchがあればそれのみで判定し、
+    無い場合に限りIf-Modified-Sinceを見る。
+    削除・非公開化で最終更新日時が進まない表現では last_modified を渡さず、
+    ETagのみで判定する（If-Modified-Sinceで古い内容に304を返さないため）。
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {_strip_weak(tag) for tag in if_none_match.split(",")}
+        return _strip_weak(etag) in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP日付は秒精度なので切り捨てて比較する
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    """304レスポンス（本文なし、キャッシュヘッダーのみ）"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -0,0 +1,30 @@
+"""
+キーセット（カーソル）ページネーション
+
+(created_at, id) の降順で並べた一覧の続きを、OFFSETを使わずに取得するための
+カーソルをエンコード・デコードする。カーソルはクライアントにとって不透明な文字列。
+"""
+
+import base64
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, entry_id: str) -> str:
+    """最後に返した行の (created_at, id) からカーソルを生成"""
+    raw = f"{created_at.isoformat()}|{entry_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    カーソルを (created_at, id) に戻す
+
+    Raises:
+        ValueError: カーソルの形式が不正な場合
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, entry_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), entry_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -1,17 +1,32 @@
 """公開ポートフォリオAPI"""
 
 import re
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
 from pydantic import BaseModel
+from sqlalchemy import and_, distinct, func, or_
+from sqlalchemy.orm import Query as ORMQuery
 from sqlalchemy.orm import Session
 
+from app.api.http_cache import (
+    compute_etag,
+    is_not_modified,
+    latest,
+    not_modified_response,
+    public_cache_headers,
+)
+from app.api.pagination import decode_cursor, encode_cursor
+from app.application.technology_stats import top_skills
+from app.application.user_stats import devlog_counts_by_project
 from app.infrastructure.database.models import (
     DevLogEntry,
     Project,
     User,
 )
-from app.infrastructure.database.session import get_db
+from app.infrastructure.database.session import get_db, read_intent
+from app.performance.query_monitor import query_budget
+from app.performance.response_cache import CachedResponse, get_response_cache
 
 router = APIRouter(prefix="/portfolio", tags=["Portfolio"])
 
@@ -36,9 +51,15 @@ class PublicProjectResponse(BaseModel):
     updated_at: str
 
 
+class PublicSkillResponse(BaseModel):
+    name: str
+    entry_count: int
+
+
 class PublicPortfolioResponse(BaseModel):
     user: PublicUserResponse
     projects: list[PublicProjectResponse]
+    top_skills: list[PublicSkillResponse] = []
 
 
 class PublicDevLogEntry(BaseModel):
@@ -51,7 +72,15 @@ class PublicDevLogEntry(BaseModel):
 class PublicProjectDetailResponse(BaseModel):
     project: PublicProjectResponse
     devlog: list[PublicDevLogEntry]
+    next_cursor: str | None = None
+
+
+# 公開ポートフォリオに表示する技術タグの件数
+PUBLIC_TOP_SKILLS_LIMIT = 10
 
+# ルートのクエリ予算（プロジェクト・開発ログの件数に依存しないこと）
+PORTFOLIO_QUERY_BUDGET = 5
+PROJECT_DETAIL_QUERY_BUDGET = 4
 
 _USERNAME_PATTERN = re.compile(r"^[a-z0-9][a-z0-9\-]{1,28}[a-z0-9]$")
 
@@ -66,8 +95,106 @@ def _validate_username(username: str) -> str:
     return username
 
 
-@router.get("/{username}", response_model=PublicPortfolioResponse)
+def _portfolio_version(db: Session, user: User) -> tuple[str, datetime | None]:
+    """
+    公開ポートフォリオのバージョントークン（ETag, Last-Modified）
+
+    公開プロジェクトと開発ログの件数・最終更新日時を1クエリで集約する。
+    件数を含めるのは、削除や非公開化では最終更新日時が変わらないため。
+    """
+    project_count, project_updated, devlog_count, devlog_updated = (
+        db.query(
+            func.count(distinct(Project.id)),
+            func.max(Project.updated_at),
+            func.count(DevLogEntry.id),
+            func.max(DevLogEntry.updated_at),
+        )
+        .select_from(Project)
+        .outerjoin(DevLogEntry, DevLogEntry.project_id == Project.id)
+        .filter(Project.user_id == user.id, Project.is_public.is_(True))
+        .one()
+    )
+    etag = compute_etag(
+        "portfolio",
+        user.id,
+        user.updated_at,
+        project_count,
+        project_updated,
+        devlog_count,
+        devlog_updated,
+    )
+    return etag, latest(user.updated_at, project_updated, devlog_updated)
+
+
+def _project_version(db: Session, project: Project) -> tuple[str, datetime | None, int]:
+    """公開プロジェクト詳細のバージョントークン（ETag, Last-Modified, 開発ログ件数）"""
+    devlog_count, devlog_updated = (
+        db.query(func.count(DevLogEntry.id), func.max(DevLogEntry.updated_at))
+        .filter(DevLogEntry.project_id == project.id)
+        .one()
+    )
+    etag = compute_etag("project", project.id, project.updated_at, devlog_count, devlog_updated)
+    return etag, latest(project.updated_at, devlog_updated), devlog_count
+
+
+def _json_response(cached: CachedResponse, headers: dict[str, str]) -> Response:
+    return Response(content=cached.body, media_type=cached.media_type, headers=headers)
+
+
+def _cache_and_respond(
+    key: str | None, etag: str, user_id: str, body: BaseModel, headers: dict[str, str]
+) -> Response:
+    """シリアライズ済みJSONをキャッシュに保存して返す（keyがNoneなら保存しない）"""
+    cached = CachedResponse(etag=etag, body=body.model_dump_json().encode())
+    if key is not None:
+        get_response_cache().set(key, cached, user_id)
+    return _json_response(cached, headers)
+
+
+# 公開ページで返す列のみ（detail・embeddingは取得しない）
+_PUBLIC_DEVLOG_COLUMNS = (
+    DevLogEntry.id,
+    DevLogEntry.entry_type,
+    DevLogEntry.summary,
+    DevLogEntry.technologies,
+    DevLogEntry.created_at,
+)
+
+
+def public_devlog_query(
+    db: Session,
+    project_id: str,
+    since: datetime | None = None,
+    after: tuple[datetime, str] | None = None,
+) -> ORMQuery:
+    """
+    公開プロジェクト詳細の開発ログ一覧クエリ
+
+    Args:
+        project_id: プロジェクトID
+        since: 指定時はこの日時以降に作成されたエントリのみ
+        after: カーソル位置 (created_at, id)。この行より後ろを返す
+    """
+    query = db.query(*_PUBLIC_DEVLOG_COLUMNS).filter(DevLogEntry.project_id == project_id)
+    if since is not None:
+        query = query.filter(DevLogEntry.created_at >= since)
+    if after is not None:
+        created_at, entry_id = after
+        query = query.filter(
+            or_(
+                DevLogEntry.created_at < created_at,
+                and_(DevLogEntry.created_at == created_at, DevLogEntry.id < entry_id),
+            )
+        )
+    return query.order_by(DevLogEntry.created_at.desc(), DevLogEntry.id.desc())
+
+
+@router.get(
+    "/{username}", response_model=PublicPortfolioResponse, dependencies=[Depends(read_intent)]
+)
+@query_budget(PORTFOLIO_QUERY_BUDGET)
 async def get_public_portfolio(
+    request: Request,
     username: str = Path(..., min_length=3, max_length=30),
     db: Session = Depends(get_db),
 ):
@@ -77,6 +204,17 @@ async def get_public_portfolio(
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
+    etag, last_modified = _portfolio_version(db, user)
+    cache_headers = public_cache_headers(etag, last_modified)
+    # 削除・非公開化ではLast-Modifiedが進まないのでIf-Modified-Sinceは見ない（ETagのみ）
+    if is_not_modified(request, etag):
+        return not_modified_response(cache_headers)
+
+    cache_key = f"portfolio:{username}"
+    cached = get_response_cache().get(cache_key, etag)
+    if cached is not None:
+        return _json_response(cached, cache_headers)
+
     projects = (
         db.query(Project)
         .filter(Project.user_id == user.id, Project.is_public.is_(True))
@@ -84,6 +222,8 @@ async def get_public_portfolio(
         .all()
     )
 
+    devlog_counts = devlog_counts_by_project(db, [p.id for p in projects])
+
     project_responses = [
         PublicProjectResponse(
             id=p.id,
@@ -94,30 +234,48 @@ async def get_public_portfolio(
             demo_url=p.demo_url,
             status=p.status,
             is_public=p.is_public,
-            devlog_count=db.query(DevLogEntry).filter(DevLogEntry.project_id == p.id).count(),
+            devlog_count=devlog_counts.get(p.id, 0),
             created_at=p.created_at.isoformat() if p.created_at else "",
             updated_at=p.updated_at.isoformat() if p.updated_at else "",
         )
         for p in projects
     ]
 
-    return PublicPortfolioResponse(
+    body = PublicPortfolioResponse(
         user=PublicUserResponse(
             display_name=user.display_name,
             bio=user.bio,
             github_url=user.github_url,
         ),
         projects=project_responses,
+        top_skills=[
+            PublicSkillResponse(name=s.name, entry_count=s.entry_count)
+            for s in top_skills(db, user.id, limit=PUBLIC_TOP_SKILLS_LIMIT, public_only=True)
+        ],
     )
+    return _cache_and_respond(cache_key, etag, user.id, body, cache_headers)
 
 
-@router.get("/{username}/{project_id}", response_model=PublicProjectDetailResponse)
+@router.get(
+    "/{username}/{project_id}",
+    response_model=PublicProjectDetailResponse,
+    dependencies=[Depends(read_intent)],
+)
+@query_budget(PROJECT_DETAIL_QUERY_BUDGET)
 async def get_public_project_detail(
+    request: Request,
     username: str = Path(..., min_length=3, max_length=30),
     project_id: str = Path(...),
+    limit: int | None = Query(None, ge=1, le=200, description="取得件数（1〜200）"),
+    cursor: str | None = Query(None, description="前ページのnext_cursor"),
+    since: datetime | None = Query(None, description="この日時以降に作成された開発ログのみ"),
     db: Session = Depends(get_db),
 ):
     _validate_username(username)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
 
     user = db.query(User).filter(User.username == username).first()
     if user is None:
@@ -135,14 +293,34 @@ async def get_public_project_detail(
     if project is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
 
-    devlog_entries = (
-        db.query(DevLogEntry)
-        .filter(DevLogEntry.project_id == project.id)
-        .order_by(DevLogEntry.created_at.desc())
-        .all()
-    )
+    etag, last_modified, devlog_count = _project_version(db, project)
+    cache_headers = public_cache_headers(etag, last_modified)
+    # 削除・非公開化ではLast-Modifiedが進まないのでIf-Modified-Sinceは見ない（ETagのみ）
+    if is_not_modified(request, etag):
+        return not_modified_response(cache_headers)
+
+    # キャッシュするのは先頭ページのみ（cursor・sinceは匿名で任意の値を作れるのでキーに含めない）
+    cache_key = f"project:{username}:{project.id}:{limit}" if not cursor and not since else None
+    if cache_key is not None:
+        cached = get_response_cache().get(cache_key, etag)
+        if cached is not None:
+            return _json_response(cached, cache_headers)
+
+    query = public_devlog_query(db, project.id, since=since, after=after)
+    if limit is not None:
+        # 1件余分に取得して次ページの有無を判定する
+        devlog_entries = query.limit(limit + 1).all()
+        has_more = len(devlog_entries) > limit
+        devlog_entries = devlog_entries[:limit]
+    else:
+        devlog_entries = query.all()
+        has_more = False
+
+    next_cursor = None
+    if has_more and devlog_entries[-1].created_at is not None:
+        next_cursor = encode_cursor(devlog_entries[-1].created_at, devlog_entries[-1].id)
 
-    return PublicProjectDetailResponse(
+    body = PublicProjectDetailResponse(
         project=PublicProjectResponse(
             id=project.id,
             title=project.title,
@@ -152,7 +330,7 @@ async def get_public_project_detail(
             demo_url=project.demo_url,
             status=project.status,
             is_public=project.is_public,
-            devlog_count=db.query(DevLogEntry).filter(DevLogEntry.project_id == project.id).count(),
+            devlog_count=devlog_count,
             created_at=project.created_at.isoformat() if project.created_at else "",
             updated_at=project.updated_at.isoformat() if project.updated_at else "",
         ),
@@ -165,4 +343,6 @@ async def get_public_project_detail(
             )
             for e in devlog_entries
         ],
+        next_cursor=next_cursor,
     )
+    return _cache_and_respond(cache_key, etag, user.id, body, cache_headers)
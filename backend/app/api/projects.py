@@ -1,8 +1,9 @@
 """プロジェクトAPI"""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 
+from app.application.entitlements import FREE_PROJECT_LIMIT, ProjectLimitExceededError
 from app.application.project_service import (
     ProjectCreate,
     ProjectService,
@@ -11,9 +12,13 @@ from app.application.project_service import (
 )
 from app.auth.dependencies import CurrentUser, get_current_user_dependency
 from app.auth.plan_guards import check_project_limit
+from app.performance.query_monitor import query_budget
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+# 一覧のクエリ予算（プロジェクト件数に依存しないこと）
+PROJECT_LIST_QUERY_BUDGET = 3
+
 _service: ProjectService | None = None
 
 
@@ -63,11 +68,15 @@ class ProjectListResponse(BaseModel):
 
 
 @router.get("", response_model=ProjectListResponse)
+@query_budget(PROJECT_LIST_QUERY_BUDGET)
 async def list_projects(
+    technologies: list[str] | None = Query(
+        None, description="いずれかを含むプロジェクトに絞り込む"
+    ),
     current_user: CurrentUser = Depends(get_current_user_dependency),
 ):
     service = get_service()
-    projects = service.list_projects(current_user.user_id)
+    projects = service.list_projects(current_user.user_id, technologies=technologies)
     return ProjectListResponse(projects=[_to_response(p) for p in projects])
 
 
@@ -76,20 +85,27 @@ async def create_project(
     request: ProjectCreateRequest,
     current_user: CurrentUser = Depends(check_project_limit),
 ):
-    service = get_service()
-    project = service.create_project(
-        current_user.user_id,
-        ProjectCreate(
-            title=request.title,
-            description=request.description,
-            technologies=request.technologies,
-            repository_url=request.repository_url,
-            demo_url=request.demo_url,
-            status=request.status,
-            is_public=request.is_public,
-        ),
-    )
-    return _to_response(project)
+    try:
+        service = get_service()
+        project = service.create_project(
+            current_user.user_id,
+            ProjectCreate(
+                title=request.title,
+                description=request.description,
+                technologies=request.technologies,
+                repository_url=request.repository_url,
+                demo_url=request.demo_url,
+                status=request.status,
+                is_public=request.is_public,
+            ),
+        )
+        return _to_response(project)
+    except ProjectLimitExceededError:
+        # check_project_limit の事前チェックをすり抜けた同時作成
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Freeプランではプロジェクトは{FREE_PROJECT_LIMIT}件までです。Proプランにアップグレードしてください。",
+        )
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
@@ -5,11 +5,11 @@ Stripe Checkout + Customer Portal パターン
 
 from typing import Any
 
-import stripe
-
+from app.application.entitlements import invalidate_entitlement
 from app.config import get_settings
 from app.infrastructure.database.models import Subscription, User
-from app.infrastructure.database.session import SessionLocal
+from app.infrastructure.database.session import open_session, release_request_connection
+from app.infrastructure.stripe import StripeGateway, get_stripe_gateway
 
 
 class BillingService:
@@ -21,10 +21,23 @@ class BillingService:
     Webhookでのステータス更新を提供。
     """
 
-    def __init__(self):
+    def __init__(self, gateway: StripeGateway | None = None):
+        """
+        Args:
+            gateway: Stripe呼び出しゲートウェイ（省略時は共有のシングルトン）
+        """
+        import stripe
+
         settings = get_settings()
         stripe.api_key = settings.stripe_secret_key
         self._pro_price_id = settings.stripe_pro_price_id
+        self._gateway = gateway
+
+    @property
+    def gateway(self) -> StripeGateway:
+        if self._gateway is None:
+            self._gateway = get_stripe_gateway()
+        return self._gateway
 
     async def create_checkout_session(
         self,
@@ -35,40 +48,47 @@ class BillingService:
         """
         Stripe Checkout Sessionを作成
 
+        DBからの読み出しはStripe呼び出しの前に終え、セッションを閉じてから通信する。
+
         Returns:
             Checkout SessionのURL
+
+        Raises:
+            StripeUnavailableError: Stripeに到達できない場合
         """
-        db = SessionLocal()
+        db = open_session()
         try:
             user = db.query(User).filter(User.id == user_id).first()
             if not user:
                 raise ValueError("User not found")
+            email = user.email
 
             # 既存のStripe Customerを取得または作成
             sub = db.query(Subscription).filter(Subscription.user_id == user_id).first()
+            customer_id = sub.stripe_customer_id if sub else None
+        finally:
+            db.close()
+        # Stripeの応答を待つ間、リクエストの共有接続をプールに返しておく
+        release_request_connection()
 
-            customer_id = None
-            if sub and sub.stripe_customer_id:
-                customer_id = sub.stripe_customer_id
+        session_params: dict[str, Any] = {
+            "mode": "subscription",
+            "line_items": [{"price": self._pro_price_id, "quantity": 1}],
+            "success_url": success_url,
+            "cancel_url": cancel_url,
+            "metadata": {"user_id": user_id},
+        }
 
-            session_params: dict[str, Any] = {
-                "mode": "subscription",
-                "line_items": [{"price": self._pro_price_id, "quantity": 1}],
-                "success_url": success_url,
-                "cancel_url": cancel_url,
-                "metadata": {"user_id": user_id},
-            }
+        if customer_id:
+            session_params["customer"] = customer_id
+        else:
+            session_params["customer_email"] = email
 
-            if customer_id:
-                session_params["customer"] = customer_id
-            else:
-                session_params["customer_email"] = user.email
+        import stripe
 
-            session = stripe.checkout.Session.create(**session_params)
+        session = await self.gateway.call(stripe.checkout.Session.create, **session_params)
 
-            return session.url or ""
-        finally:
-            db.close()
+        return session.url or ""
 
     async def create_portal_session(self, user_id: str, return_url: str) -> str:
         """
@@ -76,26 +96,35 @@ class BillingService:
 
         Returns:
             Portal SessionのURL
+
+        Raises:
+            StripeUnavailableError: Stripeに到達できない場合
         """
-        db = SessionLocal()
+        db = open_session()
         try:
             sub = db.query(Subscription).filter(Subscription.user_id == user_id).first()
+            customer_id = sub.stripe_customer_id if sub else None
+        finally:
+            db.close()
+        # Stripeの応答を待つ間、リクエストの共有接続をプールに返しておく
+        release_request_connection()
 
-            if not sub or not sub.stripe_customer_id:
-                raise ValueError("No active subscription found")
+        if not customer_id:
+            raise ValueError("No active subscription found")
 
-            session = stripe.billing_portal.Session.create(
-                customer=sub.stripe_customer_id,
-                return_url=return_url,
-            )
+        import stripe
 
-            return session.url
-        finally:
-            db.close()
+        session = await self.gateway.call(
+            stripe.billing_portal.Session.create,
+            customer=customer_id,
+            return_url=return_url,
+        )
+
+        return session.url
 
     async def handle_checkout_completed(self, session: dict[str, Any]) -> None:
         """Checkout完了時の処理"""
-        db = SessionLocal()
+        db = open_session()
         try:
             user_id = session.get("metadata", {}).get("user_id")
             customer_id = session.get("customer")
@@ -128,12 +157,13 @@ class BillingService:
                 user.plan = "pro"
 
             db.commit()
+            invalidate_entitlement(user_id)
         finally:
             db.close()
 
     async def handle_subscription_updated(self, subscription: dict[str, Any]) -> None:
         """サブスクリプション更新時の処理"""
-        db = SessionLocal()
+        db = open_session()
         try:
             stripe_sub_id = subscription.get("id")
             status = subscription.get("status")
@@ -164,5 +194,6 @@ class BillingService:
                     user.plan = "free"
 
             db.commit()
+            invalidate_entitlement(sub.user_id)
         finally:
             db.close()
@@ -0,0 +1,53 @@
+"""
+キャッシュ無効化イベント
+
+公開ポートフォリオに影響する書き込み（プロジェクト・開発ログ・プロフィール）の
+コミット後にイベントを発行する。キャッシュ側はsubscribe()で購読し、
+該当ユーザーのエントリを破棄する。書き込み側はキャッシュの実装を知らない。
+"""
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PortfolioChanged:
+    """ユーザーの公開ポートフォリオに影響する変更"""
+
+    user_id: str
+    project_id: str | None = None
+    reason: str = ""
+
+
+Listener = Callable[[PortfolioChanged], None]
+
+_listeners: list[Listener] = []
+
+
+def subscribe(listener: Listener) -> None:
+    """イベントを購読する（同じリスナーの重複登録は無視）"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def unsubscribe(listener: Listener) -> None:
+    """購読を解除する"""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def emit_portfolio_changed(user_id: str, project_id: str | None = None, reason: str = "") -> None:
+    """
+    ポートフォリオ変更イベントを発行する
+
+    書き込みはコミット済みのため、リスナーの失敗は書き込みを失敗させずログに残す。
+    """
+    event = PortfolioChanged(user_id=user_id, project_id=project_id, reason=reason)
+    for listener in list(_listeners):
+        try:
+            listener(event)
+        except Exception:
+            logger.exception("Cache invalidation listener failed (%s)", event)
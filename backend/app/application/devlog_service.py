@@ -3,9 +3,19 @@
 import logging
 from dataclasses import dataclass, field
 
+from sqlalchemy import func
+
+from app.application.cache_events import emit_portfolio_changed
+from app.application.technologies import matches_any_technology
+from app.application.technology_stats import (
+    apply_technology_delta,
+    technology_diff,
+    technology_set,
+)
+from app.application.user_stats import apply_stats_delta, has_notebook
 from app.domain.security.secret_detector import get_secret_detector
-from app.infrastructure.database.models import DevLogEntry, Project
-from app.infrastructure.database.session import SessionLocal
+from app.infrastructure.database.models import DevLogEntry, Project, with_detail
+from app.infrastructure.database.session import open_session
 
 logger = logging.getLogger(__name__)
 
@@ -56,18 +66,34 @@ class DevLogService:
     """開発ログ管理サービス"""
 
     def list_entries(
-        self, user_id: str, project_id: str, limit: int | None = None
+        self,
+        user_id: str,
+        project_id: str,
+        limit: int | None = None,
+        technologies: list[str] | None = None,
     ) -> tuple[list[DevLogSummary], int]:
-        db = SessionLocal()
+        """
+        プロジェクトの開発ログ一覧と総件数
+
+        Args:
+            technologies: 指定時はいずれかの技術タグを含むログのみ（総件数も同条件）
+        """
+        db = open_session()
         try:
             self._ensure_project(db, user_id, project_id)
 
+            conditions = [DevLogEntry.project_id == project_id, DevLogEntry.user_id == user_id]
+            if technologies:
+                conditions.append(
+                    matches_any_technology(db, DevLogEntry.technologies, technologies)
+                )
+            total = db.query(func.count(DevLogEntry.id)).filter(*conditions).scalar()
             query = (
                 db.query(DevLogEntry)
-                .filter(DevLogEntry.project_id == project_id, DevLogEntry.user_id == user_id)
+                .options(with_detail())
+                .filter(*conditions)
                 .order_by(DevLogEntry.created_at.desc())
             )
-            total = query.count()
             if limit:
                 query = query.limit(limit)
             entries = query.all()
@@ -77,9 +103,9 @@ class DevLogService:
             db.close()
 
     def create_entry(self, user_id: str, project_id: str, data: DevLogCreate) -> DevLogSummary:
-        db = SessionLocal()
+        db = open_session()
         try:
-            self._ensure_project(db, user_id, project_id)
+            project = self._ensure_project(db, user_id, project_id)
 
             # シークレット検出・マスキング
             detector = get_secret_detector()
@@ -105,17 +131,29 @@ class DevLogService:
                 metadata_=(data.metadata or {}),
             )
             db.add(entry)
+            db.flush()
+            apply_stats_delta(db, user_id, devlogs=1, notebooks=int(has_notebook(data.metadata)))
+            added = dict.fromkeys(technology_set(entry.technologies), 1)
+            apply_technology_delta(
+                db,
+                user_id,
+                entries=added,
+                public=added if project.is_public else None,
+                used_at=entry.created_at,
+            )
             db.commit()
             db.refresh(entry)
+            emit_portfolio_changed(user_id, project_id, reason="devlog_created")
             return self._to_summary(entry)
         finally:
             db.close()
 
     def update_entry(self, user_id: str, entry_id: str, data: DevLogUpdate) -> DevLogSummary:
-        db = SessionLocal()
+        db = open_session()
         try:
             entry = (
                 db.query(DevLogEntry)
+                .options(with_detail())
                 .filter(DevLogEntry.id == entry_id, DevLogEntry.user_id == user_id)
                 .first()
             )
@@ -148,20 +186,33 @@ class DevLogService:
                     )
                 entry.detail = masked_detail
             if data.technologies is not None:
+                diff = technology_diff(entry.technologies, data.technologies)
+                apply_technology_delta(
+                    db,
+                    user_id,
+                    entries=diff,
+                    public=diff if entry.project.is_public else None,
+                    used_at=entry.created_at,
+                )
                 entry.technologies = data.technologies
             if data.ai_tool is not None:
                 entry.ai_tool = data.ai_tool
             if data.metadata is not None:
+                notebook_delta = int(has_notebook(data.metadata)) - int(
+                    has_notebook(entry.metadata_)
+                )
+                apply_stats_delta(db, user_id, notebooks=notebook_delta)
                 entry.metadata_ = data.metadata
 
             db.commit()
             db.refresh(entry)
+            emit_portfolio_changed(user_id, entry.project_id, reason="devlog_updated")
             return self._to_summary(entry)
         finally:
             db.close()
 
     def delete_entry(self, user_id: str, entry_id: str) -> None:
-        db = SessionLocal()
+        db = open_session()
         try:
             entry = (
                 db.query(DevLogEntry)
@@ -170,18 +221,31 @@ class DevLogService:
             )
             if entry is None:
                 raise ValueError("DevLog entry not found")
+            project_id = entry.project_id
             db.delete(entry)
+            apply_stats_delta(
+                db, user_id, devlogs=-1, notebooks=-int(has_notebook(entry.metadata_))
+            )
+            removed = dict.fromkeys(technology_set(entry.technologies), -1)
+            apply_technology_delta(
+                db,
+                user_id,
+                entries=removed,
+                public=removed if entry.project.is_public else None,
+            )
             db.commit()
+            emit_portfolio_changed(user_id, project_id, reason="devlog_deleted")
         finally:
             db.close()
 
     @staticmethod
-    def _ensure_project(db, user_id: str, project_id: str) -> None:
+    def _ensure_project(db, user_id: str, project_id: str) -> Project:
         project = (
             db.query(Project).filter(Project.id == project_id, Project.user_id == user_id).first()
         )
         if project is None:
             raise ValueError("Project not found")
+        return project
 
     @staticmethod
     def _to_summary(entry: DevLogEntry) -> DevLogSummary:
@@ -0,0 +1,150 @@
+"""
+プランの利用権限（エンタイトルメント）の解決とキャッシュ
+
+ガード付きエンドポイントのたびに users と projects を引かないよう、
+ユーザーごとの (プラン, プロジェクト数) をTTL付きでワーカー内にキャッシュする。
+プラン変更（Stripe Webhook）とプロジェクトの作成・削除のコミット後に
+invalidate_entitlement() で破棄する。別ワーカーのエントリはTTLで失効する。
+
+キャッシュは事前チェック用で、上限の最終判定は reserve_project_slot() が
+user_stats への条件付きUPSERT 1文で行う（同時作成でも上限を超えない）。
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.application.user_stats import upsert_insert
+from app.infrastructure.database.models import User, UserStats, utc_now
+from app.performance.metrics import register_metrics_provider
+
+FREE_PROJECT_LIMIT = 2
+
+
+class ProjectLimitExceededError(ValueError):
+    """Freeプランのプロジェクト数上限に達している"""
+
+
+@dataclass(frozen=True)
+class Entitlement:
+    """ユーザーのプランと現在のプロジェクト数"""
+
+    plan: str
+    project_count: int
+
+    @property
+    def project_limit(self) -> int | None:
+        return FREE_PROJECT_LIMIT if self.plan == "free" else None
+
+    @property
+    def can_create_project(self) -> bool:
+        return self.project_limit is None or self.project_count < self.project_limit
+
+
+class EntitlementCache:
+    """ユーザーIDごとのエンタイトルメントをTTL付きで保持する"""
+
+    def __init__(self, ttl_seconds: float = 30.0):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, tuple[float, Entitlement]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Entitlement | None:
+        with self._lock:
+            item = self._entries.get(user_id)
+            if item is None or item[0] <= time.monotonic():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return item[1]
+
+    def set(self, user_id: str, entitlement: Entitlement) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, entitlement)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_cache: EntitlementCache | None = None
+
+
+def get_entitlement_cache() -> EntitlementCache:
+    """エンタイトルメントキャッシュのシングルトンを取得"""
+    global _cache
+    if _cache is None:
+        from app.config import get_settings
+
+        cache = EntitlementCache(ttl_seconds=get_settings().entitlement_cache_ttl_seconds)
+        register_metrics_provider("entitlement_cache", cache.stats)
+        _cache = cache
+    return _cache
+
+
+def invalidate_entitlement(user_id: str) -> None:
+    """ユーザーのキャッシュを破棄（プラン変更・プロジェクト作成/削除のコミット後に呼ぶ）"""
+    get_entitlement_cache().invalidate(user_id)
+
+
+def resolve_entitlement(db: Session, user_id: str) -> Entitlement:
+    """
+    エンタイトルメントを取得する（キャッシュミス時は users と user_stats を1クエリで読む）
+
+    JWTに含まれるplanはトークン発行時点の値のため使わず、DB側の値を正とする。
+    ユーザーが存在しない場合は free / 0件 とみなす。
+    """
+    cache = get_entitlement_cache()
+    cached = cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    row = db.execute(
+        select(User.plan, UserStats.project_count)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .where(User.id == user_id)
+    ).first()
+    entitlement = Entitlement(
+        plan=(row.plan if row else None) or "free",
+        project_count=(row.project_count if row else None) or 0,
+    )
+    cache.set(user_id, entitlement)
+    return entitlement
+
+
+def reserve_project_slot(db: Session, user_id: str) -> bool:
+    """
+    プロジェクト1件分の枠を確保し、user_stats.project_count を加算する（コミットは呼び出し側）
+
+    Freeプランで上限に達している場合は何も更新せず False を返す。
+    判定と加算は user_stats への条件付きUPSERT 1文で行い、競合する行ロックで
+    直列化されるため、同時に作成しても上限を超えない。プランは同じ文の中で
+    users から読むため、キャッシュの古いプランに影響されない。
+    """
+    table = UserStats.__table__
+    insert = upsert_insert(db)
+    stmt = insert(table).values(user_id=user_id, project_count=1, updated_at=utc_now())
+    plan = select(User.plan).where(User.id == user_id).scalar_subquery()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            "project_count": table.c.project_count + 1,
+            "updated_at": stmt.excluded.updated_at,
+        },
+        where=or_(table.c.project_count < FREE_PROJECT_LIMIT, plan != "free"),
+    ).returning(table.c.project_count)
+    return db.execute(stmt).first() is not None
@@ -1,7 +1,13 @@
 """
-ポストモーテムサービス
+ポストモーテムサービス（非推奨）
 タスク3.3: ポストモーテムサービスの実装
 
+ピボット前のCaseManager・IdeaMemoに依存していた機能。
+テーブル・モデルは削除済みで、このモジュールはimportできず、APIからも呼ばれない。
+提出の即時保存と失敗パターン推定のバックグラウンド化は、ポートフォリオ向けに
+ポストモーテム機能を作り直す際に行う（LLM呼び出しの期限・リトライは
+app.performance.resilient_executor を使うこと）。
+
 Design.mdに基づく仕様:
 - プロジェクト撤退・中止・ペンディング時に、仮説の崩壊理由と組織内議論を入力するテンプレートを提供
 - Go/NoGo判断と理由（1〜3文）の有無を検証し、ケースとアイデアメモを区別して保存
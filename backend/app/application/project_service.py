@@ -2,8 +2,23 @@
 
 from dataclasses import dataclass, field
 
+from sqlalchemy import func
+
+from app.application.cache_events import emit_portfolio_changed
+from app.application.entitlements import (
+    ProjectLimitExceededError,
+    invalidate_entitlement,
+    reserve_project_slot,
+)
+from app.application.technologies import matches_any_technology
+from app.application.technology_stats import apply_technology_delta, project_technology_counts
+from app.application.user_stats import (
+    apply_stats_delta,
+    devlog_counts_by_project,
+    project_devlog_counts,
+)
 from app.infrastructure.database.models import DevLogEntry, Project
-from app.infrastructure.database.session import SessionLocal
+from app.infrastructure.database.session import open_session
 
 
 @dataclass
@@ -52,21 +67,28 @@ class ProjectSummary:
 class ProjectService:
     """プロジェクト管理サービス"""
 
-    def list_projects(self, user_id: str) -> list[ProjectSummary]:
-        db = SessionLocal()
+    def list_projects(
+        self, user_id: str, technologies: list[str] | None = None
+    ) -> list[ProjectSummary]:
+        """
+        プロジェクト一覧（更新日時の降順）
+
+        Args:
+            technologies: 指定時はいずれかの技術タグを含むプロジェクトのみ
+        """
+        db = open_session()
         try:
-            projects = (
-                db.query(Project)
-                .filter(Project.user_id == user_id)
-                .order_by(Project.updated_at.desc())
-                .all()
-            )
-            return [self._to_summary(db, p) for p in projects]
+            query = db.query(Project).filter(Project.user_id == user_id)
+            if technologies:
+                query = query.filter(matches_any_technology(db, Project.technologies, technologies))
+            projects = query.order_by(Project.updated_at.desc()).all()
+            counts = devlog_counts_by_project(db, [p.id for p in projects])
+            return [self._to_summary(db, p, counts.get(p.id, 0)) for p in projects]
         finally:
             db.close()
 
     def get_project(self, user_id: str, project_id: str) -> ProjectSummary:
-        db = SessionLocal()
+        db = open_session()
         try:
             project = self._get_project(db, user_id, project_id)
             return self._to_summary(db, project)
@@ -74,7 +96,13 @@ class ProjectService:
             db.close()
 
     def create_project(self, user_id: str, data: ProjectCreate) -> ProjectSummary:
-        db = SessionLocal()
+        """
+        プロジェクトを作成する
+
+        Raises:
+            ProjectLimitExceededError: Freeプランのプロジェクト数上限に達している場合
+        """
+        db = open_session()
         try:
             project = Project(
                 user_id=user_id,
@@ -86,15 +114,21 @@ class ProjectService:
                 status=data.status,
                 is_public=data.is_public,
             )
+            # 上限判定とproject_countの加算を1文で行う（同時作成でも上限を超えない）
+            if not reserve_project_slot(db, user_id):
+                db.rollback()
+                raise ProjectLimitExceededError("Project limit reached for the current plan")
             db.add(project)
             db.commit()
             db.refresh(project)
+            invalidate_entitlement(user_id)
+            emit_portfolio_changed(user_id, project.id, reason="project_created")
             return self._to_summary(db, project)
         finally:
             db.close()
 
     def update_project(self, user_id: str, project_id: str, data: ProjectUpdate) -> ProjectSummary:
-        db = SessionLocal()
+        db = open_session()
         try:
             project = self._get_project(db, user_id, project_id)
 
@@ -110,21 +144,36 @@ class ProjectService:
                 project.demo_url = data.demo_url
             if data.status is not None:
                 project.status = data.status
-            if data.is_public is not None:
+            if data.is_public is not None and data.is_public != project.is_public:
+                # 公開ポートフォリオ用のタグ件数を配下の開発ログ分だけ移す
+                sign = 1 if data.is_public else -1
+                counts = project_technology_counts(db, project_id)
+                apply_technology_delta(
+                    db, user_id, public={name: sign * n for name, n in counts.items()}
+                )
                 project.is_public = data.is_public
 
             db.commit()
             db.refresh(project)
+            emit_portfolio_changed(user_id, project_id, reason="project_updated")
             return self._to_summary(db, project)
         finally:
             db.close()
 
     def delete_project(self, user_id: str, project_id: str) -> None:
-        db = SessionLocal()
+        db = open_session()
         try:
             project = self._get_project(db, user_id, project_id)
+            devlogs, notebooks = project_devlog_counts(db, project_id)
+            removed = {name: -n for name, n in project_technology_counts(db, project_id).items()}
             db.delete(project)
+            apply_stats_delta(db, user_id, projects=-1, devlogs=-devlogs, notebooks=-notebooks)
+            apply_technology_delta(
+                db, user_id, entries=removed, public=removed if project.is_public else None
+            )
             db.commit()
+            invalidate_entitlement(user_id)
+            emit_portfolio_changed(user_id, project_id, reason="project_deleted")
         finally:
             db.close()
 
@@ -136,8 +185,13 @@ class ProjectService:
             raise ValueError("Project not found")
         return project
 
-    def _to_summary(self, db, project: Project) -> ProjectSummary:
-        devlog_count = db.query(DevLogEntry).filter(DevLogEntry.project_id == project.id).count()
+    def _to_summary(self, db, project: Project, devlog_count: int | None = None) -> ProjectSummary:
+        if devlog_count is None:
+            devlog_count = (
+                db.query(func.count(DevLogEntry.id))
+                .filter(DevLogEntry.project_id == project.id)
+                .scalar()
+            )
 
         return ProjectSummary(
             id=project.id,
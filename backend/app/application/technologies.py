@@ -0,0 +1,26 @@
+"""
+技術タグ（technologies）による絞り込み
+
+technologies は PostgreSQL では JSONB 配列で、GIN（jsonb_path_ops）インデックスを持つ。
+jsonb_path_ops が対応する演算子は @> のみのため、「いずれかのタグを含む」は
+タグごとの @> を OR で結合する（?| はインデックスを使えない）。
+SQLite（テスト環境）では json_each で同じ条件を表す。
+よく使うタグの集計は technology_stats を参照。
+"""
+
+from sqlalchemy import ColumnElement, bindparam, exists, func, or_, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+
+def matches_any_technology(db: Session, column, technologies: list[str]) -> ColumnElement[bool]:
+    """technologies列が指定タグのいずれかを含む条件"""
+    if db.get_bind().dialect.name == "postgresql":
+        return or_(
+            *(
+                column.op("@>")(bindparam(f"technology_{i}", [name], type_=JSONB))
+                for i, name in enumerate(technologies)
+            )
+        )
+    elements = func.json_each(column).table_valued("value")
+    return exists(select(1).select_from(elements).where(elements.c.value.in_(technologies)))
@@ -0,0 +1,219 @@
+"""
+ユーザー別の技術タグ集計（user_technology_stats）の差分更新と再集計
+
+開発ログの作成・更新・削除（およびプロジェクトの削除・公開設定の変更）と
+同じトランザクション内で apply_technology_delta() を呼び、タグごとの件数を増減させる。
+ダッシュボード・公開ポートフォリオの「トップスキル」は top_skills() で
+集計済みの行を読むだけで、開発ログの technologies 配列は走査しない。
+既存データの投入や差分更新のずれの修復には rebuild_technology_stats() を使う。
+
+    python -m app.application.technology_stats                # 全ユーザーを再集計
+    python -m app.application.technology_stats --user-id <id> # 指定ユーザーのみ
+"""
+
+import argparse
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import case, delete, or_, select
+from sqlalchemy.orm import Session
+
+from app.application.user_stats import upsert_insert
+from app.infrastructure.database.models import DevLogEntry, Project, User, UserTechnologyStats
+
+logger = logging.getLogger(__name__)
+
+# user_technology_stats.technology の長さ上限
+MAX_TECHNOLOGY_LENGTH = 100
+
+
+@dataclass(frozen=True)
+class SkillCount:
+    """技術タグごとの開発ログ件数"""
+
+    name: str
+    entry_count: int
+    last_used_at: datetime | None
+
+
+def technology_set(technologies: list | None) -> set[str]:
+    """集計対象のタグ集合（空文字・文字列以外は除外し、1エントリ内の重複は1件とする）"""
+    return {
+        name[:MAX_TECHNOLOGY_LENGTH]
+        for name in technologies or []
+        if isinstance(name, str) and name
+    }
+
+
+def technology_diff(old: list | None, new: list | None) -> dict[str, int]:
+    """開発ログのタグ変更をタグごとの増減に変換"""
+    before, after = technology_set(old), technology_set(new)
+    return {**dict.fromkeys(before - after, -1), **dict.fromkeys(after - before, 1)}
+
+
+def apply_technology_delta(
+    db: Session,
+    user_id: str,
+    entries: dict[str, int] | None = None,
+    public: dict[str, int] | None = None,
+    used_at: datetime | None = None,
+) -> None:
+    """
+    タグごとの件数に差分を加算する（行が無ければ作成、0件になった行は削除）
+
+    Args:
+        entries: タグ→開発ログ件数の増減
+        public: タグ→公開プロジェクト配下の開発ログ件数の増減
+        used_at: 増加した開発ログの作成日時（last_used_at より新しければ進める）
+    """
+    entries = {name: n for name, n in (entries or {}).items() if n}
+    public = {name: n for name, n in (public or {}).items() if n}
+    names = sorted(entries.keys() | public.keys())
+    if not names:
+        return
+
+    table = UserTechnologyStats.__table__
+    insert = upsert_insert(db)
+    stmt = insert(table).values(
+        [
+            {
+                "user_id": user_id,
+                "technology": name,
+                "entry_count": entries.get(name, 0),
+                "public_entry_count": public.get(name, 0),
+                "last_used_at": used_at if entries.get(name, 0) > 0 else None,
+            }
+            for name in names
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.technology],
+        set_={
+            "entry_count": table.c.entry_count + stmt.excluded.entry_count,
+            "public_entry_count": table.c.public_entry_count + stmt.excluded.public_entry_count,
+            # 減算では last_used_at を戻さない（再集計で正確な値になる）
+            "last_used_at": case(
+                (
+                    or_(
+                        table.c.last_used_at.is_(None),
+                        stmt.excluded.last_used_at > table.c.last_used_at,
+                    ),
+                    stmt.excluded.last_used_at,
+                ),
+                else_=table.c.last_used_at,
+            ),
+        },
+    )
+    db.execute(stmt)
+
+    if any(n < 0 for n in entries.values()):
+        db.execute(
+            delete(table).where(
+                table.c.user_id == user_id,
+                table.c.technology.in_([name for name, n in entries.items() if n < 0]),
+                table.c.entry_count <= 0,
+            )
+        )
+
+
+def project_technology_counts(db: Session, project_id: str) -> dict[str, int]:
+    """プロジェクト配下の開発ログのタグ別件数（プロジェクト削除・公開設定変更時の差分用）"""
+    counts: Counter[str] = Counter()
+    for (technologies,) in db.query(DevLogEntry.technologies).filter(
+        DevLogEntry.project_id == project_id
+    ):
+        counts.update(technology_set(technologies))
+    return dict(counts)
+
+
+def top_skills(
+    db: Session, user_id: str, limit: int = 10, public_only: bool = False
+) -> list[SkillCount]:
+    """
+    よく使う技術タグ上位N件（件数の降順、同数は最終利用日時の新しい順）
+
+    Args:
+        public_only: Trueの場合は公開プロジェクト配下の件数で数える（公開ポートフォリオ用）
+    """
+    table = UserTechnologyStats.__table__
+    count = table.c.public_entry_count if public_only else table.c.entry_count
+    rows = db.execute(
+        select(table.c.technology, count.label("entry_count"), table.c.last_used_at)
+        .where(table.c.user_id == user_id, count > 0)
+        .order_by(count.desc(), table.c.last_used_at.desc(), table.c.technology)
+        .limit(limit)
+    ).all()
+    return [
+        SkillCount(name=row.technology, entry_count=row.entry_count, last_used_at=row.last_used_at)
+        for row in rows
+    ]
+
+
+def rebuild_technology_stats(db: Session, user_id: str) -> int:
+    """
+    開発ログからユーザーの技術タグ集計を作り直す（コミットは呼び出し側）
+
+    Returns:
+        作成した行数
+    """
+    entry_counts: Counter[str] = Counter()
+    public_counts: Counter[str] = Counter()
+    last_used: dict[str, datetime] = {}
+    rows = (
+        db.query(DevLogEntry.technologies, DevLogEntry.created_at, Project.is_public)
+        .join(Project, Project.id == DevLogEntry.project_id)
+        .filter(DevLogEntry.user_id == user_id)
+    )
+    for technologies, created_at, is_public in rows:
+        names = technology_set(technologies)
+        entry_counts.update(names)
+        if is_public:
+            public_counts.update(names)
+        if created_at is not None:
+            for name in names:
+                if name not in last_used or created_at > last_used[name]:
+                    last_used[name] = created_at
+
+    db.execute(delete(UserTechnologyStats).where(UserTechnologyStats.user_id == user_id))
+    db.add_all(
+        UserTechnologyStats(
+            user_id=user_id,
+            technology=name,
+            entry_count=count,
+            public_entry_count=public_counts.get(name, 0),
+            last_used_at=last_used.get(name),
+        )
+        for name, count in entry_counts.items()
+    )
+    db.flush()
+    return len(entry_counts)
+
+
+def main() -> None:
+    from app.infrastructure.database.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild user_technology_stats from devlogs")
+    parser.add_argument("--user-id", help="rebuild a single user (default: all users)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        user_ids = (
+            [args.user_id]
+            if args.user_id
+            else [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+        )
+        for user_id in user_ids:
+            rows = rebuild_technology_stats(db, user_id)
+            db.commit()
+            logger.info("rebuilt technology stats (user_id=%s, technologies=%d)", user_id, rows)
+    finally:
+        db.close()
+    print(f"rebuilt technology stats for {len(user_ids)} user(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+利用量の集計（日次・月次ロールアップ）とusage_logsのパーティション管理
+
+利用量ライターはusage_logsへの一括INSERTと同じトランザクションで
+apply_usage_rollups() を呼び、(ユーザー, 日, アクション) と (ユーザー, 月, アクション)
+の集計行に加算する。月間の利用量は get_monthly_usage() で月次集計行を
+主キーの前方一致で読むだけなので、生ログの件数に依存しない。
+
+PostgreSQLのusage_logsは月単位のレンジパーティション。翌月以降のパーティションは
+アプリ起動時と1日ごとに事前に作成する（usage_log_partition_months_ahead）。
+作り忘れた月の行はDEFAULTパーティションに入り、パーティション作成時に移し替える。
+
+    python -m app.application.usage_rollup --ensure-partitions   # 今月から数か月先まで作成
+    python -m app.application.usage_rollup --rebuild-since 2026-10-01
+"""
+
+import argparse
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.application.user_stats import upsert_insert
+from app.infrastructure.database.models import (
+    UsageDailyRollup,
+    UsageLog,
+    UsageMonthlyRollup,
+    utc_now,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MonthlyUsage:
+    """ユーザーの月間利用量"""
+
+    user_id: str
+    month: date
+    tokens_used: int = 0
+    event_count: int = 0
+    by_action: dict[str, int] = field(default_factory=dict)
+
+
+def month_start(value: date | datetime) -> date:
+    """UTCでの月初日"""
+    if isinstance(value, datetime):
+        value = _utc(value).date()
+    return value.replace(day=1)
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _upsert_counts(db: Session, model, key: str, totals: dict[tuple, list[int]]) -> None:
+    if not totals:
+        return
+    table = model.__table__
+    insert_ = upsert_insert(db)
+    stmt = insert_(table).values(
+        [
+            {
+                "user_id": user_id,
+                key: period,
+                "action": action,
+                "tokens_used": tokens,
+                "event_count": events,
+            }
+            for (user_id, period, action), (tokens, events) in sorted(totals.items())
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c[key], table.c.action],
+        set_={
+            "tokens_used": table.c.tokens_used + stmt.excluded.tokens_used,
+            "event_count": table.c.event_count + stmt.excluded.event_count,
+        },
+    )
+    db.execute(stmt)
+
+
+def apply_usage_rollups(db: Session, rows: list[dict]) -> None:
+    """
+    usage_logsに書き込む行を日次・月次の集計行に加算する（コミットは呼び出し側）
+
+    Args:
+        rows: usage_logsに挿入する行（user_id, action, tokens_used, created_at）
+    """
+    daily: dict[tuple, list[int]] = defaultdict(lambda: [0, 0])
+    monthly: dict[tuple, list[int]] = defaultdict(lambda: [0, 0])
+    for row in rows:
+        created_at = _utc(row.get("created_at") or utc_now())
+        tokens = row.get("tokens_used") or 0
+        for totals, period in (
+            (daily, created_at.date()),
+            (monthly, month_start(created_at)),
+        ):
+            counts = totals[(row["user_id"], period, row["action"])]
+            counts[0] += tokens
+            counts[1] += 1
+    _upsert_counts(db, UsageDailyRollup, "day", daily)
+    _upsert_counts(db, UsageMonthlyRollup, "month", monthly)
+
+
+def write_usage_rows(db: Session, rows: list[dict]) -> None:
+    """usage_logsへの一括INSERTと集計の加算を同じトランザクションで行う（コミットは呼び出し側）"""
+    if not rows:
+        return
+    db.execute(insert(UsageLog), rows)
+    apply_usage_rollups(db, rows)
+
+
+def get_monthly_usage(db: Session, user_id: str, month: date | None = None) -> MonthlyUsage:
+    """
+    ユーザーの月間利用量（月次集計行のみを読む）
+
+    Args:
+        month: 対象月（省略時は今月、UTC）
+    """
+    month = month_start(month or utc_now())
+    rows = db.execute(
+        select(
+            UsageMonthlyRollup.action,
+            UsageMonthlyRollup.tokens_used,
+            UsageMonthlyRollup.event_count,
+        ).where(UsageMonthlyRollup.user_id == user_id, UsageMonthlyRollup.month == month)
+    ).all()
+    return MonthlyUsage(
+        user_id=user_id,
+        month=month,
+        tokens_used=sum(row.tokens_used for row in rows),
+        event_count=sum(row.event_count for row in rows),
+        by_action={row.action: row.tokens_used for row in rows},
+    )
+
+
+def rebuild_usage_rollups(db: Session, since: date) -> int:
+    """
+    指定日以降の集計行をusage_logsから作り直す（コミットは呼び出し側）
+
+    月次集計は since を含む月の初日から作り直す。
+
+    Returns:
+        集計に使ったログの件数
+    """
+    start = month_start(since)
+    start_at = datetime(start.year, start.month, 1, tzinfo=timezone.utc)
+    db.execute(delete(UsageDailyRollup).where(UsageDailyRollup.day >= start))
+    db.execute(delete(UsageMonthlyRollup).where(UsageMonthlyRollup.month >= start))
+    rows = [
+        dict(row._mapping)
+        for row in db.execute(
+            select(
+                UsageLog.user_id, UsageLog.action, UsageLog.tokens_used, UsageLog.created_at
+            ).where(UsageLog.created_at >= start_at)
+        )
+    ]
+    apply_usage_rollups(db, rows)
+    db.flush()
+    return len(rows)
+
+
+def partition_name(month: date) -> str:
+    """月別パーティションのテーブル名（usage_logs_YYYY_MM）"""
+    return f"usage_logs_{month.year:04d}_{month.month:02d}"
+
+
+def partition_bound(month: date) -> str:
+    """パーティション境界のリテラル（UTCの月初。セッションのタイムゾーンに依存しない）"""
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+def ensure_usage_log_partitions(db: Session, months_ahead: int = 2) -> list[str]:
+    """
+    今月から months_ahead か月先までの月別パーティションを作成する（PostgreSQLのみ）
+
+    DEFAULTパーティションに同じ月の行が既にあると CREATE TABLE ... PARTITION OF は
+    失敗するため、空のテーブルを作って該当行を移してから ATTACH する。
+    複数のワーカーが同時に起動しても衝突しないよう、アドバイザリロックで直列化する。
+
+    Returns:
+        対象にしたパーティション名（既存のものも含む）
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return []
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('usage_logs_partitions'))"))
+    names = []
+    month = month_start(utc_now())
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+            _create_partition(db, name, month)
+        names.append(name)
+        month = _next_month(month)
+    return names
+
+
+def _create_partition(db: Session, name: str, month: date) -> None:
+    lower, upper = partition_bound(month), partition_bound(_next_month(month))
+    db.execute(text(f"CREATE TABLE {name} (LIKE usage_logs INCLUDING DEFAULTS)"))
+    moved = db.execute(
+        text(
+            f"WITH moved AS ("
+            f" DELETE FROM usage_logs_default"
+            f" WHERE created_at >= '{lower}' AND created_at < '{upper}'"
+            f" RETURNING id, user_id, action, tokens_used, created_at"
+            f") INSERT INTO {name} (id, user_id, action, tokens_used, created_at)"
+            f" SELECT id, user_id, action, tokens_used, created_at FROM moved"
+        )
+    ).rowcount
+    db.execute(
+        text(
+            f"ALTER TABLE usage_logs ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        )
+    )
+    if moved:
+        logger.warning("Moved %d usage log row(s) from usage_logs_default to %s", moved, name)
+
+
+def maintain_usage_log_partitions(months_ahead: int) -> list[str]:
+    """
+    パーティションを先行作成してコミットする（起動時・定期実行・CLI用）
+
+    Returns:
+        対象にしたパーティション名（PostgreSQL以外では空）
+    """
+    from app.infrastructure.database.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        names = ensure_usage_log_partitions(db, months_ahead)
+        db.commit()
+        stray = count_default_partition_rows(db)
+        if stray:
+            logger.warning("%d usage log rows are in usage_logs_default", stray)
+        return names
+    finally:
+        db.close()
+
+
+def count_default_partition_rows(db: Session) -> int:
+    """DEFAULTパーティションに入った行数（パーティションの作り忘れの検知用）"""
+    if db.get_bind().dialect.name != "postgresql":
+        return 0
+    return db.execute(select(func.count()).select_from(text("usage_logs_default"))).scalar_one()
+
+
+def main() -> None:
+    from app.infrastructure.database.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Maintain usage_logs partitions and rollups")
+    parser.add_argument("--ensure-partitions", action="store_true")
+    parser.add_argument("--months-ahead", type=int, default=2)
+    parser.add_argument("--rebuild-since", type=date.fromisoformat)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.ensure_partitions:
+        names = maintain_usage_log_partitions(args.months_ahead)
+        print(f"partitions: {', '.join(names) or '(not PostgreSQL)'}")
+    if args.rebuild_since:
+        db = SessionLocal()
+        try:
+            rows = rebuild_usage_rollups(db, args.rebuild_since)
+            db.commit()
+            print(f"rebuilt rollups from {rows} usage log row(s)")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,17 @@
 
 from dataclasses import dataclass
 
-from sqlalchemy import String, cast
+from sqlalchemy import Select, and_, func, select
 
+from app.application.technology_stats import SkillCount, top_skills
+from app.application.user_stats import UserStatsSnapshot, compute_user_stats, rebuild_user_stats
 from app.infrastructure.database.models import (
     DevLogEntry,
-    MCPToken,
     Project,
     User,
+    UserStats,
 )
-from app.infrastructure.database.session import SessionLocal
+from app.infrastructure.database.session import open_session
 
 
 @dataclass
@@ -49,86 +51,142 @@ class DashboardData:
     user: DashboardUser
     stats: DashboardStats
     recent_projects: list[DashboardProject]
+    top_skills: list[SkillCount]
 
 
 class DashboardService:
     """ポートフォリオ概要の集計"""
 
+    # 直近プロジェクトの表示件数
+    RECENT_PROJECTS_LIMIT = 5
+    # よく使う技術タグの表示件数
+    TOP_SKILLS_LIMIT = 10
+
     def get_dashboard(self, user_id: str) -> DashboardData:
-        db = SessionLocal()
+        """
+        ダッシュボードを1クエリで取得する
+
+        ユーザー・user_stats・直近プロジェクト（row_numberで上位N件）・
+        プロジェクト毎の開発ログ件数を1文で結合する。結果はプロジェクト毎に1行
+        （プロジェクトが無い場合はプロジェクト列がNULLの1行）。
+        よく使う技術タグは集計済みの user_technology_stats から別途読む。
+        """
+        db = open_session()
         try:
-            user = db.query(User).filter(User.id == user_id).first()
-            if user is None:
+            rows = db.execute(self._dashboard_statement(user_id)).all()
+            if not rows:
                 raise ValueError("User not found")
 
-            total_projects = db.query(Project).filter(Project.user_id == user_id).count()
-            total_devlog_entries = (
-                db.query(DevLogEntry).filter(DevLogEntry.user_id == user_id).count()
-            )
-
-            # 有効な（未失効の）MCPトークンが存在するか確認
-            has_mcp_tokens = (
-                db.query(MCPToken)
-                .filter(
-                    MCPToken.user_id == user_id,
-                    MCPToken.revoked_at.is_(None),
+            first = rows[0]
+            if first.stats_user_id is None and db.info.get("read_only"):
+                # 読み取りレプリカには書けないので実件数を返すだけにする
+                stats = compute_user_stats(db, user_id)
+            elif first.stats_user_id is None:
+                # 差分更新が一度も走っていないユーザーは実件数から作成する
+                stats = rebuild_user_stats(db, user_id)
+                db.commit()
+            else:
+                stats = UserStatsSnapshot(
+                    project_count=first.project_count,
+                    devlog_count=first.devlog_count,
+                    notebook_count=first.notebook_count,
+                    active_mcp_token_count=first.active_mcp_token_count,
                 )
-                .first()
-                is not None
-            )
-
-            # notebook_id を持つ DevLogEntry をカウント
-            total_notebooks = (
-                db.query(DevLogEntry)
-                .filter(
-                    DevLogEntry.user_id == user_id,
-                    cast(DevLogEntry.metadata_["notebook_id"], String) != "null",
-                    DevLogEntry.metadata_["notebook_id"].isnot(None),
-                )
-                .count()
-            )
-
-            recent_projects = (
-                db.query(Project)
-                .filter(Project.user_id == user_id)
-                .order_by(Project.updated_at.desc())
-                .limit(5)
-                .all()
-            )
 
             recent_project_summaries = [
                 DashboardProject(
-                    id=p.id,
-                    title=p.title,
-                    description=p.description,
-                    technologies=p.technologies or [],
-                    repository_url=p.repository_url,
-                    demo_url=p.demo_url,
-                    status=p.status,
-                    is_public=p.is_public,
-                    devlog_count=db.query(DevLogEntry)
-                    .filter(DevLogEntry.project_id == p.id)
-                    .count(),
-                    created_at=p.created_at.isoformat() if p.created_at else "",
-                    updated_at=p.updated_at.isoformat() if p.updated_at else "",
+                    id=row.project_id,
+                    title=row.title,
+                    description=row.description,
+                    technologies=row.technologies or [],
+                    repository_url=row.repository_url,
+                    demo_url=row.demo_url,
+                    status=row.status,
+                    is_public=row.is_public,
+                    devlog_count=row.project_devlog_count,
+                    created_at=row.created_at.isoformat() if row.created_at else "",
+                    updated_at=row.updated_at.isoformat() if row.updated_at else "",
                 )
-                for p in recent_projects
+                for row in rows
+                if row.project_id is not None
             ]
 
             return DashboardData(
                 user=DashboardUser(
-                    display_name=user.display_name,
-                    username=user.username,
-                    bio=user.bio,
-                    github_url=user.github_url,
+                    display_name=first.display_name,
+                    username=first.username,
+                    bio=first.bio,
+                    github_url=first.github_url,
                 ),
                 stats=DashboardStats(
-                    total_projects=total_projects,
-                    total_devlog_entries=total_devlog_entries,
-                    total_notebooks=total_notebooks,
-                    has_mcp_tokens=has_mcp_tokens,
+                    total_projects=stats.project_count,
+                    total_devlog_entries=stats.devlog_count,
+                    total_notebooks=stats.notebook_count,
+                    has_mcp_tokens=stats.active_mcp_token_count > 0,
                 ),
                 recent_projects=recent_project_summaries,
+                top_skills=top_skills(db, user_id, limit=self.TOP_SKILLS_LIMIT),
             )
         finally:
             db.close()
+
+    def _dashboard_statement(self, user_id: str) -> Select:
+        ranked = (
+            select(
+                Project.id,
+                Project.user_id,
+                Project.title,
+                Project.description,
+                Project.technologies,
+                Project.repository_url,
+                Project.demo_url,
+                Project.status,
+                Project.is_public,
+                Project.created_at,
+                Project.updated_at,
+                func.row_number()
+                .over(order_by=(Project.updated_at.desc(), Project.id))
+                .label("rn"),
+            )
+            .where(Project.user_id == user_id)
+            .subquery("recent")
+        )
+        devlog_counts = (
+            select(DevLogEntry.project_id, func.count(DevLogEntry.id).label("devlog_count"))
+            .where(DevLogEntry.user_id == user_id)
+            .group_by(DevLogEntry.project_id)
+            .subquery("devlog_counts")
+        )
+        return (
+            select(
+                User.display_name,
+                User.username,
+                User.bio,
+                User.github_url,
+                UserStats.user_id.label("stats_user_id"),
+                UserStats.project_count,
+                UserStats.devlog_count,
+                UserStats.notebook_count,
+                UserStats.active_mcp_token_count,
+                ranked.c.id.label("project_id"),
+                ranked.c.title,
+                ranked.c.description,
+                ranked.c.technologies,
+                ranked.c.repository_url,
+                ranked.c.demo_url,
+                ranked.c.status,
+                ranked.c.is_public,
+                ranked.c.created_at,
+                ranked.c.updated_at,
+                func.coalesce(devlog_counts.c.devlog_count, 0).label("project_devlog_count"),
+            )
+            .select_from(User)
+            .outerjoin(UserStats, UserStats.user_id == User.id)
+            .outerjoin(
+                ranked,
+                and_(ranked.c.user_id == User.id, ranked.c.rn <= self.RECENT_PROJECTS_LIMIT),
+            )
+            .outerjoin(devlog_counts, devlog_counts.c.project_id == ranked.c.id)
+            .where(User.id == user_id)
+            .order_by(ranked.c.rn)
+        )
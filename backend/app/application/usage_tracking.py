@@ -2,30 +2,287 @@
 利用量記録
 
 UsageLogテーブルにアクション履歴を書き込む。
-独立したDBセッションで実行し、呼び出し元のトランザクションに影響しない。
+アプリ起動中はプロセス内のバッファ（UsageLogWriter）に積み、バックグラウンドの
+フラッシャーが batch_size 件ごと、または flush_interval_ms ごとにまとめてINSERTする。
+呼び出し元のトランザクションやレスポンスを待たせない。
+
+- log_usage(): キューが満杯なら破棄して dropped を数える（呼び出し元を待たせない）
+- UsageLogWriter.write(): キューに空きが出るまで待つ（バックプレッシャー）
+- DBに書けない間はバッチを保持して再試行し、上限を超えたら破棄して数える
+- 終了時は lifespan から stop() を呼び、残りをフラッシュする
+
+ライターが起動していない場合（CLI・テスト等）は1件ずつ同期で書き込む。
+この経路はリクエスト中でも独立したDBセッションで実行し、呼び出し元のトランザクションに影響しない。
+いずれの経路も日次・月次の集計（usage_rollup）を同じトランザクションで加算する。
 """
 
+import asyncio
 import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+from sqlalchemy.orm import Session
 
-from app.infrastructure.database.models import UsageLog
+from app.application.usage_rollup import write_usage_rows
+from app.infrastructure.database.models import generate_uuid, utc_now
 from app.infrastructure.database.session import SessionLocal
+from app.performance.metrics import register_metrics_provider
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class UsageWriterStats:
+    """利用量ライターのカウンタ"""
+
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0
+    batches: int = 0
+    failed_flushes: int = 0
+    queue_depth: int = 0
+
+
+def usage_row(user_id: str, action: str, tokens_used: int = 0) -> dict:
+    """usage_logsの1行（INSERT時ではなく記録時の時刻を保存する）"""
+    return {
+        "id": generate_uuid(),
+        "user_id": user_id,
+        "action": action,
+        "tokens_used": tokens_used,
+        "created_at": utc_now(),
+    }
+
+
 def log_usage(user_id: str, action: str, tokens_used: int = 0) -> None:
-    """UsageLogに1レコードを書き込む"""
+    """UsageLogに1レコードを書き込む（ライター起動中はバッファに積むだけ）"""
+    writer = get_usage_writer()
+    if writer.running:
+        writer.submit(user_id, action, tokens_used)
+        return
+
+    # リクエストの共有セッションを借りると、呼び出し元の未確定の変更までcommit・rollbackしてしまう
     db = SessionLocal()
     try:
-        record = UsageLog(
-            user_id=user_id,
-            action=action,
-            tokens_used=tokens_used,
-        )
-        db.add(record)
+        write_usage_rows(db, [usage_row(user_id, action, tokens_used)])
         db.commit()
     except Exception:
         db.rollback()
         logger.error("Failed to log usage: user=%s action=%s", user_id, action, exc_info=True)
     finally:
         db.close()
+
+
+class UsageLogWriter:
+    """
+    利用量ログのバッファ付き一括書き込み
+
+    asyncio.Queue とバックグラウンドタスクで構成する。submit() は別スレッド
+    （同期エンドポイントのスレッドプール）からも呼べる。
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval_ms: float = 500,
+        max_queue_size: int = 10_000,
+        max_retries: int = 3,
+        retry_backoff_ms: float = 200,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        """
+        Args:
+            batch_size: 1回のINSERTにまとめる最大件数
+            flush_interval_ms: バッチが満たなくてもフラッシュする間隔
+            max_queue_size: キューの上限（超過分は submit() では破棄、write() では待機）
+            max_retries: DBエラー時の再試行回数（超えたらバッチを破棄）
+            retry_backoff_ms: 再試行の待機時間（回数に応じて倍増）
+            session_factory: 書き込みに使うセッションの生成関数
+        """
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+        self.retry_backoff_ms = retry_backoff_ms
+        self.session_factory = session_factory
+        self._stats = UsageWriterStats()
+        self._stats_lock = threading.Lock()
+        self._queue: asyncio.Queue[dict] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._stop_event: asyncio.Event | None = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._stopping
+
+    def stats(self) -> UsageWriterStats:
+        """カウンタのスナップショット"""
+        with self._stats_lock:
+            snapshot = UsageWriterStats(**asdict(self._stats))
+        snapshot.queue_depth = self._queue.qsize() if self._queue is not None else 0
+        return snapshot
+
+    async def start(self) -> None:
+        """現在のイベントループでフラッシャーを起動する"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._stop_event = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="usage-log-writer")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """受付を止め、キューに残った分をフラッシュしてから終了する"""
+        if self._task is None:
+            return
+        self._stopping = True
+        if self._stop_event is not None:
+            self._stop_event.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            remaining = self._queue.qsize() if self._queue is not None else 0
+            self._count(dropped=remaining)
+            logger.error("Usage log writer did not drain in time; dropped %d rows", remaining)
+        finally:
+            self._task = None
+
+    def submit(self, user_id: str, action: str, tokens_used: int = 0) -> bool:
+        """
+        ログをキューに積む（待たない）
+
+        Returns:
+            受け付けたか（キュー満杯・停止中はFalseで、droppedに数える）
+        """
+        if not self.running or self._loop is None:
+            self._count(dropped=1)
+            return False
+        row = usage_row(user_id, action, tokens_used)
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            return self._put_nowait(row)
+        self._loop.call_soon_threadsafe(self._put_nowait, row)
+        return True
+
+    async def write(self, user_id: str, action: str, tokens_used: int = 0) -> None:
+        """ログをキューに積む（満杯なら空きが出るまで待つ）"""
+        if not self.running or self._queue is None:
+            raise RuntimeError("Usage log writer is not running")
+        await self._queue.put(usage_row(user_id, action, tokens_used))
+        self._count(enqueued=1)
+
+    def _put_nowait(self, row: dict) -> bool:
+        assert self._queue is not None
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self._count(dropped=1)
+            return False
+        self._count(enqueued=1)
+        return True
+
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for name, value in deltas.items():
+                setattr(self._stats, name, getattr(self._stats, name) + value)
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while not (self._stopping and self._queue.empty()):
+            batch = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+    async def _collect(self) -> list[dict]:
+        """batch_size 件たまるか flush_interval_ms が経過するまで集める"""
+        assert self._queue is not None
+        batch: list[dict] = []
+        deadline = time.monotonic() + self.flush_interval_ms / 1000
+        while len(batch) < self.batch_size:
+            if self._stopping:
+                # 停止中は待たずに残りを取り出す
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+                continue
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            row = await self._next(timeout)
+            if row is None:
+                break
+            batch.append(row)
+        return batch
+
+    async def _next(self, timeout: float) -> dict | None:
+        """次の1件を待つ（タイムアウトまたは停止要求でNone）"""
+        assert self._queue is not None and self._stop_event is not None
+        get = asyncio.ensure_future(self._queue.get())
+        stop = asyncio.ensure_future(self._stop_event.wait())
+        done, pending = await asyncio.wait(
+            {get, stop}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        return get.result() if get in done else None
+
+    async def _flush(self, batch: list[dict]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.to_thread(self._insert, batch)
+            except Exception:
+                self._count(failed_flushes=1)
+                logger.warning(
+                    "Failed to flush %d usage logs (attempt %d)",
+                    len(batch),
+                    attempt + 1,
+                    exc_info=True,
+                )
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self.retry_backoff_ms * 2**attempt / 1000)
+                continue
+            self._count(written=len(batch), batches=1)
+            return
+        self._count(dropped=len(batch))
+        logger.error("Dropped %d usage logs after %d retries", len(batch), self.max_retries)
+
+    def _insert(self, batch: list[dict]) -> None:
+        db = self.session_factory()
+        try:
+            write_usage_rows(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+_writer: UsageLogWriter | None = None
+
+
+def get_usage_writer() -> UsageLogWriter:
+    """利用量ライターのシングルトンを取得（設定値で初期化）"""
+    global _writer
+    if _writer is None:
+        from app.config import get_settings
+
+        settings = get_settings()
+        writer = UsageLogWriter(
+            batch_size=settings.usage_log_batch_size,
+            flush_interval_ms=settings.usage_log_flush_interval_ms,
+            max_queue_size=settings.usage_log_queue_size,
+        )
+        register_metrics_provider("usage_log_writer", lambda: asdict(writer.stats()))
+        _writer = writer
+    return _writer
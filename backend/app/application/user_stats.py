@@ -0,0 +1,226 @@
+"""
+ユーザー統計（user_stats）の差分更新と整合性チェック
+
+プロジェクト・開発ログ・MCPトークンの書き込みと同じトランザクション内で
+apply_stats_delta() を呼び、ダッシュボード用の件数を増減させる。
+差分更新がずれた場合に備え、check_consistency() で実件数と突き合わせて修復できる。
+
+    python -m app.application.user_stats          # 差分の検出のみ
+    python -m app.application.user_stats --fix    # 実件数で上書き
+"""
+
+import argparse
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.infrastructure.database.models import (
+    DevLogEntry,
+    MCPToken,
+    Project,
+    User,
+    UserStats,
+    utc_now,
+)
+
+logger = logging.getLogger(__name__)
+
+_COUNTER_COLUMNS = ("project_count", "devlog_count", "notebook_count", "active_mcp_token_count")
+
+
+@dataclass(frozen=True)
+class UserStatsSnapshot:
+    """ユーザー統計の値"""
+
+    project_count: int = 0
+    devlog_count: int = 0
+    notebook_count: int = 0
+    active_mcp_token_count: int = 0
+
+
+@dataclass(frozen=True)
+class StatsDrift:
+    """保持値と実件数のずれ"""
+
+    user_id: str
+    stored: UserStatsSnapshot | None
+    actual: UserStatsSnapshot
+
+
+def has_notebook(metadata: dict | None) -> bool:
+    """開発ログのmetadataがノートブックを参照しているか"""
+    return (metadata or {}).get("notebook_id") is not None
+
+
+def upsert_insert(db: Session):
+    """ON CONFLICT DO UPDATE を使えるDB方言ごとの insert()"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"upsert is not supported on {dialect}")
+
+
+def apply_stats_delta(
+    db: Session,
+    user_id: str,
+    projects: int = 0,
+    devlogs: int = 0,
+    notebooks: int = 0,
+    mcp_tokens: int = 0,
+) -> None:
+    """
+    ユーザー統計に差分を加算する（行が無ければ作成）
+
+    呼び出し側のトランザクション内でUPSERTを1文発行するだけなので、
+    書き込み本体と同じcommitで確定する。
+    """
+    delta = {
+        "project_count": projects,
+        "devlog_count": devlogs,
+        "notebook_count": notebooks,
+        "active_mcp_token_count": mcp_tokens,
+    }
+    if not any(delta.values()):
+        return
+
+    insert = upsert_insert(db)
+    table = UserStats.__table__
+    stmt = insert(table).values(user_id=user_id, updated_at=utc_now(), **delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name, value in delta.items() if value},
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def _notebook_filter():
+    # metadata.notebook_id が存在しJSON nullでない行（生成列notebook_idの部分インデックスで引ける）
+    return (DevLogEntry.notebook_id.isnot(None),)
+
+
+def project_devlog_counts(db: Session, project_id: str) -> tuple[int, int]:
+    """プロジェクト配下の開発ログ件数とノートブック参照件数（プロジェクト削除時の減算用）"""
+    devlogs, notebooks = (
+        db.query(
+            func.count(DevLogEntry.id),
+            func.count(DevLogEntry.id).filter(*_notebook_filter()),
+        )
+        .filter(DevLogEntry.project_id == project_id)
+        .one()
+    )
+    return devlogs, notebooks
+
+
+def devlog_counts_by_project(db: Session, project_ids: list[str]) -> dict[str, int]:
+    """プロジェクト毎の開発ログ件数を1回のGROUP BYで取得する（一覧表示用、0件のIDは含まない）"""
+    if not project_ids:
+        return {}
+    rows = (
+        db.query(DevLogEntry.project_id, func.count(DevLogEntry.id))
+        .filter(DevLogEntry.project_id.in_(project_ids))
+        .group_by(DevLogEntry.project_id)
+        .all()
+    )
+    return dict(rows)
+
+
+def compute_user_stats(db: Session, user_id: str) -> UserStatsSnapshot:
+    """実テーブルから統計を集計する（差分更新を使わない正解値）"""
+    return UserStatsSnapshot(
+        project_count=db.query(func.count(Project.id)).filter(Project.user_id == user_id).scalar(),
+        devlog_count=db.query(func.count(DevLogEntry.id))
+        .filter(DevLogEntry.user_id == user_id)
+        .scalar(),
+        notebook_count=db.query(func.count(DevLogEntry.id))
+        .filter(DevLogEntry.user_id == user_id, *_notebook_filter())
+        .scalar(),
+        active_mcp_token_count=db.query(func.count(MCPToken.id))
+        .filter(MCPToken.user_id == user_id, MCPToken.revoked_at.is_(None))
+        .scalar(),
+    )
+
+
+def rebuild_user_stats(db: Session, user_id: str) -> UserStatsSnapshot:
+    """
+    ユーザー統計を実件数で上書きする（コミットは呼び出し側）
+
+    初回のダッシュボード表示が同時に来ても一意制約違反にならないよう、UPSERT1文で書く。
+    """
+    actual = compute_user_stats(db, user_id)
+    values = {name: getattr(actual, name) for name in _COUNTER_COLUMNS}
+
+    insert = upsert_insert(db)
+    table = UserStats.__table__
+    stmt = insert(table).values(user_id=user_id, updated_at=utc_now(), **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={name: stmt.excluded[name] for name in (*_COUNTER_COLUMNS, "updated_at")},
+    )
+    db.execute(stmt)
+    # 読み込み済みのORMオブジェクトは古い値のままなので破棄する
+    cached = db.identity_map.get(db.identity_key(UserStats, user_id))
+    if cached is not None:
+        db.expire(cached)
+    return actual
+
+
+def _snapshot(stats: UserStats | None) -> UserStatsSnapshot | None:
+    if stats is None:
+        return None
+    return UserStatsSnapshot(**{name: getattr(stats, name) for name in _COUNTER_COLUMNS})
+
+
+def check_consistency(db: Session, fix: bool = False) -> list[StatsDrift]:
+    """
+    全ユーザーの統計を実件数と突き合わせる
+
+    Args:
+        fix: Trueの場合、ずれていたユーザーの統計を実件数で上書きしてコミットする
+
+    Returns:
+        ずれていたユーザーの一覧
+    """
+    drifts: list[StatsDrift] = []
+    user_ids = [user_id for (user_id,) in db.query(User.id).order_by(User.id)]
+    for user_id in user_ids:
+        stored = _snapshot(db.get(UserStats, user_id))
+        actual = compute_user_stats(db, user_id)
+        # 書き込みが一度も無いユーザーは行を持たない（全て0とみなす）
+        if (stored or UserStatsSnapshot()) == actual:
+            continue
+        drifts.append(StatsDrift(user_id=user_id, stored=stored, actual=actual))
+        logger.warning("user_stats drift (user_id=%s): %s -> %s", user_id, stored, actual)
+        if fix:
+            rebuild_user_stats(db, user_id)
+
+    if fix and drifts:
+        db.commit()
+    return drifts
+
+
+def main() -> None:
+    from app.infrastructure.database.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Check user_stats against the source tables")
+    parser.add_argument("--fix", action="store_true", help="overwrite drifted rows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        drifts = check_consistency(db, fix=args.fix)
+    finally:
+        db.close()
+    print(f"{len(drifts)} user(s) with drifted stats" + (" (fixed)" if args.fix else ""))
+
+
+if __name__ == "__main__":
+    main()
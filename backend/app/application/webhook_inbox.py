@@ -0,0 +1,339 @@
+"""
+Stripe Webhookのトランザクショナルインボックス
+
+受信エンドポイントは署名を検証したイベントを stripe_webhook_events に
+INSERT ... ON CONFLICT DO NOTHING で保存して即座に200を返す（enqueue_event）。
+処理はバックグラウンドの WebhookInboxWorker が行う。
+
+- 同一顧客のイベントは Stripe の作成日時順に1件ずつ処理する。
+  先行イベントが未処理（待機中・処理中・再試行待ち）の間、後続は取り出さない。
+- 失敗したイベントは指数バックオフで再試行し、上限回数を超えたら dead にする。
+- 取り出しは locked_until 付きでリースし、PostgreSQLでは FOR UPDATE SKIP LOCKED で
+  複数ワーカー間の重複取得を防ぐ。リースが切れた処理中イベントは再取得される
+  （少なくとも1回の処理。ハンドラーは同じイベントの再適用に耐える）。
+- 未処理件数と最古の未処理イベントの経過秒数（ラグ）を /api/metrics に公開する。
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, exists, func, or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.application.user_stats import upsert_insert
+from app.infrastructure.database.models import StripeWebhookEvent, generate_uuid, utc_now
+from app.infrastructure.database.session import SessionLocal
+from app.performance.metrics import register_metrics_provider
+
+logger = logging.getLogger(__name__)
+
+# 未処理として後続イベントをブロックする状態
+_OPEN_STATUSES = ("pending", "processing")
+
+Handler = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class InboxStats:
+    """インボックスの状態（ラグ）とワーカーのカウンタ"""
+
+    pending: int = 0
+    dead: int = 0
+    oldest_pending_age_seconds: float = 0.0
+    processed: int = 0
+    failed_attempts: int = 0
+
+
+def enqueue_event(db: Session, payload: bytes | str) -> bool:
+    """
+    検証済みのWebhookペイロードをインボックスに保存する（コミットは呼び出し側）
+
+    Returns:
+        新規に保存したか（同じイベントIDが既にあればFalse）
+    """
+    event = json.loads(payload)
+    data_object = (event.get("data") or {}).get("object") or {}
+    created = event.get("created")
+    table = StripeWebhookEvent.__table__
+    now = utc_now()
+    stmt = (
+        upsert_insert(db)(table)
+        .values(
+            id=generate_uuid(),
+            stripe_event_id=event["id"],
+            event_type=event.get("type", ""),
+            payload=event,
+            customer_id=data_object.get("customer"),
+            stripe_created_at=(
+                datetime.fromtimestamp(created, tz=timezone.utc) if created is not None else now
+            ),
+            status="pending",
+            attempts=0,
+            next_attempt_at=now,
+            received_at=now,
+        )
+        .on_conflict_do_nothing(index_elements=[table.c.stripe_event_id])
+        .returning(table.c.id)
+    )
+    return db.execute(stmt).first() is not None
+
+
+def default_handlers() -> dict[str, Handler]:
+    """イベント種別ごとのBillingServiceハンドラー"""
+    from app.application.billing_service import BillingService
+
+    service = BillingService()
+    return {
+        "checkout.session.completed": service.handle_checkout_completed,
+        "customer.subscription.updated": service.handle_subscription_updated,
+        "customer.subscription.deleted": service.handle_subscription_updated,
+    }
+
+
+class WebhookInboxWorker:
+    """インボックスの未処理イベントを顧客ごとの順序で処理するバックグラウンドワーカー"""
+
+    def __init__(
+        self,
+        poll_interval_seconds: float = 2.0,
+        batch_size: int = 20,
+        max_attempts: int = 8,
+        backoff_base_seconds: float = 5.0,
+        backoff_max_seconds: float = 600.0,
+        lease_seconds: float = 60.0,
+        handlers: dict[str, Handler] | None = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        """
+        Args:
+            poll_interval_seconds: 新着を待つ間隔（notify()で即座に起こせる）
+            batch_size: 1回に取り出す最大件数
+            max_attempts: この回数失敗したら dead にする
+            backoff_base_seconds: 再試行の待機時間の基数（失敗回数ごとに倍増）
+            backoff_max_seconds: 再試行の待機時間の上限
+            lease_seconds: 取り出したイベントを他ワーカーから隠す時間
+            handlers: イベント種別→ハンドラー（省略時はBillingService）
+            session_factory: インボックスの読み書きに使うセッションの生成関数
+        """
+        self.poll_interval_seconds = poll_interval_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.lease_seconds = lease_seconds
+        self.session_factory = session_factory
+        self._handlers = handlers
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._stopping = False
+        self.processed = 0
+        self.failed_attempts = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._stopping
+
+    @property
+    def handlers(self) -> dict[str, Handler]:
+        if self._handlers is None:
+            self._handlers = default_handlers()
+        return self._handlers
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="stripe-webhook-inbox")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """処理中のイベントを終えてから停止する（未処理分は次回起動時に処理）"""
+        if self._task is None:
+            return
+        self._stopping = True
+        self.notify()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        finally:
+            self._task = None
+
+    def notify(self) -> None:
+        """新着イベントがあることを知らせ、待機中のワーカーを起こす"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while not self._stopping:
+            try:
+                handled = await self.process_due()
+            except Exception:
+                logger.error("Stripe webhook inbox poll failed", exc_info=True)
+                handled = 0
+            if handled or self._stopping:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def process_due(self) -> int:
+        """
+        処理可能なイベントを取り出して順に処理する
+
+        Returns:
+            処理を試みた件数
+        """
+        events = await asyncio.to_thread(self._claim)
+        for event_id, event_type, payload in events:
+            if self._stopping:
+                # 取り出し済みの残りはリース切れ後に再取得される
+                break
+            handler = self.handlers.get(event_type)
+            error: str | None = None
+            try:
+                if handler is not None:
+                    await handler(((payload or {}).get("data") or {}).get("object") or {})
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                logger.warning("Stripe webhook %s failed: %s", event_id, error, exc_info=True)
+            await asyncio.to_thread(self._complete, event_id, error)
+        return len(events)
+
+    def _claim(self) -> list[tuple[str, str, dict | None]]:
+        now = utc_now()
+        event = StripeWebhookEvent
+        earlier = aliased(StripeWebhookEvent)
+        # 同一顧客の先行イベントが未処理なら後続は取り出さない
+        blocked = exists().where(
+            earlier.customer_id == event.customer_id,
+            earlier.status.in_(_OPEN_STATUSES),
+            or_(
+                earlier.stripe_created_at < event.stripe_created_at,
+                and_(
+                    earlier.stripe_created_at == event.stripe_created_at,
+                    earlier.stripe_event_id < event.stripe_event_id,
+                ),
+            ),
+        )
+        due = or_(
+            and_(event.status == "pending", event.next_attempt_at <= now),
+            and_(event.status == "processing", event.locked_until <= now),
+        )
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(event.id, event.event_type, event.payload)
+                .where(due, ~blocked)
+                .order_by(event.stripe_created_at, event.stripe_event_id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True, of=event)
+            ).all()
+            if rows:
+                db.execute(
+                    update(event)
+                    .where(event.id.in_([row.id for row in rows]))
+                    .values(
+                        status="processing",
+                        locked_until=now + timedelta(seconds=self.lease_seconds),
+                    )
+                )
+            db.commit()
+            return [(row.id, row.event_type, row.payload) for row in rows]
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _complete(self, event_id: str, error: str | None) -> None:
+        db = self.session_factory()
+        try:
+            event = db.get(StripeWebhookEvent, event_id)
+            if event is None:
+                return
+            now = utc_now()
+            event.attempts = (event.attempts or 0) + 1
+            event.locked_until = None
+            if error is None:
+                event.status = "processed"
+                event.processed_at = now
+                event.last_error = None
+                self.processed += 1
+            else:
+                self.failed_attempts += 1
+                event.last_error = error[:2000]
+                if event.attempts >= self.max_attempts:
+                    event.status = "dead"
+                    logger.error(
+                        "Stripe webhook %s gave up after %d attempts",
+                        event.stripe_event_id,
+                        event.attempts,
+                    )
+                else:
+                    event.status = "pending"
+                    event.next_attempt_at = now + timedelta(seconds=self.backoff(event.attempts))
+            db.commit()
+        finally:
+            db.close()
+
+    def backoff(self, attempts: int) -> float:
+        """attempts回失敗した後の再試行までの秒数"""
+        return min(self.backoff_base_seconds * 2 ** (attempts - 1), self.backoff_max_seconds)
+
+    def stats(self) -> InboxStats:
+        """未処理件数・最古の未処理イベントの経過秒数とカウンタ"""
+        db = self.session_factory()
+        try:
+            event = StripeWebhookEvent
+            pending, dead, oldest = db.execute(
+                select(
+                    func.count().filter(event.status.in_(_OPEN_STATUSES)),
+                    func.count().filter(event.status == "dead"),
+                    func.min(event.received_at).filter(event.status.in_(_OPEN_STATUSES)),
+                )
+            ).one()
+        finally:
+            db.close()
+        if oldest is not None and oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        return InboxStats(
+            pending=pending,
+            dead=dead,
+            oldest_pending_age_seconds=(
+                (utc_now() - oldest).total_seconds() if oldest is not None else 0.0
+            ),
+            processed=self.processed,
+            failed_attempts=self.failed_attempts,
+        )
+
+
+_worker: WebhookInboxWorker | None = None
+
+
+def get_webhook_worker() -> WebhookInboxWorker:
+    """インボックスワーカーのシングルトンを取得（設定値で初期化）"""
+    global _worker
+    if _worker is None:
+        from dataclasses import asdict
+
+        from app.config import get_settings
+
+        settings = get_settings()
+        worker = WebhookInboxWorker(
+            poll_interval_seconds=settings.stripe_webhook_poll_interval_seconds,
+            max_attempts=settings.stripe_webhook_max_attempts,
+            backoff_base_seconds=settings.stripe_webhook_backoff_base_seconds,
+            backoff_max_seconds=settings.stripe_webhook_backoff_max_seconds,
+        )
+        register_metrics_provider("stripe_webhook_inbox", lambda: asdict(worker.stats()))
+        _worker = worker
+    return _worker
@@ -44,10 +44,10 @@ def _is_token_revoked(token: str) -> bool:
     """
     try:
         from app.infrastructure.database.models import MCPToken
-        from app.infrastructure.database.session import SessionLocal
+        from app.infrastructure.database.session import open_session
 
         token_hash = hashlib.sha256(token.encode()).hexdigest()
-        db = SessionLocal()
+        db = open_session()
         try:
             record = db.query(MCPToken).filter(MCPToken.token_hash == token_hash).first()
             # DB記録なし → 通常JWT → revoke対象外
@@ -89,6 +89,11 @@ def get_current_user(authorization: str) -> CurrentUser:
     except (TokenExpiredError, InvalidTokenError) as e:
         raise AuthenticationError(str(e))
 
+    from app.infrastructure.database.session import bind_request_user
+
+    # 書き込み直後の読み取りをプライマリに固定するため、DBを使う前にユーザーを記録
+    bind_request_user(payload.get("sub", ""))
+
     # MCPトークン無効化チェック
     if _is_token_revoked(token):
         raise AuthenticationError("Token has been revoked")
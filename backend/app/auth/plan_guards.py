@@ -1,49 +1,64 @@
 """
 プランベースの利用制限ガード
 
-Freeプランのユーザーに対してプロジェクト数の
+Freeプランのユーザーに対してプロジェクト数・月間トークン数の
 上限を適用する。FastAPI Depends パターンで各エンドポイントに注入。
+プランとプロジェクト数はエンタイトルメントキャッシュ（app.application.entitlements）から
+読むため、キャッシュが有効な間はDBに問い合わせない。
 """
 
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.application.entitlements import FREE_PROJECT_LIMIT, resolve_entitlement
+from app.application.usage_rollup import get_monthly_usage
 from app.auth.dependencies import CurrentUser, get_current_user_dependency
-from app.infrastructure.database.models import Project, User
 from app.infrastructure.database.session import get_db
 
-FREE_PROJECT_LIMIT = 2
+__all__ = [
+    "FREE_PROJECT_LIMIT",
+    "FREE_MONTHLY_TOKEN_LIMIT",
+    "check_project_limit",
+    "check_monthly_usage_limit",
+]
 
+# Freeプランの月間トークン上限（UTCの暦月単位）
+FREE_MONTHLY_TOKEN_LIMIT = 100_000
 
-def _get_user_plan(user_id: str, db: Session) -> str:
+
+async def check_project_limit(
+    current_user: CurrentUser = Depends(get_current_user_dependency),
+    db: Session = Depends(get_db),
+) -> CurrentUser:
     """
-    DBから最新のプランを取得する。
+    Freeプランのプロジェクト作成上限をチェック
 
-    JWTに含まれるplanはトークン発行時点の値であり、
-    Webhook経由でプランが変更されてもJWTは更新されない。
-    そのためDB側の値を正とする。
+    キャッシュによる事前チェック。最終判定は作成時の
+    reserve_project_slot()（条件付きUPSERT）で行う。
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return "free"
-    return user.plan or "free"
+    entitlement = resolve_entitlement(db, current_user.user_id)
+    if not entitlement.can_create_project:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Freeプランではプロジェクトは{FREE_PROJECT_LIMIT}件までです。Proプランにアップグレードしてください。",
+        )
+
+    return current_user
 
 
-async def check_project_limit(
+async def check_monthly_usage_limit(
     current_user: CurrentUser = Depends(get_current_user_dependency),
     db: Session = Depends(get_db),
 ) -> CurrentUser:
-    """Freeプランのプロジェクト作成上限をチェック"""
-    plan = _get_user_plan(current_user.user_id, db)
-    if plan != "free":
+    """Freeプランの月間トークン上限をチェック（月次集計行のみを読む）"""
+    if resolve_entitlement(db, current_user.user_id).plan != "free":
         return current_user
 
-    project_count = db.query(Project).filter(Project.user_id == current_user.user_id).count()
-
-    if project_count >= FREE_PROJECT_LIMIT:
+    usage = get_monthly_usage(db, current_user.user_id)
+    if usage.tokens_used >= FREE_MONTHLY_TOKEN_LIMIT:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"Freeプランではプロジェクトは{FREE_PROJECT_LIMIT}件までです。Proプランにアップグレードしてください。",
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Freeプランの今月の利用上限に達しました。Proプランにアップグレードしてください。",
         )
 
     return current_user
@@ -6,15 +6,17 @@
 - 1536次元のベクトルを生成
 - APIキー管理とレート制限対応
 - リトライロジックとフォールバック処理
+  （試行ごとの期限・Retry-After・p95超過時のヘッジは ResilientExecutor が担う）
 """
 
-import asyncio
 from dataclasses import dataclass
 
 from openai import APIError, AsyncOpenAI
 from openai import RateLimitError as OpenAIRateLimitError
 
 from app.config import get_settings
+from app.infrastructure.openai import openai_client_options, openai_executor
+from app.performance.resilient_executor import RetryPolicy
 
 
 class EmbeddingError(Exception):
@@ -35,8 +37,8 @@ class EmbeddingConfig:
 
     model: str = "text-embedding-3-small"
     dimensions: int = 1536
-    max_retries: int = 3
-    retry_delay: float = 1.0  # 秒
+    max_retries: int = 3  # 試行回数の上限（初回を含む）
+    retry_delay: float = 1.0  # バックオフの基準秒数（ジッター付きで倍々）
 
 
 @dataclass
@@ -71,11 +73,19 @@ class EmbeddingService:
         """
         self.config = config or EmbeddingConfig()
 
-        if api_key is None:
-            settings = get_settings()
-            api_key = settings.openai_api_key
-
-        self._client = AsyncOpenAI(api_key=api_key)
+        # 接続はプロセス共有のHTTPプールを使い回す（生成ごとのTLSハンドシェイクを避ける）
+        self._client = AsyncOpenAI(**openai_client_options(api_key))
+        settings = get_settings()
+        self._executor = openai_executor(
+            "embeddings",
+            RetryPolicy(
+                max_attempts=self.config.max_retries,
+                attempt_timeout_seconds=settings.openai_embedding_timeout_seconds,
+                backoff_base_seconds=self.config.retry_delay,
+                backoff_max_seconds=settings.openai_backoff_max_seconds,
+                hedge=settings.openai_hedge_embeddings,
+            ),
+        )
 
     async def embed_text(self, text: str) -> EmbeddingResult:
         """
@@ -116,77 +126,45 @@ class EmbeddingService:
 
         return await self._embed_batch_with_retry(texts)
 
-    async def _embed_with_retry(self, text: str) -> EmbeddingResult:
-        """リトライロジック付きで埋め込み生成"""
-        last_error: Exception | None = None
-
-        for attempt in range(self.config.max_retries):
-            try:
-                response = await self._client.embeddings.create(
-                    input=text,
+    async def _create(self, input: str | list[str]):
+        """リトライ・試行ごとの期限・ヘッジ付きで embeddings.create を呼ぶ"""
+        try:
+            return await self._executor.run(
+                lambda: self._client.embeddings.create(
+                    input=input,
                     model=self.config.model,
                     dimensions=self.config.dimensions,
                 )
+            )
+        except OpenAIRateLimitError as e:
+            raise RateLimitError(
+                f"Rate limit exceeded after {self.config.max_retries} retries"
+            ) from e
+        except TimeoutError as e:
+            raise EmbeddingError(f"OpenAI API timeout: {e}") from e
+        except APIError as e:
+            raise EmbeddingError(f"OpenAI API error: {e}") from e
 
-                return EmbeddingResult(
-                    text=text,
-                    embedding=response.data[0].embedding,
-                    model=self.config.model,
-                    usage_tokens=response.usage.total_tokens,
-                )
-
-            except OpenAIRateLimitError as e:
-                last_error = e
-                if attempt < self.config.max_retries - 1:
-                    # エクスポネンシャルバックオフ
-                    delay = self.config.retry_delay * (2**attempt)
-                    await asyncio.sleep(delay)
-                continue
-
-            except APIError as e:
-                raise EmbeddingError(f"OpenAI API error: {e}") from e
-
-        raise RateLimitError(
-            f"Rate limit exceeded after {self.config.max_retries} retries"
-        ) from last_error
+    async def _embed_with_retry(self, text: str) -> EmbeddingResult:
+        """リトライロジック付きで埋め込み生成"""
+        response = await self._create(text)
+        return EmbeddingResult(
+            text=text,
+            embedding=response.data[0].embedding,
+            model=self.config.model,
+            usage_tokens=response.usage.total_tokens,
+        )
 
     async def _embed_batch_with_retry(self, texts: list[str]) -> list[EmbeddingResult]:
         """リトライロジック付きで一括埋め込み生成"""
-        last_error: Exception | None = None
-
-        for attempt in range(self.config.max_retries):
-            try:
-                response = await self._client.embeddings.create(
-                    input=texts,
-                    model=self.config.model,
-                    dimensions=self.config.dimensions,
-                )
-
-                results = []
-                tokens_per_text = response.usage.total_tokens // len(texts)
-
-                for i, text in enumerate(texts):
-                    results.append(
-                        EmbeddingResult(
-                            text=text,
-                            embedding=response.data[i].embedding,
-                            model=self.config.model,
-                            usage_tokens=tokens_per_text,
-                        )
-                    )
-
-                return results
-
-            except OpenAIRateLimitError as e:
-                last_error = e
-                if attempt < self.config.max_retries - 1:
-                    delay = self.config.retry_delay * (2**attempt)
-                    await asyncio.sleep(delay)
-                continue
-
-            except APIError as e:
-                raise EmbeddingError(f"OpenAI API error: {e}") from e
-
-        raise RateLimitError(
-            f"Rate limit exceeded after {self.config.max_retries} retries"
-        ) from last_error
+        response = await self._create(texts)
+        tokens_per_text = response.usage.total_tokens // len(texts)
+        return [
+            EmbeddingResult(
+                text=text,
+                embedding=response.data[i].embedding,
+                model=self.config.model,
+                usage_tokens=tokens_per_text,
+            )
+            for i, text in enumerate(texts)
+        ]
@@ -9,6 +9,8 @@ from typing import Any
 from openai import AsyncOpenAI
 
 from app.config import get_settings
+from app.infrastructure.openai import openai_client_options, openai_executor
+from app.performance.resilient_executor import RetryPolicy
 
 
 @dataclass
@@ -18,6 +20,8 @@ class LLMConfig:
     model: str = "gpt-4o-mini"  # デフォルトはFreeプラン向け
     temperature: float = 0.7
     max_tokens: int = 2000
+    max_retries: int = 3  # 試行回数の上限（初回を含む）
+    retry_delay: float = 1.0  # バックオフの基準秒数（ジッター付きで倍々）
 
 
 class LLMService:
@@ -35,11 +39,19 @@ class LLMService:
     ):
         self.config = config or LLMConfig()
 
-        if api_key is None:
-            settings = get_settings()
-            api_key = settings.openai_api_key
-
-        self._client = AsyncOpenAI(api_key=api_key)
+        # 接続はプロセス共有のHTTPプールを使い回す（生成ごとのTLSハンドシェイクを避ける）
+        self._client = AsyncOpenAI(**openai_client_options(api_key))
+        settings = get_settings()
+        # 生成は高コストで応答も長いので、ヘッジはせず試行ごとの期限とリトライのみ
+        self._executor = openai_executor(
+            "chat",
+            RetryPolicy(
+                max_attempts=self.config.max_retries,
+                attempt_timeout_seconds=settings.openai_chat_timeout_seconds,
+                backoff_base_seconds=self.config.retry_delay,
+                backoff_max_seconds=settings.openai_backoff_max_seconds,
+            ),
+        )
 
     @classmethod
     def for_plan(cls, plan: str) -> "LLMService":
@@ -55,10 +67,21 @@ class LLMService:
             config = LLMConfig(model="gpt-4o-mini", temperature=0.7, max_tokens=2000)
         return cls(config=config)
 
+    async def _complete(self, messages: list[dict[str, str]], **kwargs: Any):
+        """リトライ・試行ごとの期限付きで chat.completions.create を呼ぶ"""
+        return await self._executor.run(
+            lambda: self._client.chat.completions.create(
+                model=self.config.model,
+                messages=messages,
+                temperature=self.config.temperature,
+                max_tokens=self.config.max_tokens,
+                **kwargs,
+            )
+        )
+
     async def generate_summary(self, prompt: str) -> str:
         """テキスト要約を生成"""
-        response = await self._client.chat.completions.create(
-            model=self.config.model,
+        response = await self._complete(
             messages=[
                 {
                     "role": "system",
@@ -70,16 +93,13 @@ class LLMService:
                 },
                 {"role": "user", "content": prompt},
             ],
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens,
         )
 
         return response.choices[0].message.content or ""
 
     async def generate_analysis(self, prompt: str) -> dict[str, Any]:
         """分析結果を生成（JSON形式）"""
-        response = await self._client.chat.completions.create(
-            model=self.config.model,
+        response = await self._complete(
             messages=[
                 {
                     "role": "system",
@@ -90,8 +110,6 @@ class LLMService:
                 },
                 {"role": "user", "content": prompt},
             ],
-            temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens,
             response_format={"type": "json_object"},
         )
 
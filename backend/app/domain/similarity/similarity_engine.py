@@ -5,12 +5,15 @@ PostgreSQL + pgvector を使用したベクトル類似検索。
 Qdrantは廃止され、embeddingはdevlog_entriesテーブルに直接保存される。
 """
 
+import json
 from dataclasses import dataclass
 
 from sqlalchemy import text
+from sqlalchemy.orm import Session
 
 from app.domain.embedding.embedding_service import EmbeddingService
-from app.infrastructure.database.session import get_db
+from app.infrastructure.database.models import DevLogEntry, with_embedding
+from app.infrastructure.database.session import get_db, open_session
 
 
 @dataclass
@@ -78,58 +81,9 @@ class SimilarityEngine:
         """
         # クエリテキストのembeddingを生成
         embedding_result = await self._embedding.embed_text(query_text)
-        embedding_str = "[" + ",".join(str(v) for v in embedding_result.embedding) + "]"
-
-        # pgvector コサイン距離検索
-        sql = """
-            SELECT
-                id,
-                project_id,
-                summary,
-                entry_type,
-                1 - (embedding <=> :query_embedding::vector) AS similarity_score
-            FROM devlog_entries
-            WHERE user_id = :user_id
-              AND embedding IS NOT NULL
-        """
-
-        params: dict = {
-            "query_embedding": embedding_str,
-            "user_id": user_id,
-        }
-
-        if filters:
-            if filters.entry_types:
-                sql += " AND entry_type = ANY(:entry_types)"
-                params["entry_types"] = filters.entry_types
-            if filters.technologies:
-                sql += " AND technologies ?| :technologies"
-                params["technologies"] = filters.technologies
-
-        sql += " ORDER BY embedding <=> :query_embedding::vector LIMIT :limit"
-        params["limit"] = limit
-
-        db_gen = get_db()
-        db = next(db_gen)
-        try:
-            result = db.execute(text(sql), params)
-            rows = result.fetchall()
-
-            return [
-                SimilarityResult(
-                    devlog_id=row[0],
-                    project_id=row[1],
-                    score=float(row[4]) if row[4] is not None else 0.0,
-                    summary=row[2],
-                    entry_type=row[3],
-                )
-                for row in rows
-            ]
-        finally:
-            try:
-                next(db_gen)
-            except StopIteration:
-                pass
+        return self.search_by_embedding(
+            embedding_result.embedding, user_id, limit=limit, filters=filters
+        )
 
     async def find_similar_in_project(
         self,
@@ -148,49 +102,157 @@ class SimilarityEngine:
             limit: 取得件数
         """
         embedding_result = await self._embedding.embed_text(query_text)
-        embedding_str = "[" + ",".join(str(v) for v in embedding_result.embedding) + "]"
+        return self.search_by_embedding(
+            embedding_result.embedding, user_id, limit=limit, project_id=project_id
+        )
+
+    def find_similar_to_devlog(
+        self,
+        devlog_id: str,
+        user_id: str,
+        limit: int = 5,
+        db: Session | None = None,
+    ) -> list[SimilarityResult]:
+        """
+        保存済みのembeddingを使い、指定した開発ログに類似した開発ログを検索する。
+
+        embeddingを再生成しないのでOpenAIは呼ばない。元の開発ログ自身は結果に含めない。
+
+        Args:
+            devlog_id: 基準にする開発ログID
+            user_id: ユーザーID（データ分離用）
+            limit: 取得件数
+            db: 使用するセッション（Noneの場合は新規に取得）
+
+        Returns:
+            類似度スコア順の開発ログリスト（embedding未生成・存在しない場合は空）
+        """
+        owned = db is None
+        session = open_session() if db is None else db
+        try:
+            # embeddingは既定で遅延ロード（raiseload）なので明示的に読み込む
+            entry = (
+                session.query(DevLogEntry)
+                .options(with_embedding())
+                .filter(DevLogEntry.id == devlog_id, DevLogEntry.user_id == user_id)
+                .first()
+            )
+            if entry is None or entry.embedding is None:
+                return []
+            return self.search_by_embedding(
+                [float(v) for v in entry.embedding],
+                user_id,
+                limit=limit,
+                exclude_devlog_id=entry.id,
+                db=session,
+            )
+        finally:
+            if owned:
+                session.close()
 
+    def search_by_embedding(
+        self,
+        embedding: list[float],
+        user_id: str,
+        limit: int = 10,
+        filters: DevLogFilter | None = None,
+        project_id: str | None = None,
+        db: Session | None = None,
+        exclude_devlog_id: str | None = None,
+    ) -> list[SimilarityResult]:
+        """
+        embeddingベクトルで開発ログをコサイン距離検索する。
+
+        Args:
+            embedding: クエリベクトル
+            user_id: ユーザーID（データ分離用）
+            limit: 取得件数
+            filters: フィルター条件
+            project_id: 指定時はプロジェクト内に限定
+            db: 使用するセッション（Noneの場合は新規に取得）
+            exclude_devlog_id: 指定時はこの開発ログを結果から除く
+
+        Returns:
+            類似度スコア順の開発ログリスト
+        """
+        sql, params = self._build_search_query(
+            embedding, user_id, limit, filters, project_id, exclude_devlog_id
+        )
+
+        if db is not None:
+            return self._to_results(db.execute(text(sql), params).fetchall())
+
+        db_gen = get_db()
+        db = next(db_gen)
+        try:
+            return self._to_results(db.execute(text(sql), params).fetchall())
+        finally:
+            try:
+                next(db_gen)
+            except StopIteration:
+                pass
+
+    def _build_search_query(
+        self,
+        embedding: list[float],
+        user_id: str,
+        limit: int,
+        filters: DevLogFilter | None,
+        project_id: str | None,
+        exclude_devlog_id: str | None = None,
+    ) -> tuple[str, dict]:
+        """pgvector コサイン距離検索のSQLとパラメータを組み立てる"""
+        # :name::vector はバインド変数として解釈されないためCASTを使う
         sql = """
             SELECT
                 id,
                 project_id,
                 summary,
                 entry_type,
-                1 - (embedding <=> :query_embedding::vector) AS similarity_score
+                1 - (embedding <=> CAST(:query_embedding AS vector)) AS similarity_score
             FROM devlog_entries
             WHERE user_id = :user_id
-              AND project_id = :project_id
               AND embedding IS NOT NULL
-            ORDER BY embedding <=> :query_embedding::vector
-            LIMIT :limit
         """
 
-        db_gen = get_db()
-        db = next(db_gen)
-        try:
-            result = db.execute(
-                text(sql),
-                {
-                    "query_embedding": embedding_str,
-                    "user_id": user_id,
-                    "project_id": project_id,
-                    "limit": limit,
-                },
+        params: dict = {
+            "query_embedding": "[" + ",".join(str(v) for v in embedding) + "]",
+            "user_id": user_id,
+        }
+
+        if project_id is not None:
+            sql += " AND project_id = :project_id"
+            params["project_id"] = project_id
+
+        if exclude_devlog_id is not None:
+            sql += " AND id <> :exclude_devlog_id"
+            params["exclude_devlog_id"] = exclude_devlog_id
+
+        if filters:
+            if filters.entry_types:
+                sql += " AND entry_type = ANY(:entry_types)"
+                params["entry_types"] = filters.entry_types
+            if filters.technologies:
+                # GIN（jsonb_path_ops）が使えるよう、タグごとの @> をORで結合する
+                clauses = []
+                for i, name in enumerate(filters.technologies):
+                    clauses.append(f"technologies @> CAST(:technology_{i} AS jsonb)")
+                    params[f"technology_{i}"] = json.dumps([name])
+                sql += " AND (" + " OR ".join(clauses) + ")"
+
+        sql += " ORDER BY embedding <=> CAST(:query_embedding AS vector) LIMIT :limit"
+        params["limit"] = limit
+        return sql, params
+
+    @staticmethod
+    def _to_results(rows) -> list[SimilarityResult]:
+        return [
+            SimilarityResult(
+                devlog_id=row[0],
+                project_id=row[1],
+                score=float(row[4]) if row[4] is not None else 0.0,
+                summary=row[2],
+                entry_type=row[3],
             )
-            rows = result.fetchall()
-
-            return [
-                SimilarityResult(
-                    devlog_id=row[0],
-                    project_id=row[1],
-                    score=float(row[4]) if row[4] is not None else 0.0,
-                    summary=row[2],
-                    entry_type=row[3],
-                )
-                for row in rows
-            ]
-        finally:
-            try:
-                next(db_gen)
-            except StopIteration:
-                pass
+            for row in rows
+        ]
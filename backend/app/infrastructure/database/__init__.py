@@ -5,10 +5,16 @@ from app.infrastructure.database.models import (
     DevLogEntry,
     Project,
     Subscription,
+    UsageDailyRollup,
     UsageLog,
+    UsageMonthlyRollup,
     User,
+    UserStats,
+    UserTechnologyStats,
+    with_detail,
+    with_embedding,
 )
-from app.infrastructure.database.session import engine, get_db
+from app.infrastructure.database.session import get_db, get_engine
 
 __all__ = [
     "Base",
@@ -16,7 +22,21 @@ __all__ = [
     "Project",
     "DevLogEntry",
     "UsageLog",
+    "UsageDailyRollup",
+    "UsageMonthlyRollup",
     "Subscription",
+    "UserStats",
+    "UserTechnologyStats",
+    "with_embedding",
+    "with_detail",
     "get_db",
     "engine",
+    "get_engine",
 ]
+
+
+def __getattr__(name: str):
+    # 互換: engine は初回参照時に作成する（import時にDBドライバを読み込まない）
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,19 +6,26 @@ MEX App（AI開発ポートフォリオ）向けスキーマ
 import uuid
 from datetime import datetime, timezone
 
-from pgvector.sqlalchemy import Vector
 from sqlalchemy import (
+    DDL,
     JSON,
+    BigInteger,
     Boolean,
     Column,
+    Computed,
+    Date,
     DateTime,
     ForeignKey,
     Index,
     Integer,
     String,
     Text,
+    event,
+    text,
 )
-from sqlalchemy.orm import DeclarativeBase, relationship
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase, deferred, relationship, undefer
+from sqlalchemy.types import Float, TypeEngine, UserDefinedType
 
 
 class Base(DeclarativeBase):
@@ -32,6 +39,54 @@ def generate_uuid() -> str:
     return str(uuid.uuid4())
 
 
+class Vector(UserDefinedType):
+    """
+    pgvectorのvector型
+
+    値の変換は pgvector.sqlalchemy に委ねるが、読み込みは最初にembeddingを
+    書き込み・取得する時まで遅らせる（モデル定義のimportでpgvectorを読み込まない）。
+    """
+
+    cache_ok = True
+
+    def __init__(self, dim: int | None = None):
+        super().__init__()
+        self.dim = dim
+
+    def get_col_spec(self, **kw) -> str:
+        return "VECTOR" if self.dim is None else f"VECTOR({self.dim})"
+
+    def _pgvector(self) -> TypeEngine:
+        from pgvector.sqlalchemy import Vector as PgVector
+
+        return PgVector(self.dim)
+
+    def bind_processor(self, dialect):
+        return self._pgvector().bind_processor(dialect)
+
+    def literal_processor(self, dialect):
+        return self._pgvector().literal_processor(dialect)
+
+    def result_processor(self, dialect, coltype):
+        return self._pgvector().result_processor(dialect, coltype)
+
+    class Comparator(UserDefinedType.Comparator):
+        def l2_distance(self, other):
+            return self.op("<->", return_type=Float)(other)
+
+        def max_inner_product(self, other):
+            return self.op("<#>", return_type=Float)(other)
+
+        def cosine_distance(self, other):
+            return self.op("<=>", return_type=Float)(other)
+
+    comparator_factory = Comparator
+
+
+# PostgreSQLではJSONB（GINインデックス・包含演算子の対象）、他DBでは汎用JSON
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
 def utc_now() -> datetime:
     """現在のUTC時刻を返す"""
     return datetime.now(timezone.utc)
@@ -81,7 +136,7 @@ class Project(Base):
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    technologies = Column(JSON, default=list)
+    technologies = Column(JSONDocument, default=list)
     repository_url = Column(String(500), nullable=True)
     demo_url = Column(String(500), nullable=True)
     status = Column(String(20), nullable=False, default="in_progress")
@@ -98,6 +153,12 @@ class Project(Base):
         Index("idx_projects_user_id", "user_id"),
         Index("idx_projects_status", "status"),
         Index("idx_projects_is_public", "is_public"),
+        Index(
+            "idx_projects_technologies_gin",
+            "technologies",
+            postgresql_using="gin",
+            postgresql_ops={"technologies": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
 
@@ -117,15 +178,22 @@ class DevLogEntry(Base):
     entry_type = Column(String(30), nullable=False)
 
     summary = Column(String(500), nullable=False)
-    detail = Column(Text, nullable=True)
-    technologies = Column(JSON, default=list)
+    # 本文は一覧では不要なため遅延ロード（必要な場合は with_detail()）
+    detail = deferred(Column(Text, nullable=True))
+    technologies = Column(JSONDocument, default=list)
     ai_tool = Column(String(50), nullable=True)
     created_at = Column(DateTime(timezone=True), default=utc_now)
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
     # SQLAlchemyの予約語と衝突を避けるため属性名はmetadata_にする
-    metadata_ = Column("metadata", JSON, default=dict)
+    metadata_ = Column("metadata", JSONDocument, default=dict)
+    # 頻繁に参照するキーは生成列に昇格し、部分インデックスで引けるようにする
+    notebook_id = Column(Text, Computed("metadata ->> 'notebook_id'", persisted=True))
+    source_url = Column(Text, Computed("metadata ->> 'source_url'", persisted=True))
 
     # pgvector: 類似検索用のembeddingベクトル（1536次元, text-embedding-3-small）
-    embedding = Column(Vector(1536), nullable=True)
+    # 1行あたり約6KBあるため既定では取得しない。with_embedding() なしで参照すると
+    # 行ごとの遅延ロードにならないよう例外にする（raiseload）
+    embedding = deferred(Column(Vector(1536), nullable=True), raiseload=True)
 
     # Relationships
     project = relationship("Project", back_populates="devlog_entries")
@@ -134,13 +202,53 @@ class DevLogEntry(Base):
         Index("idx_devlog_entries_user_id", "user_id"),
         Index("idx_devlog_entries_created_at", "created_at"),
         Index("idx_devlog_entries_entry_type", "entry_type"),
+        Index("idx_devlog_entries_project_updated_at", "project_id", "updated_at"),
+        Index(
+            "idx_devlog_entries_user_notebook",
+            "user_id",
+            postgresql_where=text("notebook_id IS NOT NULL"),
+            sqlite_where=text("notebook_id IS NOT NULL"),
+        ),
+        Index(
+            "idx_devlog_entries_source_url",
+            "user_id",
+            "source_url",
+            postgresql_where=text("source_url IS NOT NULL"),
+            sqlite_where=text("source_url IS NOT NULL"),
+        ),
+        Index(
+            "idx_devlog_entries_metadata_gin",
+            "metadata",
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "idx_devlog_entries_technologies_gin",
+            "technologies",
+            postgresql_using="gin",
+            postgresql_ops={"technologies": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
 
+def with_embedding():
+    """embedding列を読み込むローダーオプション（埋め込み生成・類似検索用）"""
+    return undefer(DevLogEntry.embedding)
+
+
+def with_detail():
+    """detail列をまとめて読み込むローダーオプション（本文を返す一覧用）"""
+    return undefer(DevLogEntry.detail)
+
+
 class UsageLog(Base):
     """
     利用量ログテーブル
     各API呼び出しを記録
+
+    PostgreSQLでは created_at の月単位でレンジパーティション分割する
+    （パーティションキーを含めるため主キーは (id, created_at)）。
+    集計は usage_daily_rollups / usage_monthly_rollups を使う。
     """
 
     __tablename__ = "usage_logs"
@@ -149,14 +257,55 @@ class UsageLog(Base):
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     action = Column(String(50), nullable=False)  # idea_sparring, retrospective
     tokens_used = Column(Integer, nullable=False, default=0)
-    created_at = Column(DateTime(timezone=True), default=utc_now)
+    created_at = Column(DateTime(timezone=True), primary_key=True, default=utc_now)
 
     __table_args__ = (
-        Index("idx_usage_logs_user_id", "user_id"),
-        Index("idx_usage_logs_created_at", "created_at"),
+        Index("idx_usage_logs_user_created_at", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
 
+# create_all で作った場合も行の行き先が無くならないよう DEFAULT パーティションを用意する
+# （月別パーティションは app.application.usage_rollup の ensure_usage_log_partitions で作成）
+event.listen(
+    UsageLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS usage_logs_default PARTITION OF usage_logs DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+
+class UsageDailyRollup(Base):
+    """
+    利用量の日次集計テーブル（ユーザー・日・アクション単位、UTC）
+    利用量ライターがusage_logsと同じトランザクションで加算する
+    """
+
+    __tablename__ = "usage_daily_rollups"
+
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    action = Column(String(50), primary_key=True)
+    tokens_used = Column(BigInteger, nullable=False, default=0)
+    event_count = Column(Integer, nullable=False, default=0)
+
+
+class UsageMonthlyRollup(Base):
+    """
+    利用量の月次集計テーブル（ユーザー・月初日・アクション単位、UTC）
+    プランの月間上限チェックは主キーの前方一致で読むだけで済む
+    """
+
+    __tablename__ = "usage_monthly_rollups"
+
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    action = Column(String(50), primary_key=True)
+    tokens_used = Column(BigInteger, nullable=False, default=0)
+    event_count = Column(Integer, nullable=False, default=0)
+
+
 class Subscription(Base):
     """
     サブスクリプションテーブル
@@ -205,10 +354,46 @@ class MCPToken(Base):
     )
 
 
+class UserStats(Base):
+    """
+    ユーザー統計テーブル
+    ダッシュボード用の件数を書き込み時に差分更新で保持する
+    （app.application.user_stats の apply_stats_delta / check_consistency）
+    """
+
+    __tablename__ = "user_stats"
+
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    project_count = Column(Integer, nullable=False, default=0)
+    devlog_count = Column(Integer, nullable=False, default=0)
+    notebook_count = Column(Integer, nullable=False, default=0)
+    active_mcp_token_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
+
+
+class UserTechnologyStats(Base):
+    """
+    ユーザー別の技術タグ集計テーブル
+    開発ログの technologies を書き込み時に差分更新で集計する
+    （app.application.technology_stats の apply_technology_delta / rebuild_technology_stats）
+    """
+
+    __tablename__ = "user_technology_stats"
+
+    user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    technology = Column(String(100), primary_key=True)
+    entry_count = Column(Integer, nullable=False, default=0)
+    # 公開プロジェクト配下の件数（公開ポートフォリオ用）
+    public_entry_count = Column(Integer, nullable=False, default=0)
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+
+
 class StripeWebhookEvent(Base):
     """
-    Stripe Webhookイベント重複排除テーブル
-    同一イベントの二重処理を防止する
+    Stripe Webhookイベントの受信箱（トランザクショナルインボックス）
+    受信時は検証済みの生イベントを保存するだけで応答し、
+    バックグラウンドワーカー（app.application.webhook_inbox）が顧客ごとの順序で処理する。
+    stripe_event_id の一意制約で同一イベントの二重登録を防止する
     """
 
     __tablename__ = "stripe_webhook_events"
@@ -216,6 +401,22 @@ class StripeWebhookEvent(Base):
     id = Column(String(36), primary_key=True, default=generate_uuid)
     stripe_event_id = Column(String(255), nullable=False, unique=True)
     event_type = Column(String(100), nullable=False)
-    processed_at = Column(DateTime(timezone=True), default=utc_now)
+    payload = Column(JSONDocument, nullable=True)
+    # 同一顧客のイベントは stripe_created_at 順に処理する
+    customer_id = Column(String(255), nullable=True)
+    stripe_created_at = Column(DateTime(timezone=True), nullable=True)
+    status = Column(
+        String(20), nullable=False, default="pending"
+    )  # pending, processing, processed, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), default=utc_now)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    received_at = Column(DateTime(timezone=True), default=utc_now)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
 
-    __table_args__ = (Index("idx_stripe_webhook_events_stripe_event_id", "stripe_event_id"),)
+    __table_args__ = (
+        Index("idx_stripe_webhook_events_stripe_event_id", "stripe_event_id"),
+        Index("idx_stripe_webhook_events_status_next_attempt", "status", "next_attempt_at"),
+        Index("idx_stripe_webhook_events_customer_created", "customer_id", "stripe_created_at"),
+    )
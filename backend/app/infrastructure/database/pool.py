@@ -0,0 +1,170 @@
+"""
+コネクションプールの計測・接続確認戦略・ウォームアップ
+
+- InstrumentedQueuePool: チェックアウト待ち時間・使用中/オーバーフロー数・
+  タイムアウト回数を記録し、/api/metrics（db_pool）に公開する。
+- 接続確認戦略（db_pre_ping）:
+    pessimistic: チェックアウトごとに接続を確認する（1往復増えるが切断済み接続を使わない）
+    optimistic: 確認せずに使い、切断エラーが起きたらプール全体を無効化して
+                以降のチェックアウトで張り直す（失敗したリクエストはエラーになる）
+- warm_up_pool: 起動時に接続を先に開き、最初のリクエストで接続確立を待たせない。
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, create_engine, event, exc
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+PRE_PING_STRATEGIES = ("pessimistic", "optimistic")
+
+
+@dataclass
+class PoolStats:
+    """コネクションプールの状態とカウンタ"""
+
+    size: int
+    in_use: int
+    idle: int
+    overflow: int
+    peak_in_use: int
+    checkouts: int
+    waited_checkouts: int
+    total_wait_ms: float
+    max_wait_ms: float
+    timeouts: int
+    disconnects: int
+
+
+class InstrumentedQueuePool(QueuePool):
+    """チェックアウト待ち時間とタイムアウトを記録するQueuePool"""
+
+    # この時間以上かかったチェックアウトを「待ちが発生した」とみなす
+    WAIT_THRESHOLD_MS = 1.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._waited = 0
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+        self._timeouts = 0
+        self._peak_in_use = 0
+        self.disconnects = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self._checkouts += 1
+            self._total_wait_ms += wait_ms
+            self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+            if wait_ms >= self.WAIT_THRESHOLD_MS:
+                self._waited += 1
+            self._peak_in_use = max(self._peak_in_use, self.checkedout())
+        return record
+
+    def stats(self) -> PoolStats:
+        with self._stats_lock:
+            return PoolStats(
+                size=self.size(),
+                in_use=self.checkedout(),
+                idle=self.checkedin(),
+                overflow=max(self.overflow(), 0),
+                peak_in_use=self._peak_in_use,
+                checkouts=self._checkouts,
+                waited_checkouts=self._waited,
+                total_wait_ms=self._total_wait_ms,
+                max_wait_ms=self._max_wait_ms,
+                timeouts=self._timeouts,
+                disconnects=self.disconnects,
+            )
+
+
+def _count_disconnects(context: ExceptionContext) -> None:
+    if not context.is_disconnect:
+        return
+    engine = context.engine
+    pool = engine.pool if engine is not None else None
+    if isinstance(pool, InstrumentedQueuePool):
+        pool.disconnects += 1
+    # 1本切れていれば同時に作られた他の接続も切れている可能性が高いので、プールごと張り直す
+    context.invalidate_pool_on_disconnect = True
+    logger.warning("Database connection lost; invalidating the connection pool")
+
+
+def create_pooled_engine(
+    url: str,
+    *,
+    pool_size: int,
+    max_overflow: int,
+    pool_timeout: float = 30,
+    pool_recycle: int = 3600,
+    pre_ping: str = "pessimistic",
+    echo: bool = False,
+) -> Engine:
+    """
+    計測付きプールのエンジンを作成する
+
+    Args:
+        pre_ping: 接続確認戦略（"pessimistic" または "optimistic"）
+    """
+    if pre_ping not in PRE_PING_STRATEGIES:
+        raise ValueError(f"Unknown pre-ping strategy: {pre_ping}")
+    engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=pre_ping == "pessimistic",
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        echo=echo,
+    )
+    event.listen(engine, "handle_error", _count_disconnects)
+    return engine
+
+
+def warm_up_pool(engine: Engine, connections: int) -> int:
+    """
+    プールに接続を先に開いておく
+
+    Args:
+        connections: 開く接続数（pool_sizeを超える分はオーバーフローなので開かない）
+
+    Returns:
+        開いた接続数
+    """
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        connections = min(connections, pool.size())
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.raw_connection())
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+def pool_stats(engine: Engine) -> dict:
+    """/api/metrics 用のプール統計（計測付きプールでなければ空）"""
+    from dataclasses import asdict
+
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {}
+    return asdict(pool.stats())
@@ -0,0 +1,161 @@
+"""
+読み取りレプリカへのルーティング
+
+読み取り専用と宣言したルート（read_intent 依存関係）のリクエストは、
+DATABASE_READ_URL のレプリカに接続する。ただし次の場合はプライマリを使う。
+
+- 直近 read_your_writes_seconds 秒以内に同じユーザーが書き込んでいる
+  （自分の変更が反映前のレプリカから読まれないようにする）
+- レプリカの遅延が read_replica_max_lag_seconds を超えている、または遅延を確認できない
+
+書き込み時刻はワーカー内のメモリに保持する（複数ワーカー構成では
+同じユーザーの後続リクエストが別ワーカーに届くと、遅延の上限までは古い値が見えうる）。
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, text
+
+logger = logging.getLogger(__name__)
+
+# WALを全て適用済みなら遅延0、それ以外は最後に適用したトランザクションからの経過秒数
+_PG_REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() IS NULL THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def probe_replica_lag(engine: Engine) -> float:
+    """レプリカの遅延秒数を問い合わせる（PostgreSQL以外は常に0）"""
+    if engine.dialect.name != "postgresql":
+        return 0.0
+    with engine.connect() as connection:
+        return float(connection.execute(_PG_REPLICA_LAG_SQL).scalar_one())
+
+
+@dataclass
+class ReadRoutingStats:
+    """読み取りルーティングのカウンタ"""
+
+    replica_reads: int
+    sticky_primary_reads: int
+    lagging_primary_reads: int
+    last_lag_seconds: float | None
+    sticky_users: int
+
+
+class ReadReplicaRouter:
+    """読み取りをレプリカに振り分け、書き込み直後と遅延時はプライマリに戻す"""
+
+    def __init__(
+        self,
+        replica: Engine,
+        max_lag_seconds: float = 5.0,
+        read_your_writes_seconds: float = 5.0,
+        lag_check_interval_seconds: float = 1.0,
+        lag_probe: Callable[[Engine], float] = probe_replica_lag,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            replica: レプリカのエンジン
+            max_lag_seconds: これを超えて遅れているレプリカは使わない
+            read_your_writes_seconds: 書き込み後にそのユーザーの読み取りをプライマリに固定する秒数
+            lag_check_interval_seconds: 遅延の問い合わせ結果を使い回す秒数
+            lag_probe: 遅延秒数を返す関数（テストで差し替える）
+            clock: 単調増加する時刻関数
+        """
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.lag_check_interval_seconds = lag_check_interval_seconds
+        self._lag_probe = lag_probe
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_writes: dict[str, float] = {}
+        self._lag: float | None = None
+        self._lag_checked_at: float | None = None
+        self._replica_reads = 0
+        self._sticky_reads = 0
+        self._lagging_reads = 0
+
+    def record_write(self, user_id: str) -> None:
+        """ユーザーが書き込んだことを記録する（以後しばらくプライマリから読む）"""
+        now = self._clock()
+        with self._lock:
+            self._last_writes[user_id] = now
+            # 期限切れを掃除して辞書が増え続けないようにする
+            if len(self._last_writes) > 1024:
+                self._last_writes = {
+                    uid: at
+                    for uid, at in self._last_writes.items()
+                    if now - at < self.read_your_writes_seconds
+                }
+
+    def is_sticky(self, user_id: str | None) -> bool:
+        if user_id is None:
+            return False
+        with self._lock:
+            written_at = self._last_writes.get(user_id)
+        return written_at is not None and self._clock() - written_at < self.read_your_writes_seconds
+
+    def replica_lag(self) -> float | None:
+        """レプリカの遅延秒数（確認できなければNone）"""
+        now = self._clock()
+        with self._lock:
+            if (
+                self._lag_checked_at is not None
+                and now - self._lag_checked_at < self.lag_check_interval_seconds
+            ):
+                return self._lag
+        try:
+            lag: float | None = self._lag_probe(self.replica)
+        except Exception:
+            logger.warning("Read replica lag check failed; reading from primary", exc_info=True)
+            lag = None
+        with self._lock:
+            self._lag = lag
+            self._lag_checked_at = now
+        return lag
+
+    def engine_for_read(self, user_id: str | None) -> Engine | None:
+        """
+        読み取りに使うエンジンを選ぶ
+
+        Returns:
+            レプリカのエンジン（プライマリを使うべき場合はNone）
+        """
+        if self.is_sticky(user_id):
+            with self._lock:
+                self._sticky_reads += 1
+            return None
+        lag = self.replica_lag()
+        if lag is None or lag > self.max_lag_seconds:
+            with self._lock:
+                self._lagging_reads += 1
+            return None
+        with self._lock:
+            self._replica_reads += 1
+        return self.replica
+
+    def stats(self) -> ReadRoutingStats:
+        now = self._clock()
+        with self._lock:
+            return ReadRoutingStats(
+                replica_reads=self._replica_reads,
+                sticky_primary_reads=self._sticky_reads,
+                lagging_primary_reads=self._lagging_reads,
+                last_lag_seconds=self._lag,
+                sticky_users=sum(
+                    1
+                    for at in self._last_writes.values()
+                    if now - at < self.read_your_writes_seconds
+                ),
+            )
@@ -1,38 +1,303 @@
 """
 データベースセッション管理
+
+HTTPリクエスト中は RequestSessionMiddleware が用意する1本の接続と1つのセッションを
+認証・プラン判定・サービス層・get_db で共有する（接続は最初に使われた時に1回だけ
+プールから取り出し、レスポンス送信後に返す）。サービスは SessionLocal() の代わりに
+open_session() でセッションを取得する。リクエスト外（CLI・バックグラウンドワーカー）
+では従来どおり呼び出しごとに新しいセッションを開く。
+Stripe・OpenAI等の応答を待つ間は release_request_connection() で接続をプールに返す
+（待ち時間の長い外部呼び出しが並ぶとプールを使い切るため）。
+
+DATABASE_READ_URL を設定すると、read_intent 依存関係を付けたルートの共有セッションは
+読み取りレプリカに接続する（書き込み直後・レプリカ遅延時はプライマリ。routing.py 参照）。
 """
 
-from collections.abc import Generator
+import logging
+import threading
+from collections.abc import Awaitable, Callable, Generator, MutableMapping
+from contextvars import ContextVar
+from typing import Any, cast
 
-from sqlalchemy import create_engine
+from sqlalchemy import Connection, Engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import get_settings
+from app.infrastructure.database.pool import create_pooled_engine
+from app.infrastructure.database.routing import ReadReplicaRouter
+
+logger = logging.getLogger(__name__)
+
+
+def _create_engine(url: str) -> Engine:
+    settings = get_settings()
+    # Render Starter プランは接続数が限られるため、本番では控えめなプール設定を使用
+    is_production = settings.app_env == "production"
+    return create_pooled_engine(
+        url,
+        pool_size=settings.db_pool_size or (5 if is_production else 20),
+        max_overflow=(
+            settings.db_max_overflow
+            if settings.db_max_overflow is not None
+            else (3 if is_production else 10)
+        ),
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=600 if is_production else 3600,
+        pre_ping=settings.db_pre_ping,
+        echo=settings.debug,
+    )
+
+
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
 
-settings = get_settings()
+def get_engine() -> Engine:
+    """プライマリのエンジン（初回呼び出し時に作成。import時にはDBドライバを読み込まない）"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(get_settings().database_url)
+    return _engine
 
-# Render Starter プランは接続数が限られるため、本番では控えめなプール設定を使用
-_is_production = settings.app_env == "production"
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    pool_size=5 if _is_production else 20,
-    max_overflow=3 if _is_production else 10,
-    pool_timeout=30,
-    pool_recycle=600 if _is_production else 3600,
-    echo=settings.debug,
-)
+class _LazySessionMaker(sessionmaker):
+    """接続先が未設定なら最初のセッション作成時にプライマリのエンジンを束縛する"""
+
+    def __call__(self, **local_kw: Any) -> Session:
+        if self.kw.get("bind") is None and "bind" not in local_kw:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
 
 # セッションファクトリ
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionMaker(autocommit=False, autoflush=False)
+
+_UNSET = object()
+_read_router: Any = _UNSET
+
+
+def configure_read_replica(router: ReadReplicaRouter | None) -> None:
+    """読み取りレプリカのルーターを設定する（Noneで全てプライマリ）"""
+    global _read_router
+    _read_router = router
+
+
+def get_read_router() -> ReadReplicaRouter | None:
+    """読み取りレプリカのルーター（DATABASE_READ_URL 未設定ならNone。初回呼び出し時に作成）"""
+    if _read_router is _UNSET:
+        settings = get_settings()
+        configure_read_replica(
+            ReadReplicaRouter(
+                _create_engine(settings.database_read_url),
+                max_lag_seconds=settings.read_replica_max_lag_seconds,
+                read_your_writes_seconds=settings.read_your_writes_seconds,
+            )
+            if settings.database_read_url
+            else None
+        )
+    return _read_router
+
+
+def __getattr__(name: str) -> Any:
+    # 互換: session.engine は初回参照時に作成する
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class RequestSession:
+    """
+    1リクエストで共有する接続とセッション（最初に使われた時に開く）
+
+    外部API呼び出しの前には release() で接続をプールに返す。
+    """
+
+    def __init__(self):
+        self._engine: Engine | None = None
+        self._connection: Connection | None = None
+        self._session: Session | None = None
+        # read_intent を付けたルートでは "read"（接続を開く前に決める）
+        self.intent = "write"
+        self.user_id: str | None = None
+        self.wrote = False
+        # 現在のトランザクションでflush済み（未コミット）の書き込みがあるか
+        self._uncommitted = False
+
+    @property
+    def session(self) -> Session:
+        if self._session is None:
+            bind = SessionLocal.kw.get("bind") or get_engine()
+            router = get_read_router() if self.intent == "read" else None
+            replica = router.engine_for_read(self.user_id) if router is not None else None
+            self._engine = replica or bind
+            # セッションを接続に束縛すると、commitしても接続はプールに返らない
+            self._connection = self._engine.connect()
+            self._session = SessionLocal(bind=self._connection)
+            self._session.info["read_only"] = replica is not None
+            event.listen(self._session, "after_flush", self._after_flush)
+            event.listen(self._session, "after_commit", self._after_transaction)
+            event.listen(self._session, "after_rollback", self._after_transaction)
+        return self._session
+
+    def _after_flush(self, session: Session, flush_context: Any) -> None:
+        self.wrote = True
+        self._uncommitted = True
+
+    def _after_transaction(self, session: Session) -> None:
+        self._uncommitted = False
+
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+
+    def release(self) -> bool:
+        """
+        接続をプールに返す
+
+        セッションは残し、以降はエンジンに束縛してトランザクションごとに接続を取り出す
+        （読み込み済みのオブジェクトは次のアクセス時に再取得される）。
+        未確定の変更がある場合は返さない（ロールバックで失われるため）。
+
+        Returns:
+            接続を保持していない状態になったか
+        """
+        session = self._session
+        if session is None:
+            return True
+        if self._uncommitted or session.new or session.dirty or session.deleted:
+            return False
+        if session.in_transaction():
+            session.rollback()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+            session.bind = self._engine
+        return True
+
+    def close(self) -> None:
+        """未確定の変更を破棄して接続をプールに返す"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self.wrote and self.user_id is not None and (router := get_read_router()) is not None:
+            router.record_write(self.user_id)
+
+
+_request_session: ContextVar[RequestSession | None] = ContextVar("request_session", default=None)
+
+
+class _BorrowedSession:
+    """
+    リクエストの共有セッションの貸し出し
+
+    接続は最初の属性アクセスまで開かない（接続エラーは呼び出し側の最初のクエリで起きる）。
+    close() は接続を返さず、未確定の変更だけを破棄する
+    （独立したセッションを close() した時と同じく、コミットしていない変更は残らない）。
+    """
+
+    def __init__(self, request_session: RequestSession):
+        self._request_session = request_session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._request_session.session, name)
+
+    def close(self) -> None:
+        if self._request_session.opened and self._request_session.session.in_transaction():
+            self._request_session.session.rollback()
+
+
+async def read_intent() -> None:
+    """
+    ルートを読み取り専用と宣言する依存関係（dependencies=[Depends(read_intent)]）
+
+    共有セッションがまだ開いていなければレプリカに接続できるようにする。
+    """
+    request_session = _request_session.get()
+    if request_session is not None and not request_session.opened:
+        request_session.intent = "read"
+
+
+def bind_request_user(user_id: str) -> None:
+    """リクエストのユーザーを記録する（書き込み直後の読み取りをプライマリに固定するため）"""
+    request_session = _request_session.get()
+    if request_session is not None:
+        request_session.user_id = user_id
+
+
+def release_request_connection() -> bool:
+    """
+    リクエストの共有接続をプールに返す（Stripe・OpenAI等の応答を待つ前に呼ぶ）
+
+    リクエスト外、または接続を開いていなければ何もしない。
+    未確定の変更がある場合は返さずFalseを返す。
+    """
+    request_session = _request_session.get()
+    if request_session is None:
+        return True
+    released = request_session.release()
+    if not released:
+        logger.warning("Request connection held across an external call (uncommitted changes)")
+    return released
+
+
+def open_session() -> Session:
+    """
+    サービス層で使うセッションを取得する（使い終わったら close() すること）
+
+    リクエスト中は共有セッションを貸し出し、それ以外では新しいセッションを開く。
+    """
+    request_session = _request_session.get()
+    if request_session is None:
+        return SessionLocal()
+    return cast(Session, _BorrowedSession(request_session))
+
+
+class RequestSessionMiddleware:
+    """リクエストごとに共有セッションを用意し、レスポンス送信後に接続を返す"""
+
+    def __init__(self, app: Callable[..., Awaitable[None]]):
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: MutableMapping[str, Any],
+        receive: Callable[..., Awaitable[Any]],
+        send: Callable[..., Awaitable[None]],
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_session = RequestSession()
+        token = _request_session.set(request_session)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_session.reset(token)
+            request_session.close()
 
 
 def get_db() -> Generator[Session, None, None]:
     """
     データベースセッションの依存性注入用ジェネレータ
     FastAPIのDependsで使用。例外時は自動ロールバック。
+    リクエスト中は共有セッションを返す（接続はミドルウェアが返す）。
     """
+    request_session = _request_session.get()
+    if request_session is not None:
+        try:
+            yield cast(Session, _BorrowedSession(request_session))
+        except Exception:
+            if request_session.opened:
+                request_session.session.rollback()
+            raise
+        return
+
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,29 @@
+"""OpenAI APIインフラストラクチャ"""
+
+from .client import (
+    OpenAIHTTPPool,
+    OpenAIPoolStats,
+    close_openai_pool,
+    configure_openai_pool,
+    get_openai_pool,
+    openai_client_options,
+)
+from .resilience import (
+    classify_openai_error,
+    openai_executor,
+    openai_retry_after,
+    request_metrics,
+)
+
+__all__ = [
+    "OpenAIHTTPPool",
+    "OpenAIPoolStats",
+    "classify_openai_error",
+    "close_openai_pool",
+    "configure_openai_pool",
+    "get_openai_pool",
+    "openai_client_options",
+    "openai_executor",
+    "openai_retry_after",
+    "request_metrics",
+]
@@ -0,0 +1,186 @@
+"""
+OpenAI API用のプロセス共有HTTP接続プール
+
+LLMService / EmbeddingService はリクエストごとに生成されるため、それぞれが
+AsyncOpenAI 既定のHTTPクライアントを持つと、呼び出しのたびにTCP・TLSの
+ハンドシェイクからやり直すことになる。ここではプロセスで1つの httpx.AsyncClient を
+保持し、全ての AsyncOpenAI に http_client として渡して接続を使い回す。
+
+- 接続数・keep-alive数・keep-alive期限・タイムアウトは設定値で調整する
+- HTTP/2は h2 がインストールされている場合のみ有効（無ければHTTP/1.1のkeep-alive）
+- 終了時は lifespan から close_openai_pool() で接続を閉じる
+
+AsyncOpenAI 自体は接続を持たない薄いラッパーなので、サービスごとに生成してよい。
+"""
+
+import importlib.util
+import logging
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import httpx
+
+from app.performance.metrics import register_metrics_provider, unregister_metrics_provider
+
+logger = logging.getLogger(__name__)
+
+_CONNECT_EVENTS = ("connect_tcp.complete", "connect_unix_socket.complete")
+
+
+@dataclass
+class OpenAIPoolStats:
+    """接続プールのカウンタ"""
+
+    requests: int
+    connections_opened: int
+    max_connections: int
+    max_keepalive_connections: int
+    http2: bool
+
+
+def http2_available() -> bool:
+    """HTTP/2に必要な h2 パッケージがあるか"""
+    return importlib.util.find_spec("h2") is not None
+
+
+class OpenAIHTTPPool:
+    """全OpenAIクライアントで共有する httpx.AsyncClient を管理する"""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry_seconds: float = 30.0,
+        timeout_seconds: float = 60.0,
+        http2: bool = True,
+        base_url: str = "",
+    ):
+        """
+        Args:
+            max_connections: 同時接続数の上限（超えた分は空きを待つ）
+            max_keepalive_connections: アイドルで保持する接続数の上限
+            keepalive_expiry_seconds: アイドル接続を閉じるまでの秒数
+            timeout_seconds: リクエスト全体のタイムアウト
+            http2: HTTP/2を使うか（h2 が無ければ無視される）
+            base_url: APIのベースURL（空ならSDKの既定）
+        """
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry_seconds = keepalive_expiry_seconds
+        self.timeout_seconds = timeout_seconds
+        self.base_url = base_url
+        self.http2 = http2 and http2_available()
+        if http2 and not self.http2:
+            logger.info("h2 is not installed; OpenAI client falls back to HTTP/1.1 keep-alive")
+
+        self._client: httpx.AsyncClient | None = None
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connections_opened = 0
+
+    def http_client(self) -> httpx.AsyncClient:
+        """共有HTTPクライアントを取得（初回または close 後に生成）"""
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.AsyncClient(
+                    http2=self.http2,
+                    timeout=httpx.Timeout(self.timeout_seconds),
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_keepalive_connections,
+                        keepalive_expiry=self.keepalive_expiry_seconds,
+                    ),
+                    event_hooks={"request": [self._on_request]},
+                )
+            return self._client
+
+    def client_options(self, api_key: str) -> dict[str, Any]:
+        """AsyncOpenAI のコンストラクタ引数（共有HTTPクライアントを含む）"""
+        return {
+            "api_key": api_key,
+            "base_url": self.base_url or None,
+            "http_client": self.http_client(),
+            # リトライは呼び出し側の ResilientExecutor が行う（二重リトライを避ける）
+            "max_retries": 0,
+        }
+
+    def stats(self) -> OpenAIPoolStats:
+        return OpenAIPoolStats(
+            requests=self._requests,
+            connections_opened=self._connections_opened,
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            http2=self.http2,
+        )
+
+    async def aclose(self) -> None:
+        """保持している接続を全て閉じる"""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self._requests += 1
+        # httpcoreのtrace拡張で新規接続の確立を数える（再利用時は呼ばれない）
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event: str, info: dict[str, Any]) -> None:
+        if event.endswith(_CONNECT_EVENTS):
+            self._connections_opened += 1
+
+
+_pool: OpenAIHTTPPool | None = None
+
+
+def get_openai_pool() -> OpenAIHTTPPool:
+    """OpenAI接続プールのシングルトンを取得（設定値で初期化）"""
+    global _pool
+    if _pool is None:
+        from app.config import get_settings
+
+        settings = get_settings()
+        configure_openai_pool(
+            OpenAIHTTPPool(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_keepalive_connections,
+                keepalive_expiry_seconds=settings.openai_keepalive_expiry_seconds,
+                timeout_seconds=settings.openai_timeout_seconds,
+                http2=settings.openai_http2,
+                base_url=settings.openai_base_url,
+            )
+        )
+    assert _pool is not None
+    return _pool
+
+
+def configure_openai_pool(pool: OpenAIHTTPPool | None) -> OpenAIHTTPPool | None:
+    """接続プールを差し替える（Noneで次回 get_openai_pool() 時に作り直す）"""
+    global _pool
+    _pool = pool
+    if pool is None:
+        unregister_metrics_provider("openai_http")
+    else:
+        register_metrics_provider("openai_http", lambda: asdict(pool.stats()))
+    return pool
+
+
+def openai_client_options(api_key: str | None = None) -> dict[str, Any]:
+    """
+    AsyncOpenAI に渡す引数を返す
+
+    Args:
+        api_key: OpenAI APIキー。Noneの場合は設定値から取得
+    """
+    if api_key is None:
+        from app.config import get_settings
+
+        api_key = get_settings().openai_api_key
+    return get_openai_pool().client_options(api_key)
+
+
+async def close_openai_pool() -> None:
+    """共有接続を閉じる（生成済みの場合のみ）"""
+    if _pool is not None:
+        await _pool.aclose()
@@ -0,0 +1,83 @@
+"""
+OpenAI呼び出し用のリトライ判定とメトリクス
+
+SDK自身のリトライは無効化し（client_options の max_retries=0）、
+ResilientExecutor に試行ごとの期限・バックオフ・ヘッジを任せる。
+操作（"embeddings" / "chat"）ごとの試行メトリクスは /api/metrics の
+openai_requests に出す。
+"""
+
+import email.utils
+import threading
+import time
+from dataclasses import asdict
+
+import httpx
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+from app.infrastructure.database.session import release_request_connection
+from app.performance.metrics import register_metrics_provider
+from app.performance.resilient_executor import RequestMetrics, ResilientExecutor, RetryPolicy
+
+_metrics: dict[str, RequestMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def classify_openai_error(exc: BaseException) -> str | None:
+    """リトライ可能なOpenAIの失敗なら種類名を返す（SDKの既定と同じ範囲）"""
+    if isinstance(exc, RateLimitError):
+        return "rate_limited"
+    if isinstance(exc, APITimeoutError):
+        return "timeout"
+    if isinstance(exc, APIConnectionError):
+        return "connection"
+    if isinstance(exc, APIStatusError) and (
+        exc.status_code in (408, 409) or exc.status_code >= 500
+    ):
+        return "server_error"
+    return None
+
+
+def openai_retry_after(exc: BaseException) -> float | None:
+    """応答ヘッダーの retry-after-ms / retry-after（秒またはHTTP日付）を秒で返す"""
+    response = getattr(exc, "response", None)
+    if not isinstance(response, httpx.Response):
+        return None
+    headers = response.headers
+    try:
+        if (value := headers.get("retry-after-ms")) is not None:
+            return float(value) / 1000
+        if (value := headers.get("retry-after")) is not None:
+            try:
+                return float(value)
+            except ValueError:
+                retry_at = email.utils.parsedate_to_datetime(value)
+                return max(retry_at.timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def request_metrics(operation: str) -> RequestMetrics:
+    """操作ごとの試行メトリクス（プロセスで共有）"""
+    with _metrics_lock:
+        metrics = _metrics.get(operation)
+        if metrics is None:
+            metrics = _metrics[operation] = RequestMetrics()
+            register_metrics_provider(
+                "openai_requests",
+                lambda: {name: asdict(m.stats()) for name, m in list(_metrics.items())},
+            )
+        return metrics
+
+
+def openai_executor(operation: str, policy: RetryPolicy) -> ResilientExecutor:
+    """OpenAI呼び出し用の実行器を作る（メトリクスは操作ごとに共有）"""
+    return ResilientExecutor(
+        policy,
+        classify=classify_openai_error,
+        retry_after=openai_retry_after,
+        metrics=request_metrics(operation),
+        # 応答待ちの間（最大で試行期限×回数）DB接続を握らない
+        before_run=release_request_connection,
+    )
@@ -0,0 +1,10 @@
+"""Stripe APIインフラストラクチャ"""
+
+from .gateway import StripeGateway, StripeGatewayStats, StripeUnavailableError, get_stripe_gateway
+
+__all__ = [
+    "StripeGateway",
+    "StripeGatewayStats",
+    "StripeUnavailableError",
+    "get_stripe_gateway",
+]
@@ -0,0 +1,175 @@
+"""
+Stripe API呼び出しゲートウェイ
+
+Stripe SDKは同期HTTPクライアントで通信するため、イベントループ上で直接呼ぶと
+応答待ちの間すべてのリクエストが止まる。ここでは専用の上限付きスレッドプールで実行し、
+次の3段でStripe障害の影響を抑える。
+
+- SDKのHTTPタイムアウト（stripe_timeout_seconds）
+- プール待ちを含めた呼び出し全体の期限（同じ秒数、asyncio.wait_for）
+- 接続失敗・タイムアウト・5xxが続いたら一定時間呼び出しを止めるサーキットブレーカー
+
+呼び出し側はDBセッションを閉じてから call() すること（ネットワーク待ちの間に
+コネクションを握らない）。
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar
+
+from app.performance.circuit_breaker import CircuitBreaker
+from app.performance.metrics import register_metrics_provider
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StripeUnavailableError(RuntimeError):
+    """Stripeに到達できない（タイムアウト・接続失敗・5xx・サーキットopen）"""
+
+
+@dataclass
+class StripeGatewayStats:
+    """ゲートウェイのカウンタとサーキットの状態"""
+
+    in_flight: int
+    calls: int
+    timeouts: int
+    failures: int
+    rejected: int
+    circuit_state: str
+
+
+class StripeGateway:
+    """Stripe SDKの同期呼び出しを上限付きスレッドプールで実行する"""
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        timeout_seconds: float = 10.0,
+        breaker: CircuitBreaker | None = None,
+    ):
+        """
+        Args:
+            max_workers: 同時に実行するStripe呼び出しの上限
+            timeout_seconds: 1回の呼び出しの期限（プール待ちを含む）
+            breaker: サーキットブレーカー（省略時は5回連続失敗で30秒open）
+        """
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stripe")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._calls = 0
+        self._timeouts = 0
+        self._failures = 0
+
+    async def call(self, func: Callable[..., T], /, **params: Any) -> T:
+        """
+        Stripe SDKの関数をスレッドプールで実行する
+
+        Raises:
+            StripeUnavailableError: サーキットopen・タイムアウト・Stripe側の障害
+            stripe.StripeError: 4xx等、リクエスト内容に起因するエラー
+        """
+        # SDKの読み込みは重いので、最初の呼び出しまで遅らせる
+        import stripe
+
+        if not self.breaker.allow():
+            raise StripeUnavailableError("Stripe is temporarily unavailable (circuit open)")
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._in_flight += 1
+            self._calls += 1
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, functools.partial(func, **params)),
+                self.timeout_seconds,
+            )
+        except asyncio.TimeoutError as e:
+            # スレッドはSDKのHTTPタイムアウトで解放される
+            self._record_failure(timeout=True)
+            raise StripeUnavailableError(
+                f"Stripe request timed out after {self.timeout_seconds}s"
+            ) from e
+        except (stripe.APIConnectionError, stripe.APIError, stripe.RateLimitError) as e:
+            # Stripe側の障害としてサーキットブレーカーに数える（4xxは呼び出し側の誤り）
+            self._record_failure()
+            logger.warning("Stripe request failed: %s", e)
+            raise StripeUnavailableError(f"Stripe request failed: {e}") from e
+        except stripe.StripeError:
+            # Stripeは応答している
+            self.breaker.record_success()
+            raise
+        except BaseException:
+            # キャンセル・想定外の例外は成否を判断できない（half_openの試行枠だけ返す）
+            self.breaker.release_trial()
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        self.breaker.record_success()
+        return result
+
+    def _record_failure(self, timeout: bool = False) -> None:
+        with self._lock:
+            self._failures += 1
+            if timeout:
+                self._timeouts += 1
+        self.breaker.record_failure()
+
+    def stats(self) -> StripeGatewayStats:
+        breaker = self.breaker.stats()
+        with self._lock:
+            return StripeGatewayStats(
+                in_flight=self._in_flight,
+                calls=self._calls,
+                timeouts=self._timeouts,
+                failures=self._failures,
+                rejected=breaker.rejected,
+                circuit_state=breaker.state,
+            )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def configure_stripe_sdk(timeout_seconds: float, api_base: str = "") -> None:
+    """SDKのHTTPタイムアウトと接続先（偽Stripeサーバー等）を設定する"""
+    import stripe
+
+    stripe.default_http_client = stripe.new_default_http_client(timeout=timeout_seconds)
+    if api_base:
+        stripe.api_base = api_base
+
+
+_gateway: StripeGateway | None = None
+
+
+def get_stripe_gateway() -> StripeGateway:
+    """Stripeゲートウェイのシングルトンを取得（設定値で初期化）"""
+    global _gateway
+    if _gateway is None:
+        from app.config import get_settings
+
+        settings = get_settings()
+        configure_stripe_sdk(settings.stripe_timeout_seconds, settings.stripe_api_base)
+        gateway = StripeGateway(
+            max_workers=settings.stripe_max_concurrency,
+            timeout_seconds=settings.stripe_timeout_seconds,
+            breaker=CircuitBreaker(
+                failure_threshold=settings.stripe_circuit_failure_threshold,
+                reset_timeout_seconds=settings.stripe_circuit_reset_seconds,
+            ),
+        )
+        register_metrics_provider("stripe", lambda: asdict(gateway.stats()))
+        _gateway = gateway
+    return _gateway
@@ -3,27 +3,41 @@ FastAPIアプリケーションのエントリーポイント
 AI開発ポートフォリオプラットフォーム
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from dataclasses import asdict
 
-import sentry_sdk
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.api import router as api_router
+from app.application.usage_tracking import get_usage_writer
+from app.application.webhook_inbox import get_webhook_worker
 from app.config import get_settings
+from app.infrastructure.database.pool import pool_stats
+from app.infrastructure.database.session import (
+    RequestSessionMiddleware,
+    get_engine,
+    get_read_router,
+)
+from app.performance.deadline import RequestDeadlineMiddleware
+from app.performance.metrics import register_metrics_provider
+from app.performance.query_monitor import QueryMonitorMiddleware, install_query_monitor
 from app.rate_limit import limiter
+from app.security_headers import SecurityHeadersMiddleware
 
 logger = logging.getLogger(__name__)
 
 
 settings = get_settings()
 
-# Sentry: DSN が設定されている場合のみ有効化（本番環境向け）
+# Sentry: DSN が設定されている場合のみ有効化（本番環境向け。未設定ならSDKも読み込まない）
 if settings.sentry_dsn:
+    import sentry_sdk
+
     sentry_sdk.init(
         dsn=settings.sentry_dsn,
         traces_sample_rate=0.1,
@@ -31,11 +45,65 @@ if settings.sentry_dsn:
     )
 
 
+async def _warm_up_database(connections: int) -> None:
+    """DB接続を先に開いておく（失敗しても起動は続ける）"""
+    from app.infrastructure.database.pool import warm_up_pool
+
+    try:
+        opened = await asyncio.to_thread(warm_up_pool, get_engine(), connections)
+        logger.info("Warmed up %d database connection(s)", opened)
+    except Exception:
+        logger.warning("Database pool warm-up failed", exc_info=True)
+
+
+_PARTITION_MAINTENANCE_INTERVAL_SECONDS = 24 * 60 * 60
+
+
+async def _maintain_usage_partitions(months_ahead: int) -> None:
+    """usage_logs の月別パーティションを起動時と1日ごとに先行作成する"""
+    from app.application.usage_rollup import maintain_usage_log_partitions
+
+    while True:
+        try:
+            await asyncio.to_thread(maintain_usage_log_partitions, months_ahead)
+        except Exception:
+            logger.warning("usage_logs partition maintenance failed", exc_info=True)
+        await asyncio.sleep(_PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """アプリケーションの起動・終了時の処理"""
     logger.info("MEX App starting up")
-    yield
+    # 読み取りレプリカのエンジンはimport時ではなく起動時に作る
+    if (read_router := get_read_router()) is not None:
+        register_metrics_provider("db_read_replica", lambda: asdict(read_router.stats()))
+    if settings.db_pool_warmup_connections:
+        await _warm_up_database(settings.db_pool_warmup_connections)
+    partition_task = (
+        asyncio.create_task(_maintain_usage_partitions(settings.usage_log_partition_months_ahead))
+        if settings.usage_log_partition_months_ahead > 0
+        else None
+    )
+    usage_writer = get_usage_writer()
+    await usage_writer.start()
+    webhook_worker = get_webhook_worker() if settings.stripe_webhook_worker_enabled else None
+    if webhook_worker is not None:
+        await webhook_worker.start()
+    try:
+        yield
+    finally:
+        if partition_task is not None:
+            partition_task.cancel()
+        if webhook_worker is not None:
+            # 処理中のイベントを終えてから止める（未処理分は受信箱に残る）
+            await webhook_worker.stop()
+        # バッファに残った利用量ログを書き切ってから終了する
+        await usage_writer.stop()
+        # OpenAIの共有HTTP接続を閉じる
+        from app.infrastructure.openai import close_openai_pool
+
+        await close_openai_pool()
 
 
 app = FastAPI(
@@ -50,24 +118,21 @@ app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 
-# セキュリティヘッダーミドルウェア
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """レスポンスにセキュリティヘッダーを付与"""
+# セキュリティヘッダー（素のASGIミドルウェア）
+app.add_middleware(SecurityHeadersMiddleware)
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        if settings.app_env == "production":
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=63072000; includeSubDomains; preload"
-            )
-        return response
+# 外部API呼び出しのリトライが超えてはならないリクエストの期限
+app.add_middleware(RequestDeadlineMiddleware, timeout_seconds=settings.request_deadline_seconds)
 
+# リクエスト内で1本の接続・1つのセッションを共有する
+app.add_middleware(RequestSessionMiddleware)
 
-app.add_middleware(SecurityHeadersMiddleware)
+# SQLクエリ監視（リクエスト単位のクエリ数・スロークエリ・N+1検出）
+install_query_monitor()
+app.add_middleware(QueryMonitorMiddleware)
+
+# コネクションプールの待ち時間・使用数・タイムアウトを /api/metrics に公開
+register_metrics_provider("db_pool", lambda: pool_stats(get_engine()))
 
 # CORS設定 - 環境変数から取得、許可するメソッド・ヘッダーを明示的に指定
 app.add_middleware(
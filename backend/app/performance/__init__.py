@@ -1,17 +1,60 @@
-"""パフォーマンス検証モジュール"""
-
-from .concurrent_handler import ConcurrentRequestHandler, ConcurrentTestResult
-from .metrics import PerformanceMetrics
-from .rate_limiter import LLMRateLimiter
-from .search_benchmark import BenchmarkResult, SearchBenchmark
-from .semantic_cache import SemanticCache
-
-__all__ = [
-    "SearchBenchmark",
-    "BenchmarkResult",
-    "LLMRateLimiter",
-    "SemanticCache",
-    "ConcurrentRequestHandler",
-    "ConcurrentTestResult",
-    "PerformanceMetrics",
-]
+"""
+パフォーマンス検証モジュール
+
+ベンチマーク用のクラスはhttpx・numpy等を読み込むため、
+属性として最初に参照された時にサブモジュールをimportする（アプリ起動を遅くしない）。
+"""
+
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "SearchBenchmark": ".search_benchmark",
+    "BenchmarkResult": ".search_benchmark",
+    "VectorSearchBenchmarkResult": ".search_benchmark",
+    "InMemoryVectorBackend": ".search_benchmark",
+    "PgVectorBackend": ".search_benchmark",
+    "LLMRateLimiter": ".rate_limiter",
+    "SemanticCache": ".semantic_cache",
+    "ResponseCache": ".response_cache",
+    "InMemoryLRUBackend": ".response_cache",
+    "get_response_cache": ".response_cache",
+    "ConcurrentRequestHandler": ".concurrent_handler",
+    "ConcurrentTestResult": ".concurrent_handler",
+    "LoadTestResult": ".concurrent_handler",
+    "EndpointStats": ".concurrent_handler",
+    "portfolio_journey": ".concurrent_handler",
+    "PerformanceMetrics": ".metrics",
+    "QueryStats": ".query_monitor",
+    "QueryBudgetExceededError": ".query_monitor",
+    "QueryMonitorMiddleware": ".query_monitor",
+    "query_scope": ".query_monitor",
+    "query_budget": ".query_monitor",
+    "assert_max_queries": ".query_monitor",
+    "MiddlewareBenchmarkResult": ".middleware_benchmark",
+    "run_middleware_benchmark": ".middleware_benchmark",
+    "CircuitBreaker": ".circuit_breaker",
+    "CircuitBreakerStats": ".circuit_breaker",
+    "ResilientExecutor": ".resilient_executor",
+    "RetryPolicy": ".resilient_executor",
+    "RequestMetrics": ".resilient_executor",
+    "AttemptTimeoutError": ".resilient_executor",
+    "DeadlineExceededError": ".deadline",
+    "RequestDeadlineMiddleware": ".deadline",
+    "deadline_scope": ".deadline",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,115 @@
+"""
+サーキットブレーカー
+
+外部APIへの呼び出しが連続して失敗したら一定時間呼び出しを止め（open）、
+待機後に1件だけ試行して（half_open）成功すれば元に戻す（closed）。
+障害中の外部APIを待つスレッドやリクエストが積み上がるのを防ぐ。
+
+half_openの試行が成功・失敗のどちらも記録されずに終わった場合（キャンセル・想定外の例外）は
+release_trial() で枠を返す。返されなかった試行も reset_timeout_seconds 経てば放棄とみなす。
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreakerStats:
+    """サーキットブレーカーの状態とカウンタ"""
+
+    state: str
+    consecutive_failures: int
+    opened: int
+    rejected: int
+
+
+class CircuitBreaker:
+    """連続失敗回数で開閉するサーキットブレーカー（スレッドセーフ）"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            failure_threshold: この回数連続で失敗したらopenにする
+            reset_timeout_seconds: openにしてから試行を再開するまでの秒数
+            clock: 単調増加する時刻関数（テストで差し替える）
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+        self._opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout_seconds:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """呼び出してよいか（half_openでは同時に1件だけ許可する）"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and (
+                not self._trial_in_flight
+                or self._clock() - self._trial_started_at >= self.reset_timeout_seconds
+            ):
+                self._trial_in_flight = True
+                self._trial_started_at = self._clock()
+                return True
+            self._rejected += 1
+            return False
+
+    def release_trial(self) -> None:
+        """結果を記録せずに終わった呼び出しのhalf_open試行枠を返す（状態は変えない）"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if state != OPEN:
+                    self._opened += 1
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+    def stats(self) -> CircuitBreakerStats:
+        with self._lock:
+            return CircuitBreakerStats(
+                state=self._current_state(),
+                consecutive_failures=self._failures,
+                opened=self._opened,
+                rejected=self._rejected,
+            )
@@ -1,15 +1,30 @@
 """
 同時リクエストハンドラー
 タスク6.3: パフォーマンス検証と最適化
+
+run_load_test() は実際のFastAPIアプリ（インプロセスのASGIトランスポート）
+またはローカルで起動したuvicornに対して、ユーザージャーニーを
+オープンループ（到着率固定）で投入する負荷試験ハーネス。
+
+    python -m app.performance.concurrent_handler --rate 20 --duration 30
+    python -m app.performance.concurrent_handler --base-url http://127.0.0.1:8000
 """
 
+import argparse
 import asyncio
+import json
 import random
 import time
+import uuid
+from collections import defaultdict
 from collections.abc import Awaitable, Callable
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from typing import Any
 
+import httpx
+
+from app.performance.metrics import PerformanceMetrics
+
 
 @dataclass
 class ConcurrentTestResult:
@@ -23,6 +38,169 @@ class ConcurrentTestResult:
     total_time_ms: float
 
 
+@dataclass
+class EndpointStats:
+    """エンドポイント別の負荷試験結果"""
+
+    endpoint: str
+    requests: int
+    errors: int
+    error_rate: float
+    throughput_rps: float
+    avg_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+@dataclass
+class LoadTestResult:
+    """負荷試験結果"""
+
+    duration_seconds: float
+    arrival_rate: float
+    journeys_started: int
+    journeys_completed: int
+    journeys_failed: int
+    total_requests: int
+    total_errors: int
+    throughput_rps: float
+    max_concurrent_journeys: int
+    endpoints: dict[str, EndpointStats] = field(default_factory=dict)
+
+
+class LoadSession:
+    """
+    1ジャーニー分のHTTPクライアントラッパー
+
+    リクエストごとにエンドポイントラベル（ルートテンプレート）単位で
+    レイテンシとエラーを記録する。4xx/5xxと例外をエラーとして数える。
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        metrics: PerformanceMetrics,
+        counts: dict[str, list[int]],
+    ):
+        self.client = client
+        self.headers: dict[str, str] = {}
+        self._metrics = metrics
+        self._counts = counts
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        anonymous: bool = False,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        リクエストを送信して計測する
+
+        Args:
+            method: HTTPメソッド
+            url: 実際のURL
+            endpoint: 集計用ラベル（例: "GET /api/portfolio/{username}"）
+            anonymous: Trueの場合は認証ヘッダーを付けない
+
+        Raises:
+            httpx.HTTPStatusError: エラーレスポンスの場合（ジャーニーを中断する）
+        """
+        headers = {} if anonymous else dict(self.headers)
+        headers.update(kwargs.pop("headers", {}))
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+        except Exception:
+            self._record(endpoint, start, error=True)
+            raise
+        self._record(endpoint, start, error=response.status_code >= 400)
+        response.raise_for_status()
+        return response
+
+    def _record(self, endpoint: str, start: float, error: bool) -> None:
+        self._metrics.record_response_time(endpoint, (time.perf_counter() - start) * 1000)
+        counts = self._counts[endpoint]
+        counts[0] += 1
+        if error:
+            counts[1] += 1
+
+
+Journey = Callable[[LoadSession], Awaitable[None]]
+
+
+def portfolio_journey(devlogs_per_journey: int = 5, portfolio_reads: int = 3) -> Journey:
+    """
+    標準のユーザージャーニー
+
+    登録 → ユーザー名設定 → 公開プロジェクト作成 → MCP経由の開発ログ連続書き込み
+    → 公開ポートフォリオ閲覧。MCPクライアントは専用のバッチAPIを持たず、
+    source="mcp"で開発ログ作成APIを連続で呼ぶため、それを再現する。
+    """
+
+    async def journey(session: LoadSession) -> None:
+        suffix = uuid.uuid4().hex[:12]
+        username = f"load-{suffix}"
+
+        response = await session.request(
+            "POST",
+            "/api/auth/register",
+            "POST /api/auth/register",
+            json={
+                "email": f"{username}@example.com",
+                "password": "LoadTest-Passw0rd!",
+                "display_name": f"Load {suffix}",
+            },
+        )
+        session.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+        await session.request(
+            "PUT", "/api/auth/profile", "PUT /api/auth/profile", json={"username": username}
+        )
+
+        response = await session.request(
+            "POST",
+            "/api/projects",
+            "POST /api/projects",
+            json={"title": f"project {suffix}", "technologies": ["Python"], "is_public": True},
+        )
+        project_id = response.json()["id"]
+
+        for i in range(devlogs_per_journey):
+            await session.request(
+                "POST",
+                f"/api/devlogs/{project_id}/entries",
+                "POST /api/devlogs/{project_id}/entries",
+                json={
+                    "source": "mcp",
+                    "entry_type": "implementation",
+                    "summary": f"load test entry {i}",
+                    "detail": "generated by load test",
+                    "technologies": ["Python", "FastAPI"],
+                    "ai_tool": "claude-code",
+                },
+            )
+
+        # 公開ページは未ログインで閲覧される
+        for _ in range(portfolio_reads):
+            await session.request(
+                "GET",
+                f"/api/portfolio/{username}",
+                "GET /api/portfolio/{username}",
+                anonymous=True,
+            )
+            await session.request(
+                "GET",
+                f"/api/portfolio/{username}/{project_id}",
+                "GET /api/portfolio/{username}/{project_id}",
+                anonymous=True,
+            )
+
+    return journey
+
+
 class ConcurrentRequestHandler:
     """同時リクエストハンドラー"""
 
@@ -141,3 +319,151 @@ class ConcurrentRequestHandler:
             max_concurrent_observed=self._max_observed,
             total_time_ms=total_time,
         )
+
+    async def run_load_test(
+        self,
+        app: Any | None = None,
+        base_url: str | None = None,
+        arrival_rate: float = 5.0,
+        duration_seconds: float = 10.0,
+        journey: Journey | None = None,
+        disable_rate_limit: bool = True,
+        seed: int | None = None,
+    ) -> LoadTestResult:
+        """
+        オープンループ負荷試験を実行
+
+        ジャーニーの開始時刻はポアソン到着（指数分布の到着間隔）で決め、
+        先行ジャーニーの完了を待たずに投入する。サーバーが遅くなっても
+        投入レートが下がらないため、飽和時のレイテンシ悪化をそのまま観測できる。
+
+        Args:
+            app: インプロセスで叩くASGIアプリ（base_urlと排他）
+            base_url: 起動済みサーバーのURL（例: http://127.0.0.1:8000）
+            arrival_rate: 1秒あたりのジャーニー開始数
+            duration_seconds: ジャーニーを投入し続ける時間
+            journey: 実行するジャーニー（デフォルトはportfolio_journey()）
+            disable_rate_limit: インプロセス時にslowapiのレート制限を無効化する
+            seed: 到着間隔の乱数シード
+
+        Returns:
+            LoadTestResult: エンドポイント別の集計を含む結果
+        """
+        if (app is None) == (base_url is None):
+            raise ValueError("Specify exactly one of app or base_url")
+        if arrival_rate <= 0:
+            raise ValueError("arrival_rate must be positive")
+
+        journey = journey or portfolio_journey()
+        rng = random.Random(seed)
+        metrics = PerformanceMetrics()
+        counts: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        self._current_concurrent = 0
+        self._max_observed = 0
+        completed = 0
+        failed = 0
+
+        if app is not None:
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://loadtest"
+            )
+        else:
+            client = httpx.AsyncClient(
+                base_url=base_url or "",
+                limits=httpx.Limits(max_connections=self.max_concurrent),
+                timeout=30.0,
+            )
+
+        limiter = getattr(getattr(app, "state", None), "limiter", None)
+        limiter_was_enabled = getattr(limiter, "enabled", None)
+        if disable_rate_limit and limiter is not None:
+            limiter.enabled = False
+
+        async def run_journey() -> None:
+            nonlocal completed, failed
+            await self._track_concurrent()
+            try:
+                await journey(LoadSession(client, metrics, counts))
+                completed += 1
+            except Exception:
+                failed += 1
+            finally:
+                await self._untrack_concurrent()
+
+        tasks: list[asyncio.Task] = []
+        start_time = time.perf_counter()
+        try:
+            async with client:
+                next_arrival = 0.0
+                while next_arrival < duration_seconds:
+                    delay = start_time + next_arrival - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    tasks.append(asyncio.create_task(run_journey()))
+                    next_arrival += rng.expovariate(arrival_rate)
+                await asyncio.gather(*tasks)
+        finally:
+            if limiter is not None and limiter_was_enabled is not None:
+                limiter.enabled = limiter_was_enabled
+
+        elapsed = time.perf_counter() - start_time
+        endpoints: dict[str, EndpointStats] = {}
+        for endpoint, (requests, errors) in counts.items():
+            stats = metrics.get_stats(endpoint)
+            endpoints[endpoint] = EndpointStats(
+                endpoint=endpoint,
+                requests=requests,
+                errors=errors,
+                error_rate=errors / requests if requests else 0.0,
+                throughput_rps=requests / elapsed if elapsed > 0 else 0.0,
+                avg_ms=stats["avg"],
+                p50_ms=stats["p50"],
+                p95_ms=stats["p95"],
+                p99_ms=stats["p99"],
+            )
+
+        total_requests = sum(c[0] for c in counts.values())
+        return LoadTestResult(
+            duration_seconds=elapsed,
+            arrival_rate=arrival_rate,
+            journeys_started=len(tasks),
+            journeys_completed=completed,
+            journeys_failed=failed,
+            total_requests=total_requests,
+            total_errors=sum(c[1] for c in counts.values()),
+            throughput_rps=total_requests / elapsed if elapsed > 0 else 0.0,
+            max_concurrent_journeys=self._max_observed,
+            endpoints=endpoints,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Open-loop load test against the MEX API")
+    parser.add_argument("--base-url", help="running server; in-process app.main:app if omitted")
+    parser.add_argument("--rate", type=float, default=5.0, help="journeys started per second")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--devlogs", type=int, default=5, help="MCP devlog writes per journey")
+    parser.add_argument("--max-connections", type=int, default=100)
+    parser.add_argument("--keep-rate-limit", action="store_true")
+    args = parser.parse_args()
+
+    app = None
+    if args.base_url is None:
+        from app.main import app
+
+    handler = ConcurrentRequestHandler(max_concurrent=args.max_connections)
+    result = asyncio.run(
+        handler.run_load_test(
+            app=app,
+            base_url=args.base_url,
+            arrival_rate=args.rate,
+            duration_seconds=args.duration,
+            journey=portfolio_journey(devlogs_per_journey=args.devlogs),
+            disable_rate_limit=not args.keep_rate_limit,
+        )
+    )
+    print(json.dumps(asdict(result), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+リクエスト全体の期限（デッドライン）
+
+HTTPリクエストの受付時刻から request_deadline_seconds 後を期限としてcontextvarに置き、
+外部API呼び出し（OpenAI等）はリトライ・待機の前に残り時間を確認する。
+期限を過ぎたリクエストのために裏で呼び出しを続けないのが目的で、
+ルート自体を打ち切るものではない。
+"""
+
+import time
+from collections.abc import Awaitable, Callable, Iterator, MutableMapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    """リクエストの期限内に処理を終えられない"""
+
+
+def remaining_seconds() -> float | None:
+    """現在の期限までの残り秒数（期限が無ければNone、過ぎていれば0以下）"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[None]:
+    """
+    スコープ内の期限を設定する
+
+    外側に既に期限がある場合は、早い方を使う（期限を延ばすことはない）。
+
+    Args:
+        seconds: 現在からの秒数。Noneなら外側の期限をそのまま使う
+    """
+    current = _deadline.get()
+    deadline = current
+    if seconds is not None:
+        candidate = time.monotonic() + seconds
+        deadline = candidate if current is None else min(current, candidate)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class RequestDeadlineMiddleware:
+    """HTTPリクエストごとに期限を設定する（素のASGIミドルウェア）"""
+
+    def __init__(self, app: Callable[..., Awaitable[None]], timeout_seconds: float = 60.0):
+        """
+        Args:
+            timeout_seconds: 受付からの期限（0以下なら設定しない）
+        """
+        self.app = app
+        self.timeout_seconds = timeout_seconds
+
+    async def __call__(
+        self,
+        scope: MutableMapping[str, Any],
+        receive: Callable[..., Awaitable[Any]],
+        send: Callable[..., Awaitable[None]],
+    ) -> None:
+        if scope["type"] != "http" or self.timeout_seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        with deadline_scope(self.timeout_seconds):
+            await self.app(scope, receive, send)
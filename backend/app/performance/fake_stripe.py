@@ -0,0 +1,99 @@
+"""
+ベンチマーク・テスト用の偽Stripe APIサーバー
+
+Checkout Session / Customer Portal Session の作成だけを受け付けるローカルHTTPサーバー。
+応答遅延（latency_seconds）や5xx応答（fail_status）を注入でき、
+stripe.api_base をこのサーバーに向けてStripe障害時の挙動を再現する。
+"""
+
+import json
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+_OBJECTS = {
+    "/v1/checkout/sessions": ("checkout.session", "cs_test", "https://checkout.stripe.test/c/"),
+    "/v1/billing_portal/sessions": (
+        "billing_portal.session",
+        "bps_test",
+        "https://billing.stripe.test/p/session/",
+    ),
+}
+
+
+class FakeStripeServer:
+    """遅延・障害を注入できる偽Stripeサーバー（コンテキストマネージャ）"""
+
+    def __init__(self, latency_seconds: float = 0.0):
+        """
+        Args:
+            latency_seconds: 各リクエストの応答までの待ち時間
+        """
+        self.latency_seconds = latency_seconds
+        self.fail_status: int | None = None
+        self.on_request: Callable[[str, dict[str, list[str]]], None] | None = None
+        self.requests: list[tuple[str, dict[str, list[str]]]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeStripeServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeStripeServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _respond(self, path: str, params: dict[str, list[str]]) -> tuple[int, dict]:
+        with self._lock:
+            self.requests.append((path, params))
+            number = len(self.requests)
+        if self.on_request is not None:
+            self.on_request(path, params)
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if self.fail_status is not None:
+            return self.fail_status, {"error": {"type": "api_error", "message": "injected"}}
+        if path not in _OBJECTS:
+            return 404, {"error": {"type": "invalid_request_error", "message": "not found"}}
+        object_name, prefix, url = _OBJECTS[path]
+        object_id = f"{prefix}_{number}"
+        return 200, {"id": object_id, "object": object_name, "url": url + object_id}
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                params = parse_qs(self.rfile.read(length).decode())
+                status, body = fake._respond(self.path, params)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
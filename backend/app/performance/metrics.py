@@ -5,6 +5,7 @@
 
 import time
 from collections import defaultdict
+from collections.abc import Callable
 from threading import Lock
 from typing import Any
 
@@ -115,3 +116,40 @@ class TimingContext:
     def __exit__(self, *args: Any) -> None:
         elapsed_ms = (time.time() - self.start_time) * 1000
         self.metrics.record_response_time(self.operation, elapsed_ms)
+
+
+# /api/metrics で公開するメトリクスの提供元（名前 -> 値のdictを返す関数）
+_providers: dict[str, Callable[[], dict[str, Any]]] = {}
+_providers_lock = Lock()
+
+
+def register_metrics_provider(name: str, provider: Callable[[], dict[str, Any]]) -> None:
+    """
+    メトリクスの提供元を登録（同名は上書き）
+
+    Args:
+        name: メトリクスのグループ名（例: "usage_log_writer"）
+        provider: 現在値をdictで返す関数
+    """
+    with _providers_lock:
+        _providers[name] = provider
+
+
+def unregister_metrics_provider(name: str) -> None:
+    """メトリクスの提供元を登録解除"""
+    with _providers_lock:
+        _providers.pop(name, None)
+
+
+def collect_metrics() -> dict[str, dict[str, Any]]:
+    """登録済みの全提供元から現在値を集める（失敗した提供元はerrorを返す）"""
+    with _providers_lock:
+        providers = dict(_providers)
+
+    result: dict[str, dict[str, Any]] = {}
+    for name, provider in sorted(providers.items()):
+        try:
+            result[name] = provider()
+        except Exception as e:
+            result[name] = {"error": str(e)}
+    return result
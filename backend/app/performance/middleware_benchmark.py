@@ -0,0 +1,142 @@
+"""
+ミドルウェアスタックのスループットベンチマーク
+
+CORS + セキュリティヘッダー + レート制限（slowapi）の構成で、
+BaseHTTPMiddleware版（旧実装）と素のASGI版のスループットを比較する。
+
+    python -m app.performance.middleware_benchmark --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.performance.metrics import PerformanceMetrics
+from app.security_headers import SecurityHeadersMiddleware
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """比較用: BaseHTTPMiddlewareによる旧実装"""
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        return response
+
+
+@dataclass
+class MiddlewareBenchmarkResult:
+    """ミドルウェアベンチマーク結果"""
+
+    variant: str
+    total_requests: int
+    concurrency: int
+    requests_per_second: float
+    avg_latency_ms: float
+    p95_latency_ms: float
+    failed_requests: int
+
+
+def build_benchmark_app(security_middleware: type) -> FastAPI:
+    """本番と同じ順序でミドルウェアを積んだベンチマーク用アプリを構築"""
+    app = FastAPI()
+    # ベンチマーク中に制限へ到達しないよう、本番のlimiterとは別インスタンスを使う
+    bench_limiter = Limiter(key_func=get_remote_address)
+    app.state.limiter = bench_limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.add_middleware(security_middleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000"],
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        allow_headers=["Content-Type", "Authorization"],
+    )
+
+    @app.get("/bench")
+    @bench_limiter.limit("1000000/minute")
+    async def bench(request: Request):
+        return {"status": "ok"}
+
+    return app
+
+
+async def measure_throughput(
+    app: FastAPI,
+    variant: str,
+    num_requests: int = 2000,
+    concurrency: int = 20,
+) -> MiddlewareBenchmarkResult:
+    """インプロセスASGIトランスポートでスループットを計測"""
+    metrics = PerformanceMetrics()
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one_request() -> None:
+            nonlocal failed
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/bench", headers={"Origin": "http://localhost:3000"})
+                metrics.record_response_time(variant, (time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    failed += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(num_requests)))
+        elapsed = time.perf_counter() - started
+
+    stats = metrics.get_stats(variant)
+    return MiddlewareBenchmarkResult(
+        variant=variant,
+        total_requests=num_requests,
+        concurrency=concurrency,
+        requests_per_second=num_requests / elapsed if elapsed > 0 else 0.0,
+        avg_latency_ms=stats["avg"],
+        p95_latency_ms=stats["p95"],
+        failed_requests=failed,
+    )
+
+
+async def run_middleware_benchmark(
+    num_requests: int = 2000,
+    concurrency: int = 20,
+) -> list[MiddlewareBenchmarkResult]:
+    """旧実装（BaseHTTPMiddleware）と現行実装（素のASGI）を比較する"""
+    variants = [
+        ("base_http_middleware", LegacySecurityHeadersMiddleware),
+        ("pure_asgi", SecurityHeadersMiddleware),
+    ]
+    return [
+        await measure_throughput(build_benchmark_app(cls), name, num_requests, concurrency)
+        for name, cls in variants
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Middleware stack throughput benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_middleware_benchmark(args.requests, args.concurrency))
+    print(json.dumps([asdict(r) for r in results], indent=2))
+
+
+if __name__ == "__main__":
+    main()
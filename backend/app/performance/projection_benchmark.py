@@ -0,0 +1,115 @@
+"""
+列射影ベンチマーク
+
+公開プロジェクト詳細の開発ログ一覧について、全列を取得する旧クエリと
+表示列のみを取得する射影クエリで、DBから取得するバイト数と所要時間を比較する。
+PostgreSQLではpg_column_sizeでサーバー側の行サイズを合計し、
+それ以外のDBでは取得した値のサイズをクライアント側で概算する。
+
+    python -m app.performance.projection_benchmark --database-url postgresql://... \\
+        --project-id <project_id>
+"""
+
+import argparse
+import json
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import Select, create_engine, func, literal_column, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.infrastructure.database.models import DevLogEntry
+
+
+@dataclass
+class ProjectionBenchmarkResult:
+    """列射影ベンチマーク結果"""
+
+    rows: int
+    full_row_bytes: int
+    projected_bytes: int
+    reduction_ratio: float
+    full_row_ms: float
+    projected_ms: float
+    measured_by: str
+
+
+def _value_size(value: object) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode())
+    return len(json.dumps(value, default=str).encode())
+
+
+def measure_fetched_bytes(db: Session, statement: Select) -> tuple[int, int, float]:
+    """
+    ステートメントが返す行数・バイト数・取得時間（ms）を計測
+
+    バイト数はPostgreSQLではpg_column_size（行全体）の合計、
+    それ以外では取得した値の概算サイズの合計。
+    """
+    start = time.perf_counter()
+    rows = db.execute(statement).all()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if db.get_bind().dialect.name == "postgresql":
+        subquery = statement.subquery("q")
+        size_stmt = select(
+            func.coalesce(func.sum(func.pg_column_size(literal_column("q.*"))), 0)
+        ).select_from(subquery)
+        size = int(db.execute(size_stmt).scalar_one())
+    else:
+        size = sum(_value_size(value) for row in rows for value in row)
+    return len(rows), size, elapsed_ms
+
+
+def run_projection_benchmark(db: Session, project_id: str) -> ProjectionBenchmarkResult:
+    """
+    全列取得（旧実装）と列射影（現行実装）を比較する
+
+    Args:
+        db: 計測対象DBのセッション
+        project_id: 開発ログを持つプロジェクトID
+    """
+    from app.api.portfolio import public_devlog_query
+
+    # マッパーの遅延ロード設定に関係なく全列を取得する旧クエリ相当
+    table = DevLogEntry.__table__
+    full_stmt = (
+        select(table).where(table.c.project_id == project_id).order_by(table.c.created_at.desc())
+    )
+    projected_stmt = public_devlog_query(db, project_id).statement
+
+    rows, full_bytes, full_ms = measure_fetched_bytes(db, full_stmt)
+    _, projected_bytes, projected_ms = measure_fetched_bytes(db, projected_stmt)
+
+    return ProjectionBenchmarkResult(
+        rows=rows,
+        full_row_bytes=full_bytes,
+        projected_bytes=projected_bytes,
+        reduction_ratio=1 - projected_bytes / full_bytes if full_bytes else 0.0,
+        full_row_ms=full_ms,
+        projected_ms=projected_ms,
+        measured_by=(
+            "pg_column_size" if db.get_bind().dialect.name == "postgresql" else "client_estimate"
+        ),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Devlog column projection benchmark")
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--project-id", required=True)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    with sessionmaker(bind=engine)() as db:
+        result = run_projection_benchmark(db, args.project_id)
+    print(json.dumps(asdict(result), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+SQLクエリ監視
+リクエスト単位のクエリ数計測・スロークエリログ・N+1検出
+
+SQLAlchemyのcursor_executeイベントにフックし、contextvarで保持した
+QueryStatsにステートメントを記録する。ルートごとにクエリ予算を宣言でき、
+query_budget_strict=True（テスト時）では予算超過をエラーにする。
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_START_TIMES_KEY = "query_monitor_start_times"
+
+
+class QueryBudgetExceededError(Exception):
+    """クエリ予算超過エラー"""
+
+    pass
+
+
+@dataclass
+class QueryStats:
+    """1スコープ（通常は1リクエスト）内のクエリ統計"""
+
+    label: str = ""
+    count: int = 0
+    total_time_ms: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    statements: list[str] = field(default_factory=list)
+    slow_queries: list[tuple[str, float]] = field(default_factory=list)
+
+    def record(self, statement: str, elapsed_ms: float, slow_threshold_ms: float) -> None:
+        """ステートメントを1件記録"""
+        shape = normalize_sql(statement)
+        self.count += 1
+        self.total_time_ms += elapsed_ms
+        self.shapes[shape] += 1
+        self.statements.append(statement)
+        if elapsed_ms >= slow_threshold_ms:
+            self.slow_queries.append((shape, elapsed_ms))
+
+    def repeated_shapes(self, threshold: int) -> dict[str, int]:
+        """同一形状がthreshold回以上発行されたステートメント（N+1の疑い）"""
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+# 正規化用パターン
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_BIND_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    SQLを形状（リテラル・バインド変数を除いた形）に正規化する。
+
+    N+1検出とスロークエリログで、値だけが異なるステートメントを同一視するために使う。
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _BIND_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def current_query_stats() -> QueryStats | None:
+    """現在のスコープのクエリ統計を取得（スコープ外ならNone）"""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    start_times = conn.info.get(_START_TIMES_KEY)
+    if not start_times:
+        return
+    elapsed_ms = (time.perf_counter() - start_times.pop()) * 1000
+
+    settings = get_settings()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms, settings.slow_query_threshold_ms)
+
+    if elapsed_ms >= settings.slow_query_threshold_ms:
+        logger.warning(
+            "Slow query (%.1fms)%s: %s",
+            elapsed_ms,
+            f" [{stats.label}]" if stats and stats.label else "",
+            normalize_sql(statement),
+        )
+
+
+def install_query_monitor(target: Any = Engine) -> None:
+    """
+    クエリ監視イベントを登録する（冪等）。
+
+    Args:
+        target: 監視対象のEngine。デフォルトは全Engine
+    """
+    if event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+def uninstall_query_monitor(target: Any = Engine) -> None:
+    """クエリ監視イベントを解除する"""
+    if event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.remove(target, "before_cursor_execute", _before_cursor_execute)
+        event.remove(target, "after_cursor_execute", _after_cursor_execute)
+
+
+def _report(stats: QueryStats) -> None:
+    """スコープ終了時にN+1の疑いをログ出力"""
+    threshold = get_settings().n_plus_one_threshold
+    for shape, n in stats.repeated_shapes(threshold).items():
+        logger.warning(
+            "Possible N+1 query%s: %d identical statements: %s",
+            f" [{stats.label}]" if stats.label else "",
+            n,
+            shape,
+        )
+
+
+@contextmanager
+def query_scope(label: str = "") -> Iterator[QueryStats]:
+    """
+    クエリ計測スコープ
+
+    スコープ内で発行されたステートメントをQueryStatsに記録する。
+    """
+    stats = QueryStats(label=label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        _report(stats)
+
+
+def check_query_budget(stats: QueryStats, max_queries: int) -> None:
+    """
+    クエリ予算をチェック
+
+    Raises:
+        QueryBudgetExceededError: query_budget_strict有効時に予算を超過した場合
+    """
+    if stats.count <= max_queries:
+        return
+
+    message = (
+        f"Query budget exceeded{f' [{stats.label}]' if stats.label else ''}: "
+        f"{stats.count} statements (budget {max_queries})"
+    )
+    if get_settings().query_budget_strict:
+        raise QueryBudgetExceededError(message)
+    logger.warning(message)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, label: str = "") -> Iterator[QueryStats]:
+    """
+    スコープ内のクエリ数が予算以内であることを検証する（テスト用）
+
+    Raises:
+        QueryBudgetExceededError: 予算を超過した場合（strict設定に関わらず）
+    """
+    with query_scope(label) as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise QueryBudgetExceededError(
+            f"Query budget exceeded: {stats.count} statements (budget {max_queries})\n"
+            + "\n".join(stats.statements)
+        )
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """
+    ルートのクエリ予算を宣言するデコレーター
+
+    Example:
+        @router.get("/{username}")
+        @query_budget(4)
+        async def get_public_portfolio(...): ...
+    """
+
+    def decorator(func: F) -> F:
+        func.__query_budget__ = max_queries  # type: ignore[attr-defined]
+        return func
+
+    return decorator
+
+
+class QueryMonitorMiddleware:
+    """リクエストごとにクエリ計測スコープを張るASGIミドルウェア"""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(label=f"{scope['method']} {scope['path']}")
+        token = _current_stats.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_stats.reset(token)
+            # ルーティング後のscopeからルートテンプレートを取得してラベルに使う
+            route = scope.get("route")
+            if route is not None and hasattr(route, "path"):
+                stats.label = f"{scope['method']} {scope.get('root_path', '')}{route.path}"
+            _report(stats)
+
+        budget = getattr(scope.get("endpoint"), "__query_budget__", None)
+        if budget is not None:
+            check_query_budget(stats, budget)
@@ -0,0 +1,270 @@
+"""
+外部API呼び出しのリトライ・タイムアウト・ヘッジ実行
+
+1回の呼び出しを次のように実行する。
+
+- 試行ごとの期限（attempt_timeout_seconds）。リクエストの残り時間の方が短ければそちら
+- 失敗の種類を classify で判定し、リトライ可能なものだけ再試行する
+- 待ち時間はRetry-Afterがあればその値、無ければフルジッター付き指数バックオフ
+- 待った後にリクエストの期限を超える場合は再試行せず DeadlineExceededError
+- hedge 有効時は、直近の成功レイテンシのp95を過ぎても応答が無ければ
+  同じ呼び出しをもう1本出し、先に成功した方を使う（冪等な呼び出しのみ）
+
+試行ごとの結果とレイテンシは RequestMetrics に記録する。
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+from app.performance.deadline import DeadlineExceededError, remaining_seconds
+
+T = TypeVar("T")
+
+
+class AttemptTimeoutError(TimeoutError):
+    """1回の試行が期限内に終わらなかった"""
+
+
+@dataclass
+class RetryPolicy:
+    """リトライ・タイムアウト・ヘッジの設定"""
+
+    max_attempts: int = 3
+    attempt_timeout_seconds: float = 20.0
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 8.0
+    hedge: bool = False
+    hedge_min_samples: int = 20  # p95を信用するのに必要な成功サンプル数
+    hedge_min_delay_seconds: float = 0.05
+
+
+@dataclass
+class RequestStats:
+    """呼び出し・試行のカウンタとレイテンシ"""
+
+    calls: int
+    attempts: int
+    successes: int
+    retries: int
+    hedges: int
+    hedge_wins: int
+    deadline_exceeded: int
+    failures: dict[str, int] = field(default_factory=dict)
+    latency_p50_ms: float = 0.0
+    latency_p95_ms: float = 0.0
+
+
+def _percentile(sorted_data: list[float], percentile: float) -> float:
+    index = (percentile / 100) * (len(sorted_data) - 1)
+    lower = int(index)
+    if lower + 1 >= len(sorted_data):
+        return sorted_data[-1]
+    return sorted_data[lower] + (index - lower) * (sorted_data[lower + 1] - sorted_data[lower])
+
+
+class RequestMetrics:
+    """試行ごとのメトリクス（同じ操作の呼び出し間で共有する）"""
+
+    def __init__(self, latency_window: int = 200):
+        """
+        Args:
+            latency_window: p50/p95の計算に使う直近の成功試行数
+        """
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self._failures: dict[str, int] = {}
+        self.calls = 0
+        self.attempts = 0
+        self.successes = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+
+    def record_attempt(self, latency_seconds: float, error_kind: str | None) -> None:
+        with self._lock:
+            self.attempts += 1
+            if error_kind is None:
+                self.successes += 1
+                self._latencies.append(latency_seconds)
+            else:
+                self._failures[error_kind] = self._failures.get(error_kind, 0) + 1
+
+    def latency_percentile(self, percentile: float, min_samples: int = 1) -> float | None:
+        """直近の成功レイテンシのパーセンタイル（秒）。サンプル不足ならNone"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < max(min_samples, 1):
+            return None
+        return _percentile(samples, percentile)
+
+    def stats(self) -> RequestStats:
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        with self._lock:
+            return RequestStats(
+                calls=self.calls,
+                attempts=self.attempts,
+                successes=self.successes,
+                retries=self.retries,
+                hedges=self.hedges,
+                hedge_wins=self.hedge_wins,
+                deadline_exceeded=self.deadline_exceeded,
+                failures=dict(self._failures),
+                latency_p50_ms=(p50 or 0.0) * 1000,
+                latency_p95_ms=(p95 or 0.0) * 1000,
+            )
+
+
+class ResilientExecutor:
+    """RetryPolicyに従って非同期呼び出しを実行する"""
+
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        classify: Callable[[BaseException], str | None] = lambda exc: None,
+        retry_after: Callable[[BaseException], float | None] = lambda exc: None,
+        metrics: RequestMetrics | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rand: Callable[[], float] = random.random,
+        before_run: Callable[[], object] | None = None,
+    ):
+        """
+        Args:
+            policy: リトライ・タイムアウト・ヘッジの設定
+            classify: 例外の種類名を返す（Noneはリトライしない例外）
+            retry_after: 例外からサーバー指定の待ち秒数を取り出す
+            metrics: 試行の記録先
+            before_run: 呼び出し前に実行する処理（例: DB接続をプールに返す）
+        """
+        self.policy = policy or RetryPolicy()
+        self.classify = classify
+        self.retry_after = retry_after
+        self.metrics = metrics or RequestMetrics()
+        self._sleep = sleep
+        self._rand = rand
+        self._before_run = before_run
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        呼び出しを実行する（呼び出すたびに新しいawaitableを返す関数を渡す）
+
+        Raises:
+            DeadlineExceededError: リクエストの期限内に成功しなかった
+            AttemptTimeoutError: 最後の試行が試行ごとの期限を超えた
+            Exception: リトライ不可の例外、または最後の試行の例外
+        """
+        policy = self.policy
+        if self._before_run is not None:
+            self._before_run()
+        self.metrics.calls += 1
+        last_error: BaseException | None = None
+
+        for attempt in range(policy.max_attempts):
+            remaining = remaining_seconds()
+            if remaining is not None and remaining <= 0:
+                self._deadline_exceeded(last_error)
+            timeout = policy.attempt_timeout_seconds
+            if remaining is not None:
+                timeout = min(timeout, remaining)
+
+            try:
+                return await self._attempt(call, timeout)
+            except Exception as e:
+                if self._kind(e) is None:
+                    raise
+                last_error = e
+
+            if attempt == policy.max_attempts - 1:
+                break
+            delay = self._backoff(attempt, self.retry_after(last_error))
+            remaining = remaining_seconds()
+            if remaining is not None and delay >= remaining:
+                self._deadline_exceeded(last_error)
+            self.metrics.retries += 1
+            await self._sleep(delay)
+
+        assert last_error is not None
+        raise last_error
+
+    def hedge_delay(self) -> float | None:
+        """ヘッジを出すまでの待ち時間（p95）。無効またはサンプル不足ならNone"""
+        if not self.policy.hedge:
+            return None
+        p95 = self.metrics.latency_percentile(95, self.policy.hedge_min_samples)
+        if p95 is None:
+            return None
+        return max(p95, self.policy.hedge_min_delay_seconds)
+
+    def _kind(self, exc: BaseException) -> str | None:
+        if isinstance(exc, AttemptTimeoutError):
+            return "timeout"
+        return self.classify(exc)
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        if retry_after is not None:
+            return max(retry_after, 0.0)
+        cap = min(self.policy.backoff_max_seconds, self.policy.backoff_base_seconds * 2**attempt)
+        return self._rand() * cap
+
+    def _deadline_exceeded(self, last_error: BaseException | None) -> None:
+        self.metrics.deadline_exceeded += 1
+        raise DeadlineExceededError("request deadline exceeded") from last_error
+
+    async def _timed(self, call: Callable[[], Awaitable[T]]) -> T:
+        start = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.metrics.record_attempt(time.monotonic() - start, self._kind(e) or "error")
+            raise
+        self.metrics.record_attempt(time.monotonic() - start, None)
+        return result
+
+    async def _attempt(self, call: Callable[[], Awaitable[T]], timeout: float) -> T:
+        """1回の試行（必要ならヘッジを1本追加し、先に成功した方を返す）"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        primary = asyncio.ensure_future(self._timed(call))
+        pending = {primary}
+        hedge: asyncio.Future[T] | None = None
+        error: BaseException | None = None
+        try:
+            hedge_delay = self.hedge_delay()
+            if hedge_delay is not None and hedge_delay < timeout:
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+                if not done:
+                    self.metrics.hedges += 1
+                    hedge = asyncio.ensure_future(self._timed(call))
+                    pending.add(hedge)
+
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(deadline - loop.time(), 0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    self.metrics.record_attempt(timeout, "timeout")
+                    raise AttemptTimeoutError(f"attempt timed out after {timeout:.2f}s")
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.metrics.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,153 @@
+"""
+レンダリング済みレスポンスキャッシュ
+
+公開ポートフォリオのJSONをシリアライズ済みbytesで保持する。
+デフォルトはワーカーごとのインメモリLRUで、ResponseCacheBackendを実装すれば
+共有バックエンド（Redis等）に差し替えられる。
+
+エントリはETag（バージョントークン）と一緒に保存し、読み出し時に現在の
+トークンと照合する。書き込み時の無効化イベント（cache_events）は
+エントリを即座に破棄するが、イベントが届かない別ワーカーのエントリも
+トークン不一致で使われないため、書き込み後に古い内容が返ることはない。
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+from app.application import cache_events
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """キャッシュ済みレスポンス"""
+
+    etag: str
+    body: bytes
+    media_type: str = "application/json"
+
+
+class ResponseCacheBackend(Protocol):
+    """レスポンスキャッシュのストレージ"""
+
+    def get(self, key: str) -> CachedResponse | None: ...
+
+    def set(self, key: str, value: CachedResponse, tags: list[str]) -> None: ...
+
+    def invalidate_tag(self, tag: str) -> int: ...
+
+    def clear(self) -> None: ...
+
+
+class InMemoryLRUBackend:
+    """ワーカー内のLRUキャッシュ（タグによる一括無効化対応）"""
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Args:
+            max_entries: 最大エントリ数（超過時は最も古く使われたものを破棄）
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[CachedResponse, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            self._entries.move_to_end(key)
+            return item[0]
+
+    def set(self, key: str, value: CachedResponse, tags: list[str]) -> None:
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_tag(self, tag: str) -> int:
+        with self._lock:
+            keys = self._tags.pop(tag, set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[1]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def user_tag(user_id: str) -> str:
+    """ユーザー単位の無効化タグ"""
+    return f"user:{user_id}"
+
+
+class ResponseCache:
+    """ETag検証付きのレスポンスキャッシュ"""
+
+    def __init__(self, backend: ResponseCacheBackend | None = None):
+        self.backend = backend or InMemoryLRUBackend()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, etag: str) -> CachedResponse | None:
+        """現在のETagと一致するエントリのみ返す"""
+        cached = self.backend.get(key)
+        if cached is None or cached.etag != etag:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return cached
+
+    def set(self, key: str, value: CachedResponse, user_id: str) -> None:
+        self.backend.set(key, value, [user_tag(user_id)])
+
+    def invalidate_user(self, user_id: str) -> int:
+        """ユーザーのエントリを全て破棄"""
+        return self.backend.invalidate_tag(user_tag(user_id))
+
+    def on_portfolio_changed(self, event: cache_events.PortfolioChanged) -> None:
+        self.invalidate_user(event.user_id)
+
+
+_response_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache:
+    """レスポンスキャッシュのシングルトンを取得（初回に無効化イベントを購読）"""
+    global _response_cache
+    if _response_cache is None:
+        configure_response_cache()
+    assert _response_cache is not None
+    return _response_cache
+
+
+def configure_response_cache(backend: ResponseCacheBackend | None = None) -> ResponseCache:
+    """バックエンドを指定してレスポンスキャッシュを構成し直す"""
+    global _response_cache
+    if _response_cache is not None:
+        cache_events.unsubscribe(_response_cache.on_portfolio_changed)
+    _response_cache = ResponseCache(backend)
+    cache_events.subscribe(_response_cache.on_portfolio_changed)
+    return _response_cache
@@ -1,11 +1,29 @@
 """
 類似検索ベンチマーク
 タスク6.3: パフォーマンス検証と最適化
+
+合成したembedding付き開発ログをN件投入し、実際の検索クエリの
+レイテンシ（p50/p95/p99）、厳密な全件探索に対するrecall@k、
+インデックス構築時間を計測する。結果は回帰追跡用にJSONで出力する。
+
+    # PostgreSQL + pgvector（ベンチマーク専用DBを指定すること）
+    python -m app.performance.search_benchmark --backend pgvector \\
+        --database-url postgresql://... --sizes 1000,10000,100000 --output result.json
+
+    # DBなし（純Pythonの厳密探索）
+    python -m app.performance.search_benchmark --backend memory --sizes 1000
 """
 
+import argparse
+import heapq
+import json
+import math
 import random
 import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from typing import Protocol
+
+from app.performance.metrics import PerformanceMetrics
 
 
 @dataclass
@@ -22,46 +40,312 @@ class BenchmarkResult:
     avg_results_count: float
 
 
+@dataclass
+class VectorSearchBenchmarkResult:
+    """ベクトル検索ベンチマーク結果（1バックエンド・1データ件数分）"""
+
+    backend: str
+    num_rows: int
+    dimensions: int
+    num_queries: int
+    top_k: int
+    seed_time_ms: float
+    index_build_time_ms: float
+    avg_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    recall_at_k: float
+
+
+class VectorSearchBackend(Protocol):
+    """ベンチマーク対象の検索バックエンド"""
+
+    name: str
+    dimensions: int
+
+    def seed(self, num_rows: int) -> None:
+        """合成データをnum_rows件投入する"""
+        ...
+
+    def build_index(self) -> None:
+        """近似検索インデックスを構築する（不要なら何もしない）"""
+        ...
+
+    def search(self, query: list[float], top_k: int) -> list[str]:
+        """実運用と同じ経路で検索し、ID一覧を返す"""
+        ...
+
+    def exact_search(self, query: list[float], top_k: int) -> list[str]:
+        """全件探索による正解ID一覧を返す"""
+        ...
+
+    def teardown(self) -> None:
+        """投入したデータを削除する"""
+        ...
+
+
+def random_unit_vector(dimensions: int, rng: random.Random) -> list[float]:
+    """正規化済みのランダムベクトルを生成"""
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class InMemoryVectorBackend:
+    """
+    純Pythonの厳密コサイン探索
+
+    DBなしで計測ハーネス自体を検証するためのバックエンド。
+    全件探索なのでrecall@kは常に1.0になる。
+    """
+
+    name = "memory"
+
+    def __init__(self, dimensions: int = 128, seed: int = 42):
+        self.dimensions = dimensions
+        self._rng = random.Random(seed)
+        self._rows: list[tuple[str, list[float]]] = []
+
+    def seed(self, num_rows: int) -> None:
+        self._rows = [
+            (f"case-{i}", random_unit_vector(self.dimensions, self._rng)) for i in range(num_rows)
+        ]
+
+    def build_index(self) -> None:
+        pass
+
+    def search(self, query: list[float], top_k: int) -> list[str]:
+        return self.exact_search(query, top_k)
+
+    def exact_search(self, query: list[float], top_k: int) -> list[str]:
+        # 行ベクトルは正規化済みなので内積の大小がコサイン類似度の大小に一致する
+        scored = (
+            (sum(q * v for q, v in zip(query, vector, strict=True)), row_id)
+            for row_id, vector in self._rows
+        )
+        return [row_id for _, row_id in heapq.nlargest(top_k, scored)]
+
+    def teardown(self) -> None:
+        self._rows = []
+
+
+class PgVectorBackend:
+    """
+    PostgreSQL + pgvector バックエンド
+
+    ベンチマーク用ユーザー・プロジェクト配下にdevlog_entriesを投入し、
+    SimilarityEngine.search_by_embedding（本番と同じSQL）で検索する。
+    embeddingはサーバー側でgenerate_seriesから生成するため、100万件でも
+    クライアントからベクトルを転送しない。IVFFlatインデックスを作り直すため、
+    必ずベンチマーク専用のデータベースに対して実行すること。
+    """
+
+    name = "pgvector"
+
+    def __init__(
+        self,
+        database_url: str,
+        dimensions: int = 1536,
+        lists: int | None = None,
+        probes: int = 10,
+        batch_size: int = 10_000,
+    ):
+        """
+        Args:
+            database_url: ベンチマーク用DBの接続URL
+            dimensions: embedding次元数（カラム定義と一致させる）
+            lists: IVFFlatのリスト数。Noneの場合は件数から決定
+            probes: 検索時のivfflat.probes
+            batch_size: 1ステートメントで投入する件数
+        """
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from app.config import get_settings
+        from app.domain.similarity.similarity_engine import SimilarityEngine
+
+        if get_settings().app_env == "production":
+            raise RuntimeError("search benchmark must not run against production")
+
+        self.dimensions = dimensions
+        self.lists = lists
+        self.probes = probes
+        self.batch_size = batch_size
+        self._engine = create_engine(database_url, pool_pre_ping=True)
+        self._session_factory = sessionmaker(bind=self._engine)
+        self._similarity = SimilarityEngine()
+        self._num_rows = 0
+        self._user_id: str | None = None
+        self._project_id: str | None = None
+
+    def seed(self, num_rows: int) -> None:
+        from sqlalchemy import text
+
+        from app.infrastructure.database.models import Project, User
+
+        with self._session_factory() as db:
+            db.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            user = User(
+                email=f"search-benchmark-{time.time_ns()}@example.com", display_name="bench"
+            )
+            db.add(user)
+            db.flush()
+            project = Project(user_id=user.id, title="search benchmark")
+            db.add(project)
+            db.flush()
+            self._user_id, self._project_id = user.id, project.id
+
+            # 相関サブクエリ（g参照）にして行ごとに別のベクトルを生成させる
+            insert_sql = text("""
+                INSERT INTO devlog_entries
+                    (id, project_id, user_id, source, entry_type, summary,
+                     technologies, metadata, created_at, embedding)
+                SELECT
+                    gen_random_uuid()::text, :project_id, :user_id, 'benchmark', 'implementation',
+                    'benchmark entry ' || g, '[]', '{}', now(),
+                    (SELECT array_agg(random() - 0.5)::vector
+                       FROM generate_series(1, :dimensions) WHERE g IS NOT NULL)
+                FROM generate_series(:start, :stop) AS g
+            """)
+            for start in range(1, num_rows + 1, self.batch_size):
+                db.execute(
+                    insert_sql,
+                    {
+                        "project_id": project.id,
+                        "user_id": user.id,
+                        "dimensions": self.dimensions,
+                        "start": start,
+                        "stop": min(start + self.batch_size - 1, num_rows),
+                    },
+                )
+            db.commit()
+            db.execute(text("ANALYZE devlog_entries"))
+            db.commit()
+        self._num_rows = num_rows
+
+    def build_index(self) -> None:
+        from sqlalchemy import text
+
+        # pgvector推奨値: 100万件まではrows/1000、それ以上はsqrt(rows)
+        lists = self.lists or max(
+            1,
+            self._num_rows // 1000
+            if self._num_rows <= 1_000_000
+            else int(math.sqrt(self._num_rows)),
+        )
+        with self._engine.begin() as conn:
+            conn.execute(text("DROP INDEX IF EXISTS idx_devlog_entries_embedding"))
+            conn.execute(
+                text(
+                    "CREATE INDEX idx_devlog_entries_embedding ON devlog_entries "
+                    f"USING ivfflat (embedding vector_cosine_ops) WITH (lists = {int(lists)})"
+                )
+            )
+
+    def _search(self, query: list[float], top_k: int, exact: bool) -> list[str]:
+        from sqlalchemy import text
+
+        with self._session_factory() as db:
+            if exact:
+                db.execute(text("SET LOCAL enable_indexscan = off"))
+            else:
+                db.execute(text(f"SET LOCAL ivfflat.probes = {int(self.probes)}"))
+            results = self._similarity.search_by_embedding(
+                query, self._user_id or "", limit=top_k, db=db
+            )
+            db.rollback()
+        return [r.devlog_id for r in results]
+
+    def search(self, query: list[float], top_k: int) -> list[str]:
+        return self._search(query, top_k, exact=False)
+
+    def exact_search(self, query: list[float], top_k: int) -> list[str]:
+        return self._search(query, top_k, exact=True)
+
+    def teardown(self) -> None:
+        from sqlalchemy import text
+
+        if self._user_id is not None:
+            with self._engine.begin() as conn:
+                conn.execute(text("DELETE FROM users WHERE id = :id"), {"id": self._user_id})
+            self._user_id = None
+        self._engine.dispose()
+
+
 class SearchBenchmark:
     """類似検索ベンチマーク"""
 
-    def __init__(self):
-        self._mock_cases: list[dict] = []
-
-    def _generate_mock_cases(self, num_cases: int) -> list[dict]:
-        """モックケースデータを生成"""
-        cases = []
-        for i in range(num_cases):
-            cases.append(
-                {
-                    "id": f"case-{i}",
-                    "title": f"テストケース {i}",
-                    "purpose": f"テスト目的 {i}",
-                    "embedding": [random.random() for _ in range(128)],  # 簡略化
-                }
-            )
-        return cases
+    def __init__(self, seed: int = 42):
+        self._rng = random.Random(seed)
 
-    def _mock_similarity_search(
+    def run(
         self,
-        query: str,
-        cases: list[dict],
-        top_k: int,
-    ) -> list[dict]:
-        """モック類似検索（実際のベクトル検索をシミュレート）"""
-        # 検索処理のシミュレーション（軽量な処理）
-        # 実際のベクトル計算を模倣するため少しだけ待機
-        time.sleep(random.uniform(0.001, 0.005))
-
-        # ランダムにtop_k件選択
-        results = random.sample(cases, min(top_k, len(cases)))
-        return [
-            {
-                "case_id": r["id"],
-                "score": random.uniform(0.5, 1.0),
-            }
-            for r in results
-        ]
+        backend: VectorSearchBackend,
+        num_rows: int,
+        num_queries: int = 100,
+        top_k: int = 10,
+        warmup_queries: int = 5,
+    ) -> VectorSearchBenchmarkResult:
+        """
+        1つのデータ件数でベンチマークを実行
+
+        Args:
+            backend: 検索バックエンド
+            num_rows: 投入件数
+            num_queries: 計測クエリ数
+            top_k: 取得件数
+            warmup_queries: 計測前に捨てるクエリ数（キャッシュ温め）
+
+        Returns:
+            VectorSearchBenchmarkResult: ベンチマーク結果
+        """
+        metrics = PerformanceMetrics()
+
+        # 投入・索引作成の途中で失敗しても投入済みの行を残さない
+        try:
+            started = time.perf_counter()
+            backend.seed(num_rows)
+            seed_time_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            backend.build_index()
+            index_build_time_ms = (time.perf_counter() - started) * 1000
+
+            for _ in range(warmup_queries):
+                backend.search(random_unit_vector(backend.dimensions, self._rng), top_k)
+
+            hits = 0
+            expected_total = 0
+            for _ in range(num_queries):
+                query = random_unit_vector(backend.dimensions, self._rng)
+
+                start = time.perf_counter()
+                found = backend.search(query, top_k)
+                metrics.record_response_time("search", (time.perf_counter() - start) * 1000)
+
+                # 正解集合は計測対象外
+                expected = backend.exact_search(query, top_k)
+                hits += len(set(found) & set(expected))
+                expected_total += len(expected)
+        finally:
+            backend.teardown()
+
+        stats = metrics.get_stats("search")
+        return VectorSearchBenchmarkResult(
+            backend=backend.name,
+            num_rows=num_rows,
+            dimensions=backend.dimensions,
+            num_queries=num_queries,
+            top_k=top_k,
+            seed_time_ms=seed_time_ms,
+            index_build_time_ms=index_build_time_ms,
+            avg_ms=stats["avg"],
+            p50_ms=stats["p50"],
+            p95_ms=stats["p95"],
+            p99_ms=stats["p99"],
+            recall_at_k=hits / expected_total if expected_total else 0.0,
+        )
 
     def run_similarity_search_benchmark(
         self,
@@ -70,7 +354,7 @@ class SearchBenchmark:
         top_k: int = 10,
     ) -> BenchmarkResult:
         """
-        類似検索のベンチマークを実行
+        類似検索のベンチマークを実行（インメモリの厳密探索）
 
         Args:
             num_cases: テストケース数
@@ -80,20 +364,20 @@ class SearchBenchmark:
         Returns:
             BenchmarkResult: ベンチマーク結果
         """
-        # モックデータ生成
-        cases = self._generate_mock_cases(num_cases)
+        backend = InMemoryVectorBackend(seed=self._rng.randrange(2**32))
+        backend.seed(num_cases)
 
         response_times: list[float] = []
         results_counts: list[int] = []
         successful = 0
 
-        for i in range(num_queries):
-            query = f"テストクエリ {i}"
+        for _ in range(num_queries):
+            query = random_unit_vector(backend.dimensions, self._rng)
 
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
-                results = self._mock_similarity_search(query, cases, top_k)
-                elapsed_ms = (time.time() - start_time) * 1000
+                results = backend.search(query, top_k)
+                elapsed_ms = (time.perf_counter() - start_time) * 1000
 
                 response_times.append(elapsed_ms)
                 results_counts.append(len(results))
@@ -112,3 +396,40 @@ class SearchBenchmark:
             success_rate=successful / num_queries if num_queries > 0 else 0,
             avg_results_count=sum(results_counts) / len(results_counts) if results_counts else 0,
         )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vector similarity search benchmark")
+    parser.add_argument("--backend", choices=["memory", "pgvector"], default="memory")
+    parser.add_argument("--database-url", help="pgvector backend only (dedicated benchmark DB)")
+    parser.add_argument("--sizes", default="1000,10000", help="comma separated row counts")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--dimensions", type=int, default=None)
+    parser.add_argument("--probes", type=int, default=10)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    benchmark = SearchBenchmark()
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        backend: VectorSearchBackend
+        if args.backend == "pgvector":
+            if not args.database_url:
+                parser.error("--database-url is required for the pgvector backend")
+            backend = PgVectorBackend(
+                args.database_url, dimensions=args.dimensions or 1536, probes=args.probes
+            )
+        else:
+            backend = InMemoryVectorBackend(dimensions=args.dimensions or 128)
+        results.append(benchmark.run(backend, size, args.queries, args.top_k))
+
+    output = json.dumps([asdict(r) for r in results], indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Stripe呼び出しのベンチマーク（遅延注入）
+
+偽Stripeサーバーに応答遅延を入れ、Checkout Session作成を同時に発行したときの
+所要時間とイベントループの停止時間（ハートビートの最大遅れ）を、
+SDKをイベントループ上で直接呼ぶ旧実装とStripeGateway経由で比較する。
+
+    python -m app.performance.stripe_benchmark --requests 20 --latency-ms 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass
+
+import stripe
+
+from app.infrastructure.stripe.gateway import StripeGateway, configure_stripe_sdk
+from app.performance.fake_stripe import FakeStripeServer
+
+_HEARTBEAT_INTERVAL = 0.01
+
+
+@dataclass
+class StripeBenchmarkResult:
+    """Stripe呼び出しベンチマーク結果"""
+
+    variant: str
+    requests: int
+    latency_ms: float
+    total_ms: float
+    max_loop_stall_ms: float
+
+
+def _create_checkout() -> str:
+    session = stripe.checkout.Session.create(
+        mode="subscription",
+        line_items=[{"price": "price_bench", "quantity": 1}],
+        success_url="https://example.com/ok",
+        cancel_url="https://example.com/cancel",
+    )
+    return session.url
+
+
+async def _measure(requests: int, call) -> tuple[float, float]:
+    stall = 0.0
+    done = asyncio.Event()
+
+    async def heartbeat() -> None:
+        nonlocal stall
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(_HEARTBEAT_INTERVAL)
+            stall = max(stall, time.perf_counter() - start - _HEARTBEAT_INTERVAL)
+
+    ticker = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(requests)))
+    total = time.perf_counter() - start
+    done.set()
+    await ticker
+    return total * 1000, stall * 1000
+
+
+async def run_stripe_benchmark(
+    requests: int = 20,
+    latency_ms: float = 200.0,
+    max_workers: int = 8,
+) -> list[StripeBenchmarkResult]:
+    """
+    旧実装（イベントループ上で同期呼び出し）とゲートウェイ経由を比較する
+
+    Args:
+        requests: 同時に発行するCheckout Session作成数
+        latency_ms: 偽Stripeサーバーの応答遅延
+        max_workers: ゲートウェイのスレッド数
+    """
+    stripe.api_key = "sk_test_benchmark"
+    original_base = stripe.api_base
+    results = []
+    with FakeStripeServer(latency_seconds=latency_ms / 1000) as server:
+        configure_stripe_sdk(timeout_seconds=30.0, api_base=server.base_url)
+        gateway = StripeGateway(max_workers=max_workers, timeout_seconds=30.0)
+        try:
+
+            async def blocking() -> str:
+                return _create_checkout()
+
+            async def pooled() -> str:
+                return await gateway.call(_create_checkout)
+
+            for variant, call in (("blocking", blocking), ("gateway", pooled)):
+                total_ms, stall_ms = await _measure(requests, call)
+                results.append(
+                    StripeBenchmarkResult(
+                        variant=variant,
+                        requests=requests,
+                        latency_ms=latency_ms,
+                        total_ms=total_ms,
+                        max_loop_stall_ms=stall_ms,
+                    )
+                )
+        finally:
+            gateway.shutdown()
+            stripe.api_base = original_base
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stripe call benchmark with injected latency")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--max-workers", type=int, default=8)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_stripe_benchmark(args.requests, args.latency_ms, args.max_workers))
+    print(json.dumps([asdict(r) for r in results], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+セキュリティヘッダーミドルウェア
+
+BaseHTTPMiddlewareはリクエスト毎にタスクとメモリストリームを挟むため、
+スループットが落ち、StreamingResponseも逐次送信されなくなる。
+ここでは素のASGIミドルウェアとして http.response.start メッセージに
+ヘッダーを直接書き込む。
+"""
+
+from collections.abc import Awaitable, Callable, MutableMapping
+from typing import Any
+
+from starlette.datastructures import MutableHeaders
+
+from app.config import get_settings
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+_BASE_HEADERS: list[tuple[str, str]] = [
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-Frame-Options", "DENY"),
+    ("X-XSS-Protection", "1; mode=block"),
+    ("Referrer-Policy", "strict-origin-when-cross-origin"),
+]
+
+_HSTS_HEADER = ("Strict-Transport-Security", "max-age=63072000; includeSubDomains; preload")
+
+
+class SecurityHeadersMiddleware:
+    """レスポンスにセキュリティヘッダーを付与"""
+
+    def __init__(self, app: Callable[..., Awaitable[None]], hsts: bool | None = None):
+        """
+        Args:
+            app: 次のASGIアプリケーション
+            hsts: HSTSヘッダーを付与するか。Noneの場合は本番環境のみ付与
+        """
+        self.app = app
+        if hsts is None:
+            hsts = get_settings().app_env == "production"
+        self._headers = _BASE_HEADERS + ([_HSTS_HEADER] if hsts else [])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in self._headers:
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
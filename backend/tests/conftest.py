@@ -0,0 +1,50 @@
+"""
+共通テストフィクスチャ
+
+DBを使うテストはインメモリSQLiteで実行する（PostgreSQL固有機能は対象外）。
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budget(monkeypatch):
+    """テストではルートのクエリ予算超過をエラーにする"""
+    from app.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "query_budget_strict", True)
+
+
+@pytest.fixture
+def sqlite_engine():
+    """全テーブル作成済みのインメモリSQLiteエンジン"""
+    from app.infrastructure.database.models import Base
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(sqlite_engine):
+    """SessionLocalの接続先をSQLiteに差し替えたセッション"""
+    from app.application.entitlements import get_entitlement_cache
+    from app.infrastructure.database.session import SessionLocal
+
+    # 前のテストのDBに基づくキャッシュを持ち越さない
+    get_entitlement_cache().clear()
+    original_bind = SessionLocal.kw.get("bind")
+    SessionLocal.configure(bind=sqlite_engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        SessionLocal.configure(bind=original_bind)
@@ -0,0 +1,124 @@
+"""
+コネクションプールの計測・接続確認戦略・ウォームアップのテスト
+"""
+
+import pytest
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    """計測付きプールのSQLiteファイルエンジンを作る"""
+    from app.infrastructure.database.pool import create_pooled_engine
+
+    engines = []
+
+    def make(**kwargs):
+        options = {"pool_size": 2, "max_overflow": 1, "pool_timeout": 0.05}
+        options.update(kwargs)
+        engine = create_pooled_engine(f"sqlite:///{tmp_path / 'pool.db'}", **options)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+class TestInstrumentedPool:
+    """チェックアウトの計測"""
+
+    def test_tracks_in_use_overflow_and_timeouts(self, make_engine):
+        """使用中・オーバーフロー・タイムアウトを数える"""
+        from sqlalchemy import exc
+
+        from app.infrastructure.database.pool import pool_stats
+
+        engine = make_engine()
+        held = [engine.connect() for _ in range(3)]
+        stats = pool_stats(engine)
+        assert (stats["in_use"], stats["overflow"], stats["peak_in_use"]) == (3, 1, 3)
+
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        stats = pool_stats(engine)
+        assert stats["timeouts"] == 1
+        # タイムアウトまで待った時間は記録しない（成功したチェックアウトのみ）
+        assert stats["checkouts"] == 3
+
+        for connection in held:
+            connection.close()
+        stats = pool_stats(engine)
+        assert (stats["in_use"], stats["idle"]) == (0, 2)
+
+    def test_records_checkout_wait(self, make_engine):
+        """空きを待ったチェックアウトの待ち時間を記録する"""
+        import threading
+        import time
+
+        from app.infrastructure.database.pool import pool_stats
+
+        engine = make_engine(pool_size=1, max_overflow=0, pool_timeout=5)
+        held = engine.connect()
+        threading.Timer(0.05, held.close).start()
+        start = time.perf_counter()
+        with engine.connect():
+            waited = (time.perf_counter() - start) * 1000
+
+        stats = pool_stats(engine)
+        assert stats["waited_checkouts"] >= 1
+        assert 40 <= stats["max_wait_ms"] <= waited + 1
+
+    def test_warm_up_opens_connections_up_to_pool_size(self, make_engine):
+        """ウォームアップはpool_sizeまで接続を開いてプールに戻す"""
+        from app.infrastructure.database.pool import pool_stats, warm_up_pool
+
+        engine = make_engine(pool_size=2, max_overflow=5)
+        assert warm_up_pool(engine, 10) == 2
+        stats = pool_stats(engine)
+        assert (stats["idle"], stats["in_use"], stats["overflow"]) == (2, 0, 0)
+
+
+class TestPrePingStrategy:
+    """接続確認戦略"""
+
+    def test_strategy_controls_pre_ping(self, make_engine):
+        """pessimisticはチェックアウトごとに確認、optimisticは確認しない"""
+        assert make_engine(pre_ping="pessimistic").pool._pre_ping
+        assert not make_engine(pre_ping="optimistic").pool._pre_ping
+        with pytest.raises(ValueError):
+            make_engine(pre_ping="sometimes")
+
+    def test_optimistic_invalidates_pool_on_disconnect(self, make_engine):
+        """切断エラーを検知したらプールを無効化して張り直す"""
+        from sqlalchemy import exc, text
+
+        from app.infrastructure.database.pool import pool_stats
+
+        engine = make_engine(pre_ping="optimistic")
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            first = connection.connection.dbapi_connection
+
+        # DBサーバー側で切断された状態を再現する
+        first.close()
+        with engine.connect() as connection:
+            with pytest.raises(exc.DBAPIError) as error:
+                connection.execute(text("SELECT 1"))
+        assert error.value.connection_invalidated
+
+        assert pool_stats(engine)["disconnects"] == 1
+        with engine.connect() as connection:
+            assert connection.connection.dbapi_connection is not first
+
+    def test_pessimistic_replaces_dead_connection_on_checkout(self, make_engine):
+        """pessimisticはチェックアウト時に切断済み接続を検知して張り直す"""
+        from sqlalchemy import text
+
+        engine = make_engine(pool_size=1, max_overflow=0, pre_ping="pessimistic")
+        with engine.connect() as connection:
+            first = connection.connection.dbapi_connection
+        first.close()
+
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+            assert connection.connection.dbapi_connection is not first
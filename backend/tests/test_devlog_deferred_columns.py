@@ -0,0 +1,136 @@
+"""
+DevLogEntryの遅延ロード列（embedding / detail）のテスト
+
+一覧系のクエリが1536次元のembeddingを取得しないことを保証する回帰テスト。
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+
+@pytest.fixture
+def captured_sql(sqlite_engine):
+    """実行されたSQL文を記録する"""
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(sqlite_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(sqlite_engine, "before_cursor_execute", capture)
+
+
+@pytest.fixture
+def owner(db_session):
+    """公開プロジェクトと埋め込み済み開発ログを持つユーザー"""
+    from app.infrastructure.database.models import DevLogEntry, Project, User
+
+    user = User(email="frank@example.com", display_name="Frank", username="frank")
+    db_session.add(user)
+    db_session.flush()
+    project = Project(user_id=user.id, title="MEX", is_public=True)
+    db_session.add(project)
+    db_session.flush()
+    for i in range(3):
+        db_session.add(
+            DevLogEntry(
+                project_id=project.id,
+                user_id=user.id,
+                entry_type="implementation",
+                summary=f"entry {i}",
+                detail="body",
+                embedding=[0.1] * 1536,
+            )
+        )
+    db_session.commit()
+    return {"user": user, "project": project}
+
+
+def _assert_no_embedding(statements: list[str]) -> None:
+    assert statements
+    for statement in statements:
+        assert "embedding" not in statement, statement
+
+
+class TestEmbeddingNeverSelected:
+    """一覧系エンドポイント・サービスはembeddingを取得しない"""
+
+    def test_devlog_service_list(self, owner, captured_sql):
+        """DevLogService.list_entries"""
+        from app.application.devlog_service import DevLogService
+
+        entries, total = DevLogService().list_entries(owner["user"].id, owner["project"].id)
+
+        assert total == 3
+        assert entries[0].detail == "body"
+        _assert_no_embedding(captured_sql)
+
+    def test_project_and_dashboard_services(self, owner, captured_sql):
+        """ProjectService.list_projects と DashboardService"""
+        from app.application.project_service import ProjectService
+        from app.application.usage_service import DashboardService
+
+        ProjectService().list_projects(owner["user"].id)
+        DashboardService().get_dashboard(owner["user"].id)
+
+        _assert_no_embedding(captured_sql)
+
+    def test_public_portfolio_endpoints(self, owner, captured_sql):
+        """公開ポートフォリオAPI"""
+        from app.main import app
+        from app.performance.response_cache import configure_response_cache
+
+        configure_response_cache()
+        client = TestClient(app)
+        assert client.get("/api/portfolio/frank").status_code == 200
+        assert client.get(f"/api/portfolio/frank/{owner['project'].id}").status_code == 200
+
+        _assert_no_embedding(captured_sql)
+
+
+class TestOptInLoading:
+    """明示的なロードオプション"""
+
+    def test_accessing_unloaded_embedding_raises(self, owner, db_session):
+        """with_embedding() なしでの参照は暗黙の遅延ロードではなく例外になる"""
+        from app.infrastructure.database.models import DevLogEntry
+
+        entry = db_session.query(DevLogEntry).first()
+        with pytest.raises(InvalidRequestError):
+            _ = entry.embedding
+
+    def test_with_embedding_loads_vector(self, owner, db_session):
+        """with_embedding() で同じSELECTにembeddingを含める"""
+        from app.infrastructure.database.models import DevLogEntry, with_embedding
+
+        entry = db_session.query(DevLogEntry).options(with_embedding()).first()
+        assert len(entry.embedding) == 1536
+
+    def test_similar_to_devlog_reads_stored_embedding(self, owner, db_session, monkeypatch):
+        """類似開発ログ検索は with_embedding() で保存済みのベクトルを読み、自身を除いて検索する"""
+        from unittest.mock import MagicMock
+
+        from app.domain.similarity.similarity_engine import SimilarityEngine
+        from app.infrastructure.database.models import DevLogEntry
+
+        entry = db_session.query(DevLogEntry).first()
+        engine = SimilarityEngine(embedding_service=MagicMock())
+        calls = []
+
+        def search(embedding, user_id, **kwargs):
+            calls.append((embedding, user_id, kwargs["exclude_devlog_id"]))
+            return []
+
+        monkeypatch.setattr(engine, "search_by_embedding", search)
+
+        assert engine.find_similar_to_devlog(entry.id, owner["user"].id) == []
+        [(embedding, user_id, excluded)] = calls
+        assert len(embedding) == 1536
+        assert embedding[0] == pytest.approx(0.1)
+        assert (user_id, excluded) == (owner["user"].id, entry.id)
+        # 他のユーザーの開発ログは参照できない
+        assert engine.find_similar_to_devlog(entry.id, "someone-else") == []
+        assert len(calls) == 1
@@ -0,0 +1,135 @@
+"""
+開発ログmetadataの生成列（notebook_id / source_url）と部分インデックスのテスト
+
+PostgreSQLでの実行計画テストは TEST_DATABASE_URL が設定されている場合のみ実行する。
+"""
+
+import os
+
+import pytest
+
+
+@pytest.fixture
+def project(db_session):
+    from app.infrastructure.database.models import Project, User
+
+    user = User(email="ada@example.com", display_name="Ada", username="ada")
+    db_session.add(user)
+    db_session.flush()
+    project = Project(user_id=user.id, title="p")
+    db_session.add(project)
+    db_session.commit()
+    return project
+
+
+class TestGeneratedColumns:
+    """生成列がmetadataに追従する"""
+
+    def test_columns_follow_metadata(self, project, db_session):
+        """作成・更新でnotebook_id/source_urlが再計算され、JSON nullはNULLになる"""
+        from app.infrastructure.database.models import DevLogEntry
+
+        entry = DevLogEntry(
+            project_id=project.id,
+            user_id=project.user_id,
+            entry_type="note",
+            summary="s",
+            metadata_={"notebook_id": "nb-1", "source_url": "https://example.com/a"},
+        )
+        db_session.add(entry)
+        db_session.commit()
+        assert (entry.notebook_id, entry.source_url) == ("nb-1", "https://example.com/a")
+
+        entry.metadata_ = {"notebook_id": None}
+        db_session.commit()
+        assert (entry.notebook_id, entry.source_url) == (None, None)
+
+    def test_notebook_filter_targets_partial_index(self, project, db_session):
+        """ノートブック判定はJSONパースではなく生成列を参照し、部分インデックスが作られる"""
+        from sqlalchemy import text
+
+        from app.application.user_stats import _notebook_filter
+
+        sql = " ".join(str(clause) for clause in _notebook_filter())
+        assert sql == "devlog_entries.notebook_id IS NOT NULL"
+
+        index_sql = db_session.execute(
+            text("SELECT sql FROM sqlite_master WHERE name = 'idx_devlog_entries_user_notebook'")
+        ).scalar_one()
+        assert "WHERE notebook_id IS NOT NULL" in index_sql
+
+
+@pytest.mark.skipif(not os.environ.get("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL is not set")
+class TestPostgresPlans:
+    """PostgreSQLの実行計画（GIN / 部分インデックス）"""
+
+    @pytest.fixture
+    def pg_session(self):
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import sessionmaker
+
+        from app.infrastructure.database.models import Base, DevLogEntry, Project, User
+
+        engine = create_engine(os.environ["TEST_DATABASE_URL"])
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        user = User(email="pg@example.com", display_name="PG")
+        session.add(user)
+        session.flush()
+        project = Project(user_id=user.id, title="p")
+        session.add(project)
+        session.flush()
+        session.add_all(
+            DevLogEntry(
+                project_id=project.id,
+                user_id=user.id,
+                entry_type="note",
+                summary="s",
+                metadata_={"notebook_id": f"nb-{i}"} if i % 50 == 0 else {},
+            )
+            for i in range(500)
+        )
+        session.commit()
+        session.execute(text("ANALYZE devlog_entries"))
+        # 少量データでも計画にインデックスが現れるよう逐次走査を抑止する
+        session.execute(text("SET enable_seqscan = off"))
+        try:
+            yield session, user.id
+        finally:
+            session.close()
+            Base.metadata.drop_all(engine)
+            engine.dispose()
+
+    def _plan(self, session, query) -> str:
+        from sqlalchemy import text
+
+        compiled = query.statement.compile(
+            dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True}
+        )
+        return "\n".join(row[0] for row in session.execute(text(f"EXPLAIN {compiled}")))
+
+    def test_notebook_count_uses_partial_index(self, pg_session):
+        """notebook_id IS NOT NULL の集計が部分インデックスを使う"""
+        from sqlalchemy import func
+
+        from app.application.user_stats import _notebook_filter
+        from app.infrastructure.database.models import DevLogEntry
+
+        session, user_id = pg_session
+        query = session.query(func.count(DevLogEntry.id)).filter(
+            DevLogEntry.user_id == user_id, *_notebook_filter()
+        )
+        assert "idx_devlog_entries_user_notebook" in self._plan(session, query)
+
+    def test_containment_uses_gin_index(self, pg_session):
+        """metadata @> の包含検索がGINインデックスを使う"""
+        from app.infrastructure.database.models import DevLogEntry
+
+        session, _ = pg_session
+        query = session.query(DevLogEntry.id).filter(
+            DevLogEntry.metadata_.contains({"notebook_id": "nb-0"})
+        )
+        assert "idx_devlog_entries_metadata_gin" in self._plan(session, query)
@@ -0,0 +1,150 @@
+"""
+エンタイトルメント（プラン・プロジェクト数）のキャッシュと上限の原子的チェックのテスト
+"""
+
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def user(db_session):
+    from app.infrastructure.database.models import User
+
+    user = User(email="alan@example.com", display_name="Alan")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def _count_statements(engine, fn):
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return result, statements
+
+
+class TestEntitlementCache:
+    """キャッシュのヒット・失効・破棄"""
+
+    def test_cached_resolution_skips_database(self, user, db_session, sqlite_engine):
+        """2回目以降はDBに問い合わせず、1回目も1クエリで済む"""
+        from app.application.entitlements import resolve_entitlement
+
+        user_id = user.id
+        first, statements = _count_statements(
+            sqlite_engine, lambda: resolve_entitlement(db_session, user_id)
+        )
+        assert len(statements) == 1
+        assert (first.plan, first.project_count) == ("free", 0)
+
+        second, statements = _count_statements(
+            sqlite_engine, lambda: resolve_entitlement(db_session, user_id)
+        )
+        assert statements == []
+        assert second == first
+
+    def test_ttl_expiry(self, monkeypatch):
+        """TTLを過ぎたエントリは返さない"""
+        from app.application import entitlements
+        from app.application.entitlements import Entitlement, EntitlementCache
+
+        now = [100.0]
+        monkeypatch.setattr(entitlements.time, "monotonic", lambda: now[0])
+        cache = EntitlementCache(ttl_seconds=5)
+        cache.set("u", Entitlement(plan="free", project_count=1))
+        assert cache.get("u") is not None
+        now[0] += 5
+        assert cache.get("u") is None
+
+    def test_project_writes_invalidate(self, user, db_session):
+        """プロジェクトの作成・削除でキャッシュが破棄される"""
+        from app.application.entitlements import get_entitlement_cache, resolve_entitlement
+        from app.application.project_service import ProjectCreate, ProjectService
+
+        resolve_entitlement(db_session, user.id)
+        project = ProjectService().create_project(user.id, ProjectCreate(title="p"))
+        assert get_entitlement_cache().get(user.id) is None
+        assert resolve_entitlement(db_session, user.id).project_count == 1
+
+        ProjectService().delete_project(user.id, project.id)
+        assert get_entitlement_cache().get(user.id) is None
+
+    @pytest.mark.asyncio
+    async def test_checkout_webhook_invalidates(self, user, db_session):
+        """Checkout完了でプランの変更が即座に反映される"""
+        from app.application.billing_service import BillingService
+        from app.application.entitlements import resolve_entitlement
+
+        assert resolve_entitlement(db_session, user.id).plan == "free"
+        await BillingService().handle_checkout_completed(
+            {"metadata": {"user_id": user.id}, "customer": "cus_1", "subscription": "sub_1"}
+        )
+        assert resolve_entitlement(db_session, user.id).plan == "pro"
+
+        await BillingService().handle_subscription_updated({"id": "sub_1", "status": "canceled"})
+        assert resolve_entitlement(db_session, user.id).plan == "free"
+
+
+class TestProjectSlotReservation:
+    """条件付きUPSERTによるプロジェクト数上限"""
+
+    def test_free_plan_stops_at_limit(self, user, db_session):
+        """Freeプランは上限で加算されず、Proプランは制限なし"""
+        from app.application.entitlements import FREE_PROJECT_LIMIT, reserve_project_slot
+        from app.infrastructure.database.models import UserStats
+
+        results = [reserve_project_slot(db_session, user.id) for _ in range(FREE_PROJECT_LIMIT + 1)]
+        assert results == [True] * FREE_PROJECT_LIMIT + [False]
+        assert db_session.get(UserStats, user.id).project_count == FREE_PROJECT_LIMIT
+
+        user.plan = "pro"
+        db_session.flush()
+        assert reserve_project_slot(db_session, user.id)
+
+    def test_conditional_upsert_is_single_statement(self):
+        """PostgreSQLでは判定と加算が ON CONFLICT ... WHERE の1文になる"""
+        from unittest.mock import MagicMock
+
+        from sqlalchemy.dialects import postgresql
+
+        from app.application.entitlements import reserve_project_slot
+
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        reserve_project_slot(db, "u")
+        [stmt] = [call.args[0] for call in db.execute.call_args_list]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (user_id) DO UPDATE" in sql
+        assert "WHERE user_stats.project_count <" in sql
+        assert "RETURNING" in sql
+
+    def test_create_project_api_rejects_over_limit(self, user, db_session):
+        """上限到達後の作成は403になり、プロジェクトは増えない"""
+        from fastapi.testclient import TestClient
+        from sqlalchemy import func
+
+        from app.application.entitlements import FREE_PROJECT_LIMIT
+        from app.auth.dependencies import CurrentUser, get_current_user_dependency
+        from app.infrastructure.database.models import Project
+        from app.main import app
+
+        app.dependency_overrides[get_current_user_dependency] = lambda: CurrentUser(user_id=user.id)
+        try:
+            client = TestClient(app)
+            codes = [
+                client.post("/api/projects", json={"title": f"p{i}"}).status_code
+                for i in range(FREE_PROJECT_LIMIT + 1)
+            ]
+        finally:
+            app.dependency_overrides.clear()
+
+        assert codes == [201] * FREE_PROJECT_LIMIT + [403]
+        count = db_session.query(func.count(Project.id)).filter_by(user_id=user.id).scalar()
+        assert count == FREE_PROJECT_LIMIT
@@ -0,0 +1,73 @@
+"""
+アプリ起動時のimportコストのテスト
+
+`python -X importtime -c "import app.main"` を別プロセスで実行し、
+累積import時間が予算内であること、重い依存とDBエンジンが起動時に作られないことを確認する。
+予算（既定950ms）は計測値（約740ms）に余裕を持たせつつ、遅延importをやめた時の
+約1070msは検出できる値にしている。IMPORT_TIME_BUDGET_MS で上書きできる（遅いCI向け）。
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 初回利用時・lifespanまで読み込まない依存
+_LAZY_MODULES = (
+    "sentry_sdk",
+    "stripe",
+    "openai",
+    "httpx",
+    "numpy",
+    "psycopg2",
+    "passlib",
+    "pgvector",
+)
+
+
+def _run(code: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        cwd=_BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        env={**os.environ, "SENTRY_DSN": ""},
+    )
+
+
+class TestImportTime:
+    """import app.main のコスト"""
+
+    def test_import_time_within_budget(self):
+        """app.main の累積import時間が予算内（負荷によるぶれを除くため3回の最小値）"""
+        budget_ms = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "950"))
+        samples = []
+        for _ in range(3):
+            result = _run("import app.main", "-X", "importtime")
+            assert result.returncode == 0, result.stderr
+
+            match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| app\.main$", result.stderr, re.M)
+            assert match, result.stderr[-2000:]
+            samples.append(int(match.group(1)) / 1000)
+            if samples[-1] < budget_ms:
+                break
+        cumulative_ms = min(samples)
+        assert cumulative_ms < budget_ms, f"import app.main took {cumulative_ms:.0f}ms"
+
+    def test_heavy_clients_are_not_built_on_import(self):
+        """SDK・DBドライバの読み込みとエンジン作成は初回利用まで遅らせる"""
+        code = (
+            "import sys, app.main\n"
+            "from app.infrastructure.database import session\n"
+            f"print([m for m in {_LAZY_MODULES!r} if m in sys.modules])\n"
+            "print(session._engine is None)\n"
+        )
+        result = _run(code)
+        assert result.returncode == 0, result.stderr
+        loaded, engine_deferred = result.stdout.strip().splitlines()
+        assert loaded == "[]"
+        assert engine_deferred == "True"
@@ -0,0 +1,166 @@
+"""
+OpenAI共有HTTP接続プールのテスト
+
+ローカルの偽OpenAIサーバーに対して、サービスを生成し直しても
+TCP接続が使い回されることを確認する。
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _FakeOpenAIServer:
+    """chat.completions / embeddings だけを返す偽サーバー（接続元ポートを記録）"""
+
+    def __init__(self):
+        self.client_ports: list[int] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server.client_ports.append(self.client_address[1])
+                if self.path.endswith("/embeddings"):
+                    body = {
+                        "object": "list",
+                        "data": [{"object": "embedding", "index": 0, "embedding": [0.1, 0.2]}],
+                        "model": "text-embedding-3-small",
+                        "usage": {"prompt_tokens": 1, "total_tokens": 1},
+                    }
+                else:
+                    body = {
+                        "id": "chatcmpl-test",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": "gpt-4o-mini",
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": "ok"},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                    }
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+@pytest.fixture
+def fake_openai():
+    with _FakeOpenAIServer() as server:
+        yield server
+
+
+@pytest.fixture
+async def pool(fake_openai):
+    """偽サーバーに向けた共有プール（テスト後に元に戻す）"""
+    from app.infrastructure.openai import OpenAIHTTPPool, configure_openai_pool
+
+    pool = configure_openai_pool(OpenAIHTTPPool(http2=False, base_url=fake_openai.base_url))
+    try:
+        yield pool
+    finally:
+        await pool.aclose()
+        configure_openai_pool(None)
+
+
+class TestOpenAIHTTPPool:
+    """共有HTTP接続プール"""
+
+    async def test_services_reuse_one_connection(self, pool, fake_openai, monkeypatch):
+        """for_plan・EmbeddingServiceを都度生成しても接続は1本だけ"""
+        from app.config import get_settings
+        from app.domain.embedding.embedding_service import EmbeddingService
+        from app.domain.llm.llm_service import LLMService
+
+        monkeypatch.setattr(get_settings(), "openai_api_key", "sk-test")
+
+        for plan in ("free", "pro", "free"):
+            assert await LLMService.for_plan(plan).generate_summary("hi") == "ok"
+        result = await EmbeddingService().embed_text("hello")
+
+        assert result.embedding == [0.1, 0.2]
+        assert len(fake_openai.client_ports) == 4
+        assert len(set(fake_openai.client_ports)) == 1
+        stats = pool.stats()
+        assert stats.requests == 4
+        assert stats.connections_opened == 1
+
+    async def test_services_share_http_client(self, pool):
+        """生成したAsyncOpenAIは同じhttpxクライアントを使う"""
+        from app.domain.embedding.embedding_service import EmbeddingService
+        from app.domain.llm.llm_service import LLMService
+
+        llm = LLMService(api_key="sk-test")
+        embedding = EmbeddingService(api_key="sk-test")
+
+        assert llm._client._client is pool.http_client()
+        assert embedding._client._client is pool.http_client()
+
+    async def test_close_reopens_on_next_use(self, pool, fake_openai):
+        """aclose後は新しいクライアント・接続で再開する"""
+        from app.domain.llm.llm_service import LLMService
+
+        await LLMService(api_key="sk-test").generate_summary("hi")
+        first = pool.http_client()
+        await pool.aclose()
+
+        assert first.is_closed
+        await LLMService(api_key="sk-test").generate_summary("hi")
+        assert pool.http_client() is not first
+        assert pool.stats().connections_opened == 2
+        assert len(set(fake_openai.client_ports)) == 2
+
+    def test_limits_from_settings(self, monkeypatch):
+        """接続数の上限は設定値から取る"""
+        from app.config import get_settings
+        from app.infrastructure.openai import client, configure_openai_pool, get_openai_pool
+
+        monkeypatch.setattr(get_settings(), "openai_max_connections", 7)
+        monkeypatch.setattr(get_settings(), "openai_max_keepalive_connections", 3)
+        monkeypatch.setattr(client, "_pool", None)
+        try:
+            stats = get_openai_pool().stats()
+        finally:
+            configure_openai_pool(None)
+
+        assert stats.max_connections == 7
+        assert stats.max_keepalive_connections == 3
+
+    def test_http2_falls_back_without_h2(self, monkeypatch):
+        """h2が無ければHTTP/1.1で動く"""
+        from app.infrastructure.openai import OpenAIHTTPPool, client
+
+        monkeypatch.setattr(client, "http2_available", lambda: False)
+
+        assert OpenAIHTTPPool(http2=True).http2 is False
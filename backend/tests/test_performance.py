@@ -47,6 +47,69 @@ class TestSimilaritySearchPerformance:
         assert result.avg_results_count == 10
 
 
+class TestVectorSearchBenchmark:
+    """ベクトル検索ベンチマークハーネスのテスト"""
+
+    def test_reports_percentiles_and_recall(self):
+        """パーセンタイルとrecall@kを報告する"""
+        from app.performance.search_benchmark import InMemoryVectorBackend, SearchBenchmark
+
+        result = SearchBenchmark().run(
+            InMemoryVectorBackend(dimensions=16), num_rows=200, num_queries=20, top_k=5
+        )
+
+        assert result.backend == "memory"
+        assert result.num_rows == 200
+        assert result.p50_ms <= result.p95_ms <= result.p99_ms
+        # 厳密探索同士の比較なのでrecallは1.0
+        assert result.recall_at_k == 1.0
+
+    def test_recall_detects_approximate_misses(self):
+        """検索結果が正解とずれるとrecallが下がる"""
+        from app.performance.search_benchmark import InMemoryVectorBackend, SearchBenchmark
+
+        class HalfWrongBackend(InMemoryVectorBackend):
+            def search(self, query, top_k):
+                exact = self.exact_search(query, top_k)
+                return exact[: top_k // 2] + ["missing"] * (top_k - top_k // 2)
+
+        result = SearchBenchmark().run(
+            HalfWrongBackend(dimensions=8), num_rows=50, num_queries=5, top_k=4
+        )
+        assert result.recall_at_k == 0.5
+
+    def test_teardown_runs_when_index_build_fails(self):
+        """索引作成で失敗しても投入済みデータを片付ける"""
+        from app.performance.search_benchmark import InMemoryVectorBackend, SearchBenchmark
+
+        torn_down = []
+
+        class FailingIndexBackend(InMemoryVectorBackend):
+            def build_index(self):
+                raise RuntimeError("index build failed")
+
+            def teardown(self):
+                torn_down.append(True)
+                super().teardown()
+
+        with pytest.raises(RuntimeError):
+            SearchBenchmark().run(FailingIndexBackend(dimensions=8), num_rows=10, num_queries=1)
+        assert torn_down == [True]
+
+    def test_result_is_json_serializable(self):
+        """結果をJSONに出力できる"""
+        import json
+        from dataclasses import asdict
+
+        from app.performance.search_benchmark import InMemoryVectorBackend, SearchBenchmark
+
+        result = SearchBenchmark().run(
+            InMemoryVectorBackend(dimensions=8), num_rows=20, num_queries=2, top_k=3
+        )
+        payload = json.loads(json.dumps(asdict(result)))
+        assert {"p50_ms", "p95_ms", "p99_ms", "recall_at_k", "index_build_time_ms"} <= set(payload)
+
+
 class TestLLMRateLimiting:
     """LLM APIレート制限のテスト"""
 
@@ -205,3 +268,83 @@ class TestPerformanceMetrics:
         assert "p50" in stats
         assert "p95" in stats
         assert "p99" in stats
+
+
+class TestMiddlewareBenchmark:
+    """ミドルウェアスタックベンチマークのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_compares_legacy_and_pure_asgi(self):
+        """旧実装と素のASGI実装の両方を計測できる"""
+        from app.performance.middleware_benchmark import run_middleware_benchmark
+
+        results = await run_middleware_benchmark(num_requests=20, concurrency=5)
+
+        assert [r.variant for r in results] == ["base_http_middleware", "pure_asgi"]
+        for result in results:
+            assert result.failed_requests == 0
+            assert result.requests_per_second > 0
+
+
+class TestLoadTestHarness:
+    """実アプリに対する負荷試験ハーネスのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_runs_portfolio_journey_against_app(self, db_session):
+        """インプロセスのアプリにジャーニーを投入しエンドポイント別に集計する"""
+        from app.main import app
+        from app.performance.concurrent_handler import (
+            ConcurrentRequestHandler,
+            portfolio_journey,
+        )
+
+        handler = ConcurrentRequestHandler()
+        result = await handler.run_load_test(
+            app=app,
+            arrival_rate=20.0,
+            duration_seconds=0.2,
+            journey=portfolio_journey(devlogs_per_journey=2, portfolio_reads=1),
+            seed=1,
+        )
+
+        assert result.journeys_started > 0
+        assert result.journeys_failed == 0
+        assert result.total_errors == 0
+        devlog_stats = result.endpoints["POST /api/devlogs/{project_id}/entries"]
+        assert devlog_stats.requests == 2 * result.journeys_started
+        assert "GET /api/portfolio/{username}" in result.endpoints
+        # レート制限の無効化は試験後に元に戻る
+        assert app.state.limiter.enabled is True
+
+    @pytest.mark.asyncio
+    async def test_counts_error_responses_per_endpoint(self):
+        """エラーレスポンスをエンドポイント別のエラー率に反映する"""
+        from fastapi import FastAPI
+
+        from app.performance.concurrent_handler import ConcurrentRequestHandler
+
+        app = FastAPI()
+
+        @app.get("/ok")
+        async def ok():
+            return {"ok": True}
+
+        async def journey(session):
+            await session.request("GET", "/ok", "GET /ok")
+            await session.request("GET", "/missing", "GET /missing")
+
+        result = await ConcurrentRequestHandler().run_load_test(
+            app=app, arrival_rate=50.0, duration_seconds=0.1, journey=journey, seed=1
+        )
+
+        assert result.journeys_failed == result.journeys_started
+        assert result.endpoints["GET /ok"].error_rate == 0.0
+        assert result.endpoints["GET /missing"].error_rate == 1.0
+
+    @pytest.mark.asyncio
+    async def test_requires_exactly_one_target(self):
+        """appとbase_urlはどちらか一方のみ指定する"""
+        from app.performance.concurrent_handler import ConcurrentRequestHandler
+
+        with pytest.raises(ValueError):
+            await ConcurrentRequestHandler().run_load_test()
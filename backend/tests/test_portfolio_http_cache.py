@@ -0,0 +1,180 @@
+"""
+公開ポートフォリオのHTTPキャッシュ（ETag / Last-Modified / Cache-Control）のテスト
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def portfolio(db_session):
+    """公開プロジェクトを1件持つユーザー"""
+    from app.infrastructure.database.models import DevLogEntry, Project, User
+
+    user = User(email="carol@example.com", display_name="Carol", username="carol")
+    db_session.add(user)
+    db_session.flush()
+    project = Project(user_id=user.id, title="MEX", is_public=True)
+    db_session.add(project)
+    db_session.flush()
+    entry = DevLogEntry(
+        project_id=project.id, user_id=user.id, entry_type="decision", summary="first"
+    )
+    db_session.add(entry)
+    db_session.commit()
+    return {"user": user, "project": project, "entry": entry}
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    return TestClient(app)
+
+
+class TestPortfolioConditionalGet:
+    """GET /api/portfolio/{username} の条件付きGET"""
+
+    def test_sets_cache_headers(self, portfolio, client):
+        """ETag・Last-Modified・Cache-Controlを返す"""
+        response = client.get("/api/portfolio/carol")
+
+        assert response.status_code == 200
+        assert response.headers["ETag"].startswith('W/"')
+        assert "Last-Modified" in response.headers
+        cache_control = response.headers["Cache-Control"]
+        assert cache_control.startswith("public, max-age=")
+        assert "stale-while-revalidate=" in cache_control
+
+    def test_returns_304_for_matching_etag(self, portfolio, client):
+        """If-None-Matchが一致すれば本文なしの304を返す"""
+        etag = client.get("/api/portfolio/carol").headers["ETag"]
+
+        response = client.get("/api/portfolio/carol", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+    def test_if_modified_since_ignored_after_unpublish(self, portfolio, client, db_session):
+        """非公開化ではLast-Modifiedが進まないため、If-Modified-Sinceだけでは304を返さない"""
+        last_modified = client.get("/api/portfolio/carol").headers["Last-Modified"]
+        portfolio["project"].is_public = False
+        db_session.commit()
+
+        response = client.get("/api/portfolio/carol", headers={"If-Modified-Since": last_modified})
+
+        assert response.status_code == 200
+        assert response.json()["projects"] == []
+
+    def test_etag_takes_precedence_over_if_modified_since(self, portfolio, client):
+        """If-None-Matchが不一致ならIf-Modified-Sinceに関わらず200"""
+        last_modified = client.get("/api/portfolio/carol").headers["Last-Modified"]
+
+        response = client.get(
+            "/api/portfolio/carol",
+            headers={"If-None-Match": 'W/"stale"', "If-Modified-Since": last_modified},
+        )
+
+        assert response.status_code == 200
+
+    def test_etag_changes_when_devlog_added(self, portfolio, client, db_session):
+        """開発ログの追加でETagが変わる"""
+        from app.infrastructure.database.models import DevLogEntry
+
+        etag = client.get("/api/portfolio/carol").headers["ETag"]
+        db_session.add(
+            DevLogEntry(
+                project_id=portfolio["project"].id,
+                user_id=portfolio["user"].id,
+                entry_type="learning",
+                summary="second",
+            )
+        )
+        db_session.commit()
+
+        response = client.get("/api/portfolio/carol", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_etag_changes_when_project_made_private(self, portfolio, client, db_session):
+        """非公開化（件数の変化）でETagが変わる"""
+        etag = client.get("/api/portfolio/carol").headers["ETag"]
+        portfolio["project"].is_public = False
+        db_session.commit()
+
+        response = client.get("/api/portfolio/carol", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["projects"] == []
+
+
+class TestProjectDetailConditionalGet:
+    """GET /api/portfolio/{username}/{project_id} の条件付きGET"""
+
+    def test_returns_304_for_matching_etag(self, portfolio, client):
+        """If-None-Matchが一致すれば304を返す"""
+        url = f"/api/portfolio/carol/{portfolio['project'].id}"
+        first = client.get(url)
+        assert first.json()["project"]["devlog_count"] == 1
+
+        response = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+
+        assert response.status_code == 304
+
+    def test_etag_changes_when_devlog_edited(self, portfolio, client, db_session):
+        """開発ログの編集（updated_at）でETagが変わる"""
+        url = f"/api/portfolio/carol/{portfolio['project'].id}"
+        etag = client.get(url).headers["ETag"]
+        portfolio["entry"].summary = "edited"
+        db_session.commit()
+
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["devlog"][0]["summary"] == "edited"
+
+
+class TestHttpCacheHelpers:
+    """http_cacheヘルパーのテスト"""
+
+    def test_weak_comparison_and_lists(self):
+        """弱い比較でカンマ区切りのETagリストと照合する"""
+        from starlette.requests import Request
+
+        from app.api.http_cache import compute_etag, is_not_modified
+
+        etag = compute_etag("a", 1)
+        strong = etag[2:]
+        request = Request(
+            {"type": "http", "headers": [(b"if-none-match", f'"x", {strong}'.encode())]}
+        )
+
+        assert is_not_modified(request, etag, None)
+
+    def test_if_modified_since_only_with_last_modified(self):
+        """If-Modified-Sinceはlast_modifiedを渡したときだけ判定に使う"""
+        from datetime import datetime, timezone
+
+        from starlette.requests import Request
+
+        from app.api.http_cache import compute_etag, is_not_modified
+
+        request = Request(
+            {
+                "type": "http",
+                "headers": [(b"if-modified-since", b"Wed, 01 Jan 2025 00:00:00 GMT")],
+            }
+        )
+        etag = compute_etag("a")
+
+        assert is_not_modified(request, etag, datetime(2024, 12, 31, tzinfo=timezone.utc))
+        assert not is_not_modified(request, etag)
+
+    def test_compute_etag_is_deterministic(self):
+        """同じ値からは同じETagを生成する"""
+        from app.api.http_cache import compute_etag
+
+        assert compute_etag("a", None, 1) == compute_etag("a", None, 1)
+        assert compute_etag("a", 1) != compute_etag("a", 2)
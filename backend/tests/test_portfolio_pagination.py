@@ -0,0 +1,122 @@
+"""
+公開プロジェクト詳細の列射影・カーソルページネーションのテスト
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def project_with_devlogs(db_session):
+    """作成日時の異なる開発ログを5件持つ公開プロジェクト"""
+    from app.infrastructure.database.models import DevLogEntry, Project, User
+
+    user = User(email="erin@example.com", display_name="Erin", username="erin")
+    db_session.add(user)
+    db_session.flush()
+    project = Project(user_id=user.id, title="MEX", is_public=True)
+    db_session.add(project)
+    db_session.flush()
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(5):
+        db_session.add(
+            DevLogEntry(
+                project_id=project.id,
+                user_id=user.id,
+                entry_type="implementation",
+                summary=f"entry {i}",
+                detail="x" * 2000,
+                created_at=base + timedelta(days=i),
+            )
+        )
+    db_session.commit()
+    return project
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+    from app.performance.response_cache import configure_response_cache
+
+    configure_response_cache()
+    return TestClient(app)
+
+
+class TestProjectDetailPagination:
+    """カーソルページネーション"""
+
+    def test_without_limit_returns_all(self, project_with_devlogs, client):
+        """limit未指定では従来どおり全件を返す"""
+        body = client.get(f"/api/portfolio/erin/{project_with_devlogs.id}").json()
+
+        assert [e["summary"] for e in body["devlog"]] == [f"entry {i}" for i in range(4, -1, -1)]
+        assert body["next_cursor"] is None
+        assert body["project"]["devlog_count"] == 5
+
+    def test_walks_pages_with_cursor(self, project_with_devlogs, client):
+        """next_cursorを辿ると重複・欠落なく全件を取得できる"""
+        url = f"/api/portfolio/erin/{project_with_devlogs.id}"
+        summaries: list[str] = []
+        cursor = None
+        for _ in range(5):
+            params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+            body = client.get(url, params=params).json()
+            summaries += [e["summary"] for e in body["devlog"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        assert summaries == [f"entry {i}" for i in range(4, -1, -1)]
+
+    def test_since_filter(self, project_with_devlogs, client):
+        """since以降に作成されたエントリのみ返す"""
+        body = client.get(
+            f"/api/portfolio/erin/{project_with_devlogs.id}",
+            params={"since": "2026-01-04T00:00:00+00:00"},
+        ).json()
+
+        assert [e["summary"] for e in body["devlog"]] == ["entry 4", "entry 3"]
+
+    def test_invalid_cursor_returns_400(self, project_with_devlogs, client):
+        """不正なカーソルは400"""
+        response = client.get(
+            f"/api/portfolio/erin/{project_with_devlogs.id}", params={"cursor": "!!!"}
+        )
+        assert response.status_code == 400
+
+
+class TestProjectDetailProjection:
+    """列射影"""
+
+    def test_never_selects_detail_or_embedding(self, project_with_devlogs, client, sqlite_engine):
+        """開発ログ一覧のSELECTにdetail・embeddingを含めない"""
+        from sqlalchemy import event
+
+        statements: list[str] = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(sqlite_engine, "before_cursor_execute", capture)
+        try:
+            client.get(f"/api/portfolio/erin/{project_with_devlogs.id}")
+        finally:
+            event.remove(sqlite_engine, "before_cursor_execute", capture)
+
+        devlog_selects = [s for s in statements if "devlog_entries.summary" in s]
+        assert devlog_selects
+        for statement in devlog_selects:
+            assert "devlog_entries.detail" not in statement
+            assert "devlog_entries.embedding" not in statement
+
+    def test_benchmark_reports_fewer_bytes(self, project_with_devlogs, db_session):
+        """ベンチマークで射影後の取得バイト数が減る"""
+        from app.performance.projection_benchmark import run_projection_benchmark
+
+        result = run_projection_benchmark(db_session, project_with_devlogs.id)
+
+        assert result.rows == 5
+        assert result.projected_bytes < result.full_row_bytes
+        assert result.reduction_ratio > 0.5
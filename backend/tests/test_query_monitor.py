@@ -0,0 +1,190 @@
+"""
+SQLクエリ監視のテスト
+
+リクエスト単位のクエリ計測・SQL正規化・N+1検出・クエリ予算を検証する。
+"""
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.performance.query_monitor import (
+    QueryBudgetExceededError,
+    QueryMonitorMiddleware,
+    assert_max_queries,
+    install_query_monitor,
+    normalize_sql,
+    query_budget,
+    query_scope,
+)
+
+
+@pytest.fixture(autouse=True)
+def monitor_installed():
+    install_query_monitor()
+
+
+class TestNormalizeSql:
+    """SQL正規化のテスト"""
+
+    def test_replaces_bind_params(self):
+        """バインド変数を?に置換する"""
+        assert normalize_sql("SELECT * FROM t WHERE id = %(id_1)s") == (
+            "SELECT * FROM t WHERE id = ?"
+        )
+        assert normalize_sql("SELECT * FROM t WHERE id = :id") == "SELECT * FROM t WHERE id = ?"
+
+    def test_replaces_literals(self):
+        """文字列・数値リテラルを?に置換する"""
+        assert normalize_sql("SELECT * FROM t WHERE a = 'x' AND b = 42") == (
+            "SELECT * FROM t WHERE a = ? AND b = ?"
+        )
+
+    def test_collapses_in_lists_and_whitespace(self):
+        """INリストと空白を畳み込む"""
+        assert normalize_sql("SELECT *\n  FROM t WHERE id IN (1, 2, 3)") == (
+            "SELECT * FROM t WHERE id IN (?)"
+        )
+
+    def test_keeps_postgres_casts(self):
+        """::型キャストは残す"""
+        assert normalize_sql("SELECT :v::vector") == "SELECT ?::vector"
+
+
+class TestQueryScope:
+    """クエリ計測スコープのテスト"""
+
+    def test_counts_statements(self, sqlite_engine):
+        """スコープ内のステートメント数を数える"""
+        with query_scope("test") as stats:
+            with sqlite_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+        assert stats.count == 2
+
+    def test_statements_outside_scope_not_counted(self, sqlite_engine):
+        """スコープ外のステートメントは記録しない"""
+        with query_scope() as stats:
+            pass
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert stats.count == 0
+
+    def test_detects_repeated_shapes(self, sqlite_engine, caplog):
+        """同一形状の繰り返しをN+1の疑いとしてログ出力する"""
+        threshold = get_settings().n_plus_one_threshold
+        with caplog.at_level(logging.WARNING, logger="app.performance.query_monitor"):
+            with query_scope("list") as stats:
+                with sqlite_engine.connect() as conn:
+                    for i in range(threshold):
+                        conn.execute(text("SELECT :i"), {"i": i})
+
+        assert stats.repeated_shapes(threshold) == {"SELECT ?": threshold}
+        assert "Possible N+1 query [list]" in caplog.text
+
+    def test_logs_slow_queries(self, sqlite_engine, caplog, monkeypatch):
+        """閾値以上のステートメントをスロークエリとしてログ出力する"""
+        monkeypatch.setattr(get_settings(), "slow_query_threshold_ms", 0.0)
+        with caplog.at_level(logging.WARNING, logger="app.performance.query_monitor"):
+            with query_scope() as stats:
+                with sqlite_engine.connect() as conn:
+                    conn.execute(text("SELECT 'secret'"))
+
+        assert len(stats.slow_queries) == 1
+        assert "Slow query" in caplog.text
+        assert "secret" not in caplog.text
+
+
+class TestQueryBudget:
+    """クエリ予算のテスト"""
+
+    def test_assert_max_queries_raises(self, sqlite_engine):
+        """予算超過でエラー"""
+        with pytest.raises(QueryBudgetExceededError):
+            with assert_max_queries(1):
+                with sqlite_engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                    conn.execute(text("SELECT 2"))
+
+    def test_route_budget_fails_in_strict_mode(self, sqlite_engine, monkeypatch):
+        """strictモードではルートの予算超過でリクエストが失敗する"""
+        monkeypatch.setattr(get_settings(), "query_budget_strict", True)
+
+        app = FastAPI()
+        app.add_middleware(QueryMonitorMiddleware)
+
+        @app.get("/items")
+        @query_budget(1)
+        def list_items():
+            with sqlite_engine.connect() as conn:
+                for i in range(3):
+                    conn.execute(text("SELECT :i"), {"i": i})
+            return {"ok": True}
+
+        client = TestClient(app)
+        with pytest.raises(QueryBudgetExceededError, match="GET /items"):
+            client.get("/items")
+
+    def test_route_within_budget_passes(self, sqlite_engine, monkeypatch):
+        """予算内であれば成功する"""
+        monkeypatch.setattr(get_settings(), "query_budget_strict", True)
+
+        app = FastAPI()
+        app.add_middleware(QueryMonitorMiddleware)
+
+        @app.get("/items")
+        @query_budget(2)
+        def list_items():
+            with sqlite_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return {"ok": True}
+
+        assert TestClient(app).get("/items").status_code == 200
+
+
+class TestPortfolioNPlusOne:
+    """既存エンドポイントのN+1検出"""
+
+    def test_public_portfolio_counts_devlogs_in_one_query(self, db_session, caplog, monkeypatch):
+        """
+        公開ポートフォリオの開発ログ件数はプロジェクト数に関わらず1クエリで数える
+
+        予算の判定はミドルウェアが行う（conftestでstrict有効）。予算を1減らすと失敗することで、
+        プロジェクト数がN+1の閾値以上でも宣言した予算ちょうどで収まっていることを確かめる。
+        """
+        from app.api.portfolio import PORTFOLIO_QUERY_BUDGET, get_public_portfolio
+        from app.infrastructure.database.models import DevLogEntry, Project, User
+        from app.main import app
+        from app.performance.response_cache import get_response_cache
+
+        user = User(email="a@example.com", display_name="A", username="alice")
+        db_session.add(user)
+        db_session.flush()
+        for i in range(get_settings().n_plus_one_threshold):
+            project = Project(user_id=user.id, title=f"p{i}", is_public=True)
+            db_session.add(project)
+            db_session.flush()
+            db_session.add(
+                DevLogEntry(user_id=user.id, project_id=project.id, entry_type="a", summary="s")
+            )
+        db_session.commit()
+        client = TestClient(app)
+
+        assert get_public_portfolio.__query_budget__ == PORTFOLIO_QUERY_BUDGET
+        with caplog.at_level(logging.WARNING, logger="app.performance.query_monitor"):
+            response = client.get("/api/portfolio/alice")
+
+        assert response.status_code == 200
+        projects = response.json()["projects"]
+        assert [p["devlog_count"] for p in projects] == [1] * len(projects)
+        assert "Possible N+1 query" not in caplog.text
+
+        # 2回目はレスポンスキャッシュで本文の組み立てを省くため、ユーザー単位で破棄してから計る
+        get_response_cache().invalidate_user(user.id)
+        monkeypatch.setattr(get_public_portfolio, "__query_budget__", PORTFOLIO_QUERY_BUDGET - 1)
+        with pytest.raises(QueryBudgetExceededError, match="/portfolio/{username}"):
+            client.get("/api/portfolio/alice")
@@ -0,0 +1,182 @@
+"""
+読み取りレプリカへのルーティング（ReadReplicaRouter・read_intent）のテスト
+
+プライマリとレプリカを別々のSQLiteにし、同じユーザーの表示名を変えておくことで
+どちらから読んだかを判別する。
+"""
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def replica_engine():
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+
+    from app.infrastructure.database.models import Base
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def user(db_session, replica_engine):
+    """プライマリとレプリカに同じIDで表示名の違うユーザーを作る"""
+    from sqlalchemy.orm import Session
+
+    from app.application.user_stats import rebuild_user_stats
+    from app.infrastructure.database.models import User
+
+    user = User(email="frank@example.com", display_name="Primary Frank", username="frank")
+    db_session.add(user)
+    db_session.commit()
+    # ダッシュボード初回表示時のuser_stats作成（書き込み）が起きないようにしておく
+    rebuild_user_stats(db_session, user.id)
+    db_session.commit()
+    with Session(replica_engine) as replica:
+        replica.add(
+            User(
+                id=user.id,
+                email=user.email,
+                display_name="Replica Frank",
+                username="frank",
+                plan="pro",
+            )
+        )
+        replica.commit()
+    return user
+
+
+@pytest.fixture
+def lag():
+    return {"seconds": 0.0}
+
+
+@pytest.fixture
+def router(replica_engine, lag):
+    from app.infrastructure.database.routing import ReadReplicaRouter
+    from app.infrastructure.database.session import configure_read_replica
+
+    def probe(engine):
+        if isinstance(lag["seconds"], Exception):
+            raise lag["seconds"]
+        return lag["seconds"]
+
+    router = ReadReplicaRouter(
+        replica_engine,
+        max_lag_seconds=5.0,
+        read_your_writes_seconds=10.0,
+        lag_check_interval_seconds=0,
+        lag_probe=probe,
+        clock=FakeClock(),
+    )
+    configure_read_replica(router)
+    yield router
+    configure_read_replica(None)
+
+
+@pytest.fixture
+def client(user):
+    from fastapi.testclient import TestClient
+
+    from app.auth.dependencies import _jwt_service
+    from app.main import app
+
+    token = _jwt_service.create_access_token({"sub": user.id, "plan": "pro"})
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+def _dashboard_name(client) -> str:
+    response = client.get("/api/dashboard")
+    assert response.status_code == 200
+    return response.json()["user"]["display_name"]
+
+
+class TestReadRouting:
+    """read_intent を付けたルートの振り分け"""
+
+    def test_read_routes_use_replica(self, client, router):
+        """ダッシュボード・公開ポートフォリオはレプリカから読む"""
+        assert _dashboard_name(client) == "Replica Frank"
+        response = client.get("/api/portfolio/frank")
+        assert response.json()["user"]["display_name"] == "Replica Frank"
+        assert router.stats().replica_reads == 2
+
+    def test_write_routes_use_primary(self, client, router, db_session, user):
+        """read_intentの無いルートはプライマリに書く"""
+        from app.infrastructure.database.models import Project
+
+        assert client.post("/api/projects", json={"title": "On primary"}).status_code == 201
+        assert db_session.query(Project).filter(Project.user_id == user.id).count() == 1
+        assert router.stats().replica_reads == 0
+
+    def test_read_your_writes_window(self, client, router):
+        """書き込んだユーザーはしばらくプライマリから読む"""
+        assert client.post("/api/projects", json={"title": "Fresh"}).status_code == 201
+        assert _dashboard_name(client) == "Primary Frank"
+        assert router.stats().sticky_primary_reads == 1
+
+        router._clock.now += 10.0
+        assert _dashboard_name(client) == "Replica Frank"
+
+    def test_lagging_or_unreachable_replica_falls_back(self, client, router, lag):
+        """遅延が上限を超える・確認できない場合はプライマリ"""
+        lag["seconds"] = 30.0
+        assert _dashboard_name(client) == "Primary Frank"
+        lag["seconds"] = RuntimeError("replica down")
+        assert _dashboard_name(client) == "Primary Frank"
+        lag["seconds"] = 1.0
+        assert _dashboard_name(client) == "Replica Frank"
+        stats = router.stats()
+        assert (stats.lagging_primary_reads, stats.replica_reads) == (2, 1)
+
+    def test_dashboard_on_replica_does_not_write(self, client, router, replica_engine, user):
+        """レプリカではuser_statsが無くても作成せず実件数を返す"""
+        from sqlalchemy.orm import Session
+
+        from app.infrastructure.database.models import UserStats
+
+        response = client.get("/api/dashboard")
+        assert response.json()["stats"]["total_projects"] == 0
+        with Session(replica_engine) as replica:
+            assert replica.get(UserStats, user.id) is None
+
+    def test_without_replica_everything_reads_primary(self, client):
+        """DATABASE_READ_URL 未設定なら全てプライマリ"""
+        assert _dashboard_name(client) == "Primary Frank"
+
+
+class TestReadReplicaRouter:
+    """遅延確認のキャッシュ"""
+
+    def test_lag_probe_is_cached(self, replica_engine):
+        """lag_check_interval_seconds の間は問い合わせ結果を使い回す"""
+        from app.infrastructure.database.routing import ReadReplicaRouter
+
+        clock = FakeClock()
+        calls = []
+        router = ReadReplicaRouter(
+            replica_engine,
+            lag_check_interval_seconds=1.0,
+            lag_probe=lambda engine: calls.append(1) or 0.5,
+            clock=clock,
+        )
+        assert router.engine_for_read(None) is replica_engine
+        assert router.engine_for_read(None) is replica_engine
+        assert len(calls) == 1
+        clock.now += 1.0
+        router.engine_for_read(None)
+        assert len(calls) == 2
+        assert router.stats().last_lag_seconds == 0.5
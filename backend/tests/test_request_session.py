@@ -0,0 +1,198 @@
+"""
+リクエスト内の共有セッション（RequestSessionMiddleware・open_session）のテスト
+
+1リクエストでプールから取り出す接続が1本以下であることを確認する。
+"""
+
+import pytest
+
+
+@pytest.fixture
+def user(db_session):
+    from app.infrastructure.database.models import User
+
+    user = User(email="dave@example.com", display_name="Dave", username="dave")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+@pytest.fixture
+def checkouts(sqlite_engine):
+    """プールからの接続取り出し回数"""
+    from sqlalchemy import event
+
+    counter = {"n": 0}
+
+    def on_checkout(*args):
+        counter["n"] += 1
+
+    event.listen(sqlite_engine, "checkout", on_checkout)
+    yield counter
+    event.remove(sqlite_engine, "checkout", on_checkout)
+
+
+@pytest.fixture
+def client(user):
+    from fastapi.testclient import TestClient
+
+    from app.auth.dependencies import _jwt_service
+    from app.main import app
+
+    token = _jwt_service.create_access_token({"sub": user.id, "plan": "free"})
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+class TestRequestSession:
+    """認証・プラン判定・サービス層で1本の接続を共有する"""
+
+    def test_create_project_uses_one_connection(self, client, user, db_session, checkouts):
+        """POST /projects（トークン確認・上限判定・作成）で取り出す接続は1本"""
+        from app.infrastructure.database.models import Project
+
+        response = client.post("/api/projects", json={"title": "Shared session"})
+        assert response.status_code == 201
+        assert checkouts["n"] == 1
+        assert db_session.query(Project).filter(Project.user_id == user.id).count() == 1
+
+    def test_read_endpoints_use_one_connection(self, client, checkouts):
+        """読み取りのみのエンドポイントも1本"""
+        assert client.get("/api/dashboard").status_code == 200
+        assert checkouts["n"] == 1
+        assert client.get("/api/projects").status_code == 200
+        assert checkouts["n"] == 2
+
+    def test_requests_without_db_open_no_connection(self, client, checkouts):
+        """DBを使わないリクエストでは接続を取り出さない"""
+        assert client.get("/api/health").status_code == 200
+        assert checkouts["n"] == 0
+
+    def test_failed_service_call_discards_uncommitted_changes(self, client, user, db_session):
+        """サービスが例外で抜けた時の未確定の変更は、同じリクエストの後続の処理に残らない"""
+        from app.infrastructure.database.models import UserStats
+
+        for title in ("one", "two"):
+            assert client.post("/api/projects", json={"title": title}).status_code == 201
+        assert client.post("/api/projects", json={"title": "three"}).status_code == 403
+
+        db_session.expire_all()
+        assert db_session.get(UserStats, user.id).project_count == 2
+
+
+class TestOpenSession:
+    """リクエスト外では独立したセッションを開く"""
+
+    def test_outside_request_returns_new_session(self, db_session):
+        """open_session() は呼び出しごとに新しいセッション"""
+        from sqlalchemy.orm import Session
+
+        from app.infrastructure.database.session import open_session
+
+        first, second = open_session(), open_session()
+        try:
+            assert isinstance(first, Session)
+            assert first is not second
+        finally:
+            first.close()
+            second.close()
+
+    @pytest.mark.asyncio
+    async def test_borrowed_session_close_keeps_connection(self, db_session, sqlite_engine):
+        """共有セッションの close() は未確定の変更を破棄するが接続は返さない"""
+        from app.infrastructure.database.models import User
+        from app.infrastructure.database.session import RequestSessionMiddleware, open_session
+
+        seen = {}
+
+        async def app(scope, receive, send):
+            db = open_session()
+            db.add(User(email="erin@example.com", display_name="Erin"))
+            db.flush()
+            db.close()
+            again = open_session()
+            seen["users"] = again.query(User).filter(User.email == "erin@example.com").count()
+            seen["same_connection"] = again.connection() is db.connection()
+            again.close()
+
+        await RequestSessionMiddleware(app)({"type": "http"}, None, None)
+        assert seen == {"users": 0, "same_connection": True}
+
+
+@pytest.fixture
+def outstanding(sqlite_engine):
+    """プールから取り出されたまま返っていない接続数"""
+    from sqlalchemy import event
+
+    counter = {"n": 0}
+
+    def on_checkout(*args):
+        counter["n"] += 1
+
+    def on_checkin(*args):
+        counter["n"] -= 1
+
+    event.listen(sqlite_engine, "checkout", on_checkout)
+    event.listen(sqlite_engine, "checkin", on_checkin)
+    yield counter
+    event.remove(sqlite_engine, "checkout", on_checkout)
+    event.remove(sqlite_engine, "checkin", on_checkin)
+
+
+class TestReleaseBeforeExternalCall:
+    """外部APIの応答待ちの間は接続をプールに返す"""
+
+    def test_checkout_session_holds_no_connection_during_stripe_call(
+        self, client, outstanding, monkeypatch
+    ):
+        """Checkout作成中、Stripe呼び出しの間はプールの接続を握らない"""
+        from types import SimpleNamespace
+
+        from app.api import billing
+        from app.application.billing_service import BillingService
+
+        seen = []
+
+        class FakeGateway:
+            async def call(self, func, **params):
+                seen.append(outstanding["n"])
+                return SimpleNamespace(url="https://checkout.stripe.test/c/cs_1")
+
+        monkeypatch.setattr(billing, "_service", BillingService(gateway=FakeGateway()))
+
+        response = client.post(
+            "/api/billing/checkout-session",
+            json={"success_url": "https://a.test/ok", "cancel_url": "https://a.test/ng"},
+        )
+
+        assert response.status_code == 200
+        assert seen == [0]
+        assert outstanding["n"] == 0
+
+    @pytest.mark.asyncio
+    async def test_session_reconnects_after_release(self, db_session):
+        """release() 後もセッションは使え、必要になった時に接続し直す"""
+        from app.infrastructure.database.models import User
+        from app.infrastructure.database.session import (
+            RequestSessionMiddleware,
+            open_session,
+            release_request_connection,
+        )
+
+        seen = {}
+
+        async def app(scope, receive, send):
+            db = open_session()
+            user = User(email="fay@example.com", display_name="Fay")
+            db.add(user)
+            seen["released_with_pending"] = release_request_connection()
+            db.commit()
+            seen["released"] = release_request_connection()
+            seen["email"] = user.email
+            db.close()
+
+        await RequestSessionMiddleware(app)({"type": "http"}, None, None)
+        assert seen == {
+            "released_with_pending": False,
+            "released": True,
+            "email": "fay@example.com",
+        }
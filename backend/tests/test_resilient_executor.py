@@ -0,0 +1,257 @@
+"""
+外部API呼び出しの実行器（試行ごとの期限・Retry-After・ヘッジ・リクエスト期限）のテスト
+"""
+
+import asyncio
+
+import pytest
+
+
+class _Retryable(Exception):
+    pass
+
+
+def _executor(policy=None, retry_after=None, sleeps=None, rand=lambda: 0.5):
+    from app.performance.resilient_executor import ResilientExecutor
+
+    async def record_sleep(seconds):
+        sleeps.append(seconds)
+
+    return ResilientExecutor(
+        policy,
+        classify=lambda exc: "retryable" if isinstance(exc, _Retryable) else None,
+        retry_after=retry_after or (lambda exc: None),
+        sleep=record_sleep if sleeps is not None else asyncio.sleep,
+        rand=rand,
+    )
+
+
+def _calls(*outcomes):
+    """呼び出しごとに結果を返す（例外はraise、"hang"は応答しない）"""
+    calls = []
+
+    async def call():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if outcome == "hang":
+            await asyncio.sleep(3600)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return call, calls
+
+
+class TestRetries:
+    """リトライとバックオフ"""
+
+    async def test_attempt_timeout_is_retried(self):
+        """応答しない試行は期限で打ち切って再試行する"""
+        from app.performance.resilient_executor import RetryPolicy
+
+        executor = _executor(RetryPolicy(attempt_timeout_seconds=0.05, backoff_base_seconds=0))
+        call, calls = _calls("hang", "ok")
+
+        assert await executor.run(call) == "ok"
+        stats = executor.metrics.stats()
+        assert len(calls) == 2
+        assert stats.attempts == 2
+        assert stats.failures == {"timeout": 1}
+        assert stats.retries == 1
+
+    async def test_last_timeout_raises_attempt_timeout(self):
+        """全試行が期限切れならAttemptTimeoutError（TimeoutError）"""
+        from app.performance.resilient_executor import AttemptTimeoutError, RetryPolicy
+
+        executor = _executor(RetryPolicy(max_attempts=2, attempt_timeout_seconds=0.02), sleeps=[])
+        call, _ = _calls("hang", "hang")
+
+        with pytest.raises(AttemptTimeoutError):
+            await executor.run(call)
+
+    async def test_jittered_exponential_backoff(self):
+        """Retry-Afterが無ければ上限付き指数バックオフ×ジッター"""
+        from app.performance.resilient_executor import RetryPolicy
+
+        sleeps = []
+        policy = RetryPolicy(max_attempts=4, backoff_base_seconds=1.0, backoff_max_seconds=3.0)
+        executor = _executor(policy, sleeps=sleeps)
+        call, _ = _calls(_Retryable(), _Retryable(), _Retryable(), "ok")
+
+        assert await executor.run(call) == "ok"
+        assert sleeps == [0.5, 1.0, 1.5]
+
+    async def test_retry_after_is_honored(self):
+        """サーバー指定の待ち時間があればそれに従う"""
+        sleeps = []
+        executor = _executor(retry_after=lambda exc: 2.5, sleeps=sleeps)
+        call, _ = _calls(_Retryable(), "ok")
+
+        assert await executor.run(call) == "ok"
+        assert sleeps == [2.5]
+
+    async def test_non_retryable_error_is_raised_immediately(self):
+        """リトライ対象外の例外はそのまま送出"""
+        executor = _executor(sleeps=[])
+        call, calls = _calls(ValueError("bad request"), "ok")
+
+        with pytest.raises(ValueError):
+            await executor.run(call)
+        assert len(calls) == 1
+
+
+class TestDeadline:
+    """リクエスト期限"""
+
+    async def test_gives_up_when_backoff_exceeds_deadline(self):
+        """待つと期限を超える場合は再試行しない"""
+        from app.performance.deadline import DeadlineExceededError, deadline_scope
+
+        sleeps = []
+        executor = _executor(retry_after=lambda exc: 5.0, sleeps=sleeps)
+        call, calls = _calls(_Retryable(), "ok")
+
+        with deadline_scope(0.5), pytest.raises(DeadlineExceededError):
+            await executor.run(call)
+        assert len(calls) == 1
+        assert sleeps == []
+        assert executor.metrics.stats().deadline_exceeded == 1
+
+    async def test_attempt_timeout_is_capped_by_deadline(self):
+        """試行の期限はリクエストの残り時間で短くなる"""
+        from app.performance.deadline import DeadlineExceededError, deadline_scope
+        from app.performance.resilient_executor import RetryPolicy
+
+        executor = _executor(RetryPolicy(attempt_timeout_seconds=60, backoff_base_seconds=0))
+        call, calls = _calls("hang", "hang", "hang")
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with deadline_scope(0.1), pytest.raises(DeadlineExceededError):
+            await executor.run(call)
+        assert loop.time() - start < 1
+        assert len(calls) == 1
+
+    def test_nested_scope_never_extends(self):
+        """内側のスコープで期限を延ばすことはできない"""
+        from app.performance.deadline import deadline_scope, remaining_seconds
+
+        assert remaining_seconds() is None
+        with deadline_scope(1.0):
+            with deadline_scope(60.0):
+                assert remaining_seconds() <= 1.0
+        assert remaining_seconds() is None
+
+    async def test_middleware_sets_deadline_per_request(self):
+        """ミドルウェアがHTTPリクエストごとに期限を設定する"""
+        from app.performance.deadline import RequestDeadlineMiddleware, remaining_seconds
+
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(remaining_seconds())
+
+        middleware = RequestDeadlineMiddleware(app, timeout_seconds=30)
+        await middleware({"type": "http"}, None, None)
+        await middleware({"type": "lifespan"}, None, None)
+
+        assert 29 < seen[0] <= 30
+        assert seen[1] is None
+
+
+class TestHedging:
+    """p95超過時のヘッジ"""
+
+    async def test_hedge_wins_when_primary_is_slow(self):
+        """p95を過ぎても応答が無ければ2本目を出し、先に返った方を使う"""
+        from app.performance.resilient_executor import RetryPolicy
+
+        executor = _executor(RetryPolicy(hedge=True, hedge_min_samples=5))
+        for _ in range(5):
+            executor.metrics.record_attempt(0.01, None)
+        call, calls = _calls("hang", "hedged")
+
+        assert await executor.run(call) == "hedged"
+        stats = executor.metrics.stats()
+        assert len(calls) == 2
+        assert stats.hedges == 1
+        assert stats.hedge_wins == 1
+
+    async def test_no_hedge_without_enough_samples(self):
+        """p95が信用できるだけのサンプルが無ければヘッジしない"""
+        from app.performance.resilient_executor import RetryPolicy
+
+        executor = _executor(RetryPolicy(hedge=True, hedge_min_samples=5))
+        executor.metrics.record_attempt(0.01, None)
+
+        assert executor.hedge_delay() is None
+        call, _ = _calls("ok")
+        assert await executor.run(call) == "ok"
+        assert executor.metrics.stats().hedges == 0
+
+
+class TestOpenAIResilience:
+    """OpenAI固有のリトライ判定"""
+
+    def _error(self, cls, status, headers=None):
+        import httpx
+
+        request = httpx.Request("POST", "https://api.openai.test/v1/embeddings")
+        response = httpx.Response(status, headers=headers or {}, request=request)
+        return cls(message="error", response=response, body=None)
+
+    def test_classify(self):
+        """429・5xx・接続エラーはリトライ、4xxはしない"""
+        import httpx
+        from openai import (
+            APIConnectionError,
+            BadRequestError,
+            InternalServerError,
+            RateLimitError,
+        )
+
+        from app.infrastructure.openai import classify_openai_error
+
+        request = httpx.Request("POST", "https://api.openai.test/v1/embeddings")
+        assert classify_openai_error(self._error(RateLimitError, 429)) == "rate_limited"
+        assert classify_openai_error(self._error(InternalServerError, 503)) == "server_error"
+        assert classify_openai_error(APIConnectionError(request=request)) == "connection"
+        assert classify_openai_error(self._error(BadRequestError, 400)) is None
+
+    def test_retry_after_headers(self):
+        """retry-after-ms・retry-after（秒）を読む"""
+        from openai import RateLimitError
+
+        from app.infrastructure.openai import openai_retry_after
+
+        ms = self._error(RateLimitError, 429, {"retry-after-ms": "1500"})
+        seconds = self._error(RateLimitError, 429, {"retry-after": "3"})
+        missing = self._error(RateLimitError, 429)
+
+        assert openai_retry_after(ms) == 1.5
+        assert openai_retry_after(seconds) == 3.0
+        assert openai_retry_after(missing) is None
+
+    async def test_embedding_timeout_raises_embedding_error(self, monkeypatch):
+        """埋め込み要求が期限内に返らなければEmbeddingError"""
+        from unittest.mock import AsyncMock, patch
+
+        from app.config import get_settings
+        from app.domain.embedding.embedding_service import (
+            EmbeddingConfig,
+            EmbeddingError,
+            EmbeddingService,
+        )
+
+        async def hang(**kwargs):
+            await asyncio.sleep(3600)
+
+        monkeypatch.setattr(get_settings(), "openai_embedding_timeout_seconds", 0.05)
+        with patch("app.domain.embedding.embedding_service.AsyncOpenAI") as mock:
+            client = AsyncMock()
+            client.embeddings.create = hang
+            mock.return_value = client
+            service = EmbeddingService(api_key="test-key", config=EmbeddingConfig(max_retries=1))
+
+            with pytest.raises(EmbeddingError):
+                await service.embed_text("テスト")
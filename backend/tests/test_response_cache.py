@@ -0,0 +1,176 @@
+"""
+公開ポートフォリオのレスポンスキャッシュのテスト
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.performance.response_cache import (
+    CachedResponse,
+    InMemoryLRUBackend,
+    ResponseCache,
+    configure_response_cache,
+)
+
+
+@pytest.fixture
+def response_cache():
+    """テストごとに空のキャッシュを構成する"""
+    cache = configure_response_cache(InMemoryLRUBackend(max_entries=16))
+    yield cache
+    configure_response_cache()
+
+
+class TestInMemoryLRUBackend:
+    """LRUバックエンドのテスト"""
+
+    def test_evicts_least_recently_used(self):
+        """上限を超えると最も古く使われたエントリを破棄する"""
+        backend = InMemoryLRUBackend(max_entries=2)
+        backend.set("a", CachedResponse("e", b"a"), ["t"])
+        backend.set("b", CachedResponse("e", b"b"), ["t"])
+        backend.get("a")
+        backend.set("c", CachedResponse("e", b"c"), ["t"])
+
+        assert backend.get("b") is None
+        assert backend.get("a") is not None
+        assert len(backend) == 2
+
+    def test_invalidate_tag(self):
+        """タグに属するエントリだけを破棄する"""
+        backend = InMemoryLRUBackend()
+        backend.set("a", CachedResponse("e", b"a"), ["user:1"])
+        backend.set("b", CachedResponse("e", b"b"), ["user:2"])
+
+        assert backend.invalidate_tag("user:1") == 1
+        assert backend.get("a") is None
+        assert backend.get("b") is not None
+
+
+class TestResponseCache:
+    """ETag検証とイベント連携のテスト"""
+
+    def test_ignores_entry_with_stale_etag(self):
+        """ETagが一致しないエントリは返さない"""
+        cache = ResponseCache()
+        cache.set("k", CachedResponse('W/"1"', b"{}"), "u1")
+
+        assert cache.get("k", 'W/"2"') is None
+        assert cache.get("k", 'W/"1"').body == b"{}"
+
+    def test_invalidated_by_portfolio_changed_event(self, response_cache):
+        """ポートフォリオ変更イベントでユーザーのエントリが破棄される"""
+        from app.application.cache_events import emit_portfolio_changed
+
+        response_cache.set("portfolio:dave", CachedResponse("e", b"{}"), "u1")
+        emit_portfolio_changed("u1", reason="test")
+
+        assert response_cache.get("portfolio:dave", "e") is None
+
+
+class TestPortfolioResponseCache:
+    """公開ポートフォリオAPIのキャッシュ"""
+
+    @pytest.fixture
+    def owner(self, db_session):
+        from app.infrastructure.database.models import User
+
+        user = User(email="dave@example.com", display_name="Dave", username="dave", plan="pro")
+        db_session.add(user)
+        db_session.commit()
+        return user
+
+    def test_second_request_served_from_cache(self, owner, response_cache, sqlite_engine):
+        """2回目は本文を組み立てずキャッシュ済みのbytesを返す"""
+        from sqlalchemy import event
+
+        from app.application.project_service import ProjectCreate, ProjectService
+        from app.main import app
+
+        for i in range(3):
+            ProjectService().create_project(owner.id, ProjectCreate(title=f"p{i}", is_public=True))
+        client = TestClient(app)
+
+        statements: list[str] = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(sqlite_engine, "before_cursor_execute", count)
+        try:
+            first = client.get("/api/portfolio/dave")
+            cold = len(statements)
+            second = client.get("/api/portfolio/dave")
+            warm = len(statements) - cold
+        finally:
+            event.remove(sqlite_engine, "before_cursor_execute", count)
+
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert response_cache.hits == 1
+        # ユーザー取得とバージョントークンの集約のみ
+        assert warm == 2
+        assert cold > warm
+
+    def test_devlog_write_is_visible_immediately(self, owner, response_cache):
+        """開発ログの書き込み直後の読み出しで古い内容を返さない"""
+        from app.application.devlog_service import DevLogCreate, DevLogService
+        from app.application.project_service import ProjectCreate, ProjectService
+        from app.main import app
+
+        project = ProjectService().create_project(
+            owner.id, ProjectCreate(title="p", is_public=True)
+        )
+        client = TestClient(app)
+        url = f"/api/portfolio/dave/{project.id}"
+        assert client.get(url).json()["devlog"] == []
+
+        DevLogService().create_entry(
+            owner.id, project.id, DevLogCreate(entry_type="decision", summary="new")
+        )
+
+        assert len(response_cache.backend) == 0
+        assert client.get(url).json()["devlog"][0]["summary"] == "new"
+
+    def test_only_first_page_is_cached(self, owner, response_cache):
+        """cursor・since付きのリクエストはキャッシュに載せない（匿名でキーを増やせない）"""
+        from app.application.project_service import ProjectCreate, ProjectService
+        from app.main import app
+
+        project = ProjectService().create_project(
+            owner.id, ProjectCreate(title="p", is_public=True)
+        )
+        client = TestClient(app)
+        url = f"/api/portfolio/dave/{project.id}"
+        for i in range(3):
+            assert (
+                client.get(url, params={"since": f"2020-01-0{i + 1}T00:00:00"}).status_code == 200
+            )
+        assert len(response_cache.backend) == 0
+
+        client.get(url)
+        client.get(url)
+        assert len(response_cache.backend) == 1
+        assert response_cache.hits == 1
+
+    def test_profile_update_invalidates(self, owner, response_cache):
+        """プロフィール更新でキャッシュが破棄される"""
+        from app.auth.dependencies import CurrentUser, get_current_user_dependency
+        from app.main import app
+
+        client = TestClient(app)
+        client.get("/api/portfolio/dave")
+        assert len(response_cache.backend) == 1
+
+        app.dependency_overrides[get_current_user_dependency] = lambda: CurrentUser(
+            user_id=owner.id
+        )
+        try:
+            response = client.put("/api/auth/profile", json={"bio": "hello"})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert len(response_cache.backend) == 0
+        assert client.get("/api/portfolio/dave").json()["user"]["bio"] == "hello"
@@ -0,0 +1,68 @@
+"""
+セキュリティヘッダーミドルウェアのテスト
+"""
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.security_headers import SecurityHeadersMiddleware
+
+
+def _build_app(**kwargs) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(SecurityHeadersMiddleware, **kwargs)
+
+    @app.get("/ok")
+    def ok():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a", b"b", b"c"]), media_type="text/plain")
+
+    return app
+
+
+class TestSecurityHeadersMiddleware:
+    """セキュリティヘッダー付与のテスト"""
+
+    def test_adds_security_headers(self):
+        """基本のセキュリティヘッダーを付与する"""
+        response = TestClient(_build_app(hsts=False)).get("/ok")
+
+        assert response.status_code == 200
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert response.headers["X-XSS-Protection"] == "1; mode=block"
+        assert response.headers["Referrer-Policy"] == "strict-origin-when-cross-origin"
+        assert "Strict-Transport-Security" not in response.headers
+
+    def test_adds_hsts_when_enabled(self):
+        """hsts=TrueでHSTSヘッダーを付与する"""
+        response = TestClient(_build_app(hsts=True)).get("/ok")
+        assert response.headers["Strict-Transport-Security"].startswith("max-age=")
+
+    def test_streaming_response_passes_through(self):
+        """StreamingResponseの本文をそのまま返しヘッダーも付与する"""
+        response = TestClient(_build_app(hsts=False)).get("/stream")
+
+        assert response.text == "abc"
+        assert response.headers["X-Frame-Options"] == "DENY"
+
+    def test_headers_on_error_responses(self):
+        """404レスポンスにも付与する"""
+        response = TestClient(_build_app(hsts=False)).get("/missing")
+
+        assert response.status_code == 404
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+
+    def test_main_app_uses_pure_asgi_middleware(self):
+        """アプリ本体がBaseHTTPMiddlewareを使っていない"""
+        from starlette.middleware.base import BaseHTTPMiddleware
+
+        from app.main import app
+
+        assert all(not issubclass(m.cls, BaseHTTPMiddleware) for m in app.user_middleware)
+        response = TestClient(app).get("/api/health")
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
@@ -94,3 +94,38 @@ class TestSimilarityEngineInit:
         engine = SimilarityEngine(config=config)
         assert engine.config.vector_weight == 0.5
         assert engine.config.default_limit == 20
+
+
+class TestSimilaritySearchQuery:
+    """検索SQL組み立てのテスト"""
+
+    @patch("app.domain.similarity.similarity_engine.EmbeddingService")
+    def test_uses_cast_for_vector_bind(self, mock_embedding):
+        """::vector ではなくCASTでバインド変数をvectorに変換する"""
+        sql, params = SimilarityEngine()._build_search_query([0.1, 0.2], "u1", 5, None, None)
+
+        assert "CAST(:query_embedding AS vector)" in sql
+        assert ":query_embedding::vector" not in sql
+        assert params["query_embedding"] == "[0.1,0.2]"
+        assert params["limit"] == 5
+
+    @patch("app.domain.similarity.similarity_engine.EmbeddingService")
+    def test_project_and_filters(self, mock_embedding):
+        """プロジェクト・エントリタイプで絞り込める"""
+        sql, params = SimilarityEngine()._build_search_query(
+            [0.1], "u1", 5, DevLogFilter(entry_types=["decision"]), "p1"
+        )
+
+        assert "project_id = :project_id" in sql
+        assert params["project_id"] == "p1"
+        assert params["entry_types"] == ["decision"]
+
+    @patch("app.domain.similarity.similarity_engine.EmbeddingService")
+    def test_excludes_source_devlog(self, mock_embedding):
+        """類似開発ログ検索では基準の開発ログ自身を除く"""
+        sql, params = SimilarityEngine()._build_search_query(
+            [0.1], "u1", 5, None, None, exclude_devlog_id="d1"
+        )
+
+        assert "id <> :exclude_devlog_id" in sql
+        assert params["exclude_devlog_id"] == "d1"
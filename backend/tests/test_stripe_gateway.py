@@ -0,0 +1,286 @@
+"""
+Stripe呼び出し（StripeGateway・サーキットブレーカー・BillingService）のテスト
+
+偽Stripeサーバーに遅延・障害を注入して検証する。
+"""
+
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def fake_stripe():
+    """stripe.api_base を向けた偽Stripeサーバー"""
+    import stripe
+
+    from app.infrastructure.stripe.gateway import configure_stripe_sdk
+    from app.performance.fake_stripe import FakeStripeServer
+
+    original = (stripe.api_key, stripe.api_base, stripe.default_http_client)
+    with FakeStripeServer() as server:
+        stripe.api_key = "sk_test_fake"
+        configure_stripe_sdk(timeout_seconds=5.0, api_base=server.base_url)
+        try:
+            yield server
+        finally:
+            stripe.api_key, stripe.api_base, stripe.default_http_client = original
+
+
+@pytest.fixture
+def user(db_session):
+    from app.infrastructure.database.models import User
+
+    user = User(email="carol@example.com", display_name="Carol")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def _service(gateway):
+    from app.application.billing_service import BillingService
+
+    service = BillingService(gateway=gateway)
+    # BillingService.__init__ が設定値のキーで上書きするため戻す
+    import stripe
+
+    stripe.api_key = "sk_test_fake"
+    return service
+
+
+class TestCircuitBreaker:
+    """開閉の遷移"""
+
+    def test_opens_after_threshold_and_half_opens_after_timeout(self):
+        """連続失敗でopen、待機後に1件だけ試行し、成功でclosed"""
+        from app.performance.circuit_breaker import CircuitBreaker
+
+        now = [0.0]
+        breaker = CircuitBreaker(
+            failure_threshold=2, reset_timeout_seconds=10, clock=lambda: now[0]
+        )
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+        now[0] = 10.0
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()  # 試行中は他を拒否
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.stats().opened == 1
+        assert breaker.stats().rejected == 2
+
+    def test_failed_trial_reopens(self):
+        """half_openでの試行が失敗したら再びopen"""
+        from app.performance.circuit_breaker import CircuitBreaker
+
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=5, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 5.0
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.stats().opened == 2
+
+    def test_abandoned_trial_expires(self):
+        """記録されずに残った試行枠は reset_timeout 後に放棄とみなす"""
+        from app.performance.circuit_breaker import CircuitBreaker
+
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=5, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 5.0
+        assert breaker.allow()
+        assert not breaker.allow()
+        now[0] = 10.0
+        assert breaker.allow()
+
+
+class TestStripeGateway:
+    """スレッドプール実行・タイムアウト・障害時の遮断"""
+
+    @pytest.mark.asyncio
+    async def test_cancelled_half_open_trial_releases_slot(self, fake_stripe):
+        """half_openの試行がキャンセルされても、次の呼び出しで再び試行できる"""
+        import stripe
+
+        from app.infrastructure.stripe.gateway import StripeGateway
+        from app.performance.circuit_breaker import CircuitBreaker
+
+        now = [0.0]
+        breaker = CircuitBreaker(
+            failure_threshold=1, reset_timeout_seconds=30, clock=lambda: now[0]
+        )
+        gateway = StripeGateway(max_workers=2, timeout_seconds=5.0, breaker=breaker)
+        create = stripe.billing_portal.Session.create
+        try:
+            breaker.record_failure()
+            now[0] = 30.0
+            assert breaker.state == "half_open"
+
+            fake_stripe.latency_seconds = 0.5
+            trial = asyncio.ensure_future(
+                gateway.call(create, customer="cus_1", return_url="https://a")
+            )
+            await asyncio.sleep(0.05)
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+
+            fake_stripe.latency_seconds = 0.0
+            session = await gateway.call(create, customer="cus_1", return_url="https://a")
+            assert session.url
+            assert breaker.state == "closed"
+        finally:
+            gateway.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_slow_stripe_does_not_block_event_loop(self, user, db_session, fake_stripe):
+        """遅いStripe呼び出しを並行して待つ間もイベントループは動き続ける"""
+        from app.infrastructure.stripe import StripeGateway
+
+        fake_stripe.latency_seconds = 0.2
+        gateway = StripeGateway(max_workers=4, timeout_seconds=5.0)
+        service = _service(gateway)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            urls = await asyncio.gather(
+                *(
+                    service.create_checkout_session(user.id, "https://a/ok", "https://a/ng")
+                    for _ in range(4)
+                )
+            )
+        finally:
+            task.cancel()
+            gateway.shutdown()
+
+        assert all(url.startswith("https://checkout.stripe.test/") for url in urls)
+        # 4件を並行に待つので約0.2秒、その間も約20回ティックする
+        assert ticks >= 10
+        assert len(fake_stripe.requests) == 4
+        path, params = fake_stripe.requests[0]
+        assert path == "/v1/checkout/sessions"
+        assert params["customer_email"] == ["carol@example.com"]
+
+    @pytest.mark.asyncio
+    async def test_db_session_closed_before_network_call(self, user, db_session, fake_stripe):
+        """Stripeへの通信はDBセッションを閉じた後に行う"""
+        from sqlalchemy.orm import Session
+
+        from app.infrastructure.stripe import StripeGateway
+
+        events: list[str] = []
+        original_close = Session.close
+
+        def close(self):
+            events.append("db_closed")
+            original_close(self)
+
+        fake_stripe.on_request = lambda path, params: events.append("stripe")
+        gateway = StripeGateway(max_workers=1)
+        service = _service(gateway)
+        Session.close = close
+        try:
+            await service.create_checkout_session(user.id, "https://a/ok", "https://a/ng")
+        finally:
+            Session.close = original_close
+            gateway.shutdown()
+        assert events == ["db_closed", "stripe"]
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_outages_open_circuit(self, fake_stripe):
+        """タイムアウト・5xxが続くとopenになり、以降はStripeに送らず拒否する"""
+        import stripe
+
+        from app.infrastructure.stripe import StripeGateway, StripeUnavailableError
+        from app.performance.circuit_breaker import CircuitBreaker
+
+        gateway = StripeGateway(
+            max_workers=2,
+            timeout_seconds=0.1,
+            breaker=CircuitBreaker(failure_threshold=2, reset_timeout_seconds=60),
+        )
+        create = stripe.billing_portal.Session.create
+        try:
+            fake_stripe.latency_seconds = 0.3
+            with pytest.raises(StripeUnavailableError, match="timed out"):
+                await gateway.call(create, customer="cus_1", return_url="https://a")
+
+            # SDKの自動リトライ（バックオフ付き）が期限に収まるよう延ばす
+            gateway.timeout_seconds = 10.0
+            fake_stripe.latency_seconds = 0.0
+            fake_stripe.fail_status = 500
+            with pytest.raises(StripeUnavailableError, match="failed"):
+                await gateway.call(create, customer="cus_1", return_url="https://a")
+
+            sent = len(fake_stripe.requests)
+            with pytest.raises(StripeUnavailableError, match="circuit open"):
+                await gateway.call(create, customer="cus_1", return_url="https://a")
+            assert len(fake_stripe.requests) == sent
+        finally:
+            gateway.shutdown()
+
+        stats = gateway.stats()
+        assert (stats.timeouts, stats.failures, stats.rejected) == (1, 2, 1)
+        assert stats.circuit_state == "open"
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_trip_circuit(self, fake_stripe):
+        """4xxはStripeの障害ではないので数えない"""
+        import stripe
+
+        from app.infrastructure.stripe import StripeGateway
+        from app.performance.circuit_breaker import CircuitBreaker
+
+        gateway = StripeGateway(breaker=CircuitBreaker(failure_threshold=1))
+        fake_stripe.fail_status = 400
+        try:
+            with pytest.raises(stripe.InvalidRequestError):
+                await gateway.call(
+                    stripe.billing_portal.Session.create, customer="cus_1", return_url="https://a"
+                )
+        finally:
+            gateway.shutdown()
+        assert gateway.stats().circuit_state == "closed"
+
+
+class TestBillingApi:
+    """Stripe障害時のAPI応答"""
+
+    def test_checkout_returns_503_when_stripe_unavailable(self, user, db_session, monkeypatch):
+        """サーキットopen中は503"""
+        from fastapi.testclient import TestClient
+
+        from app.api import billing
+        from app.auth.dependencies import CurrentUser, get_current_user_dependency
+        from app.infrastructure.stripe import StripeGateway
+        from app.main import app
+        from app.performance.circuit_breaker import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+        gateway = StripeGateway(max_workers=1, breaker=breaker)
+        monkeypatch.setattr(billing, "_service", _service(gateway))
+        app.dependency_overrides[get_current_user_dependency] = lambda: CurrentUser(user_id=user.id)
+        try:
+            response = TestClient(app).post(
+                "/api/billing/checkout-session",
+                json={"success_url": "https://a/ok", "cancel_url": "https://a/ng"},
+            )
+        finally:
+            app.dependency_overrides.clear()
+            gateway.shutdown()
+        assert response.status_code == 503
@@ -0,0 +1,79 @@
+"""
+技術タグ（technologies）による絞り込みのテスト
+"""
+
+import pytest
+
+
+@pytest.fixture
+def user(db_session):
+    from app.infrastructure.database.models import User
+
+    user = User(email="linus@example.com", display_name="Linus", username="linus", plan="pro")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+class TestTechnologyFilter:
+    """いずれかのタグを含む行への絞り込み"""
+
+    def test_list_projects_by_technology(self, user, db_session):
+        """指定タグのいずれかを含むプロジェクトだけを返す"""
+        from app.application.project_service import ProjectCreate, ProjectService
+
+        service = ProjectService()
+        service.create_project(user.id, ProjectCreate(title="api", technologies=["Python"]))
+        service.create_project(user.id, ProjectCreate(title="web", technologies=["React", "TS"]))
+        service.create_project(user.id, ProjectCreate(title="cli", technologies=["Go"]))
+
+        titles = {p.title for p in service.list_projects(user.id, technologies=["Python", "TS"])}
+        assert titles == {"api", "web"}
+        assert len(service.list_projects(user.id)) == 3
+
+    def test_list_devlogs_by_technology(self, user, db_session):
+        """総件数も同じ条件で数える"""
+        from app.application.devlog_service import DevLogCreate, DevLogService
+        from app.application.project_service import ProjectCreate, ProjectService
+
+        project = ProjectService().create_project(user.id, ProjectCreate(title="p"))
+        service = DevLogService()
+        for techs in (["Python"], ["Python", "SQL"], ["Rust"]):
+            service.create_entry(
+                user.id, project.id, DevLogCreate(entry_type="a", summary="s", technologies=techs)
+            )
+
+        entries, total = service.list_entries(user.id, project.id, limit=1, technologies=["Python"])
+        assert total == 2
+        assert len(entries) == 1
+        assert "Python" in entries[0].technologies
+
+    def test_postgres_filter_is_index_friendly(self):
+        """PostgreSQLではGIN（jsonb_path_ops）が使える @> のOR結合になる"""
+        from unittest.mock import MagicMock
+
+        from sqlalchemy.dialects import postgresql
+
+        from app.application.technologies import matches_any_technology
+        from app.infrastructure.database.models import Project
+
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        clause = matches_any_technology(db, Project.technologies, ["Python", "Go"])
+        sql = str(clause.compile(dialect=postgresql.dialect()))
+        assert sql.count("@>") == 2
+        assert "?|" not in sql
+
+    def test_similarity_filter_uses_containment(self):
+        """類似検索のタグ条件も ?| ではなく @> で組み立てる"""
+        from unittest.mock import MagicMock
+
+        from app.domain.similarity.similarity_engine import DevLogFilter, SimilarityEngine
+
+        engine = SimilarityEngine(embedding_service=MagicMock())
+        sql, params = engine._build_search_query(
+            [0.0], "u", 5, DevLogFilter(technologies=["React", "TS"]), None
+        )
+        assert "?|" not in sql
+        assert "technologies @> CAST(:technology_1 AS jsonb)" in sql
+        assert params["technology_0"] == '["React"]'
@@ -0,0 +1,142 @@
+"""
+ユーザー別の技術タグ集計（user_technology_stats）のテスト
+"""
+
+import pytest
+
+
+@pytest.fixture
+def user(db_session):
+    from app.infrastructure.database.models import User
+
+    user = User(email="margaret@example.com", display_name="Margaret", username="margaret")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def _stored(db_session, user_id):
+    from app.infrastructure.database.models import UserTechnologyStats
+
+    db_session.expire_all()
+    return {
+        row.technology: (row.entry_count, row.public_entry_count)
+        for row in db_session.query(UserTechnologyStats).filter_by(user_id=user_id)
+    }
+
+
+def _rebuilt(db_session, user_id):
+    from app.application.technology_stats import rebuild_technology_stats
+
+    rebuild_technology_stats(db_session, user_id)
+    db_session.commit()
+    return _stored(db_session, user_id)
+
+
+class TestIncrementalTechnologyStats:
+    """開発ログ・プロジェクトの書き込みに追従する差分更新"""
+
+    def test_devlog_writes_match_rebuild(self, user, db_session):
+        """作成・更新・削除の差分更新が再集計と一致し、0件のタグは消える"""
+        from app.application.devlog_service import DevLogCreate, DevLogService, DevLogUpdate
+        from app.application.project_service import ProjectCreate, ProjectService
+
+        project = ProjectService().create_project(user.id, ProjectCreate(title="p"))
+        devlogs = DevLogService()
+        e1 = devlogs.create_entry(
+            user.id,
+            project.id,
+            DevLogCreate(entry_type="a", summary="s", technologies=["Python", "Python", "SQL"]),
+        )
+        e2 = devlogs.create_entry(
+            user.id, project.id, DevLogCreate(entry_type="a", summary="s", technologies=["Go"])
+        )
+        assert _stored(db_session, user.id) == {"Python": (1, 0), "SQL": (1, 0), "Go": (1, 0)}
+
+        devlogs.update_entry(user.id, e1.id, DevLogUpdate(technologies=["Python", "Rust"]))
+        devlogs.delete_entry(user.id, e2.id)
+
+        stored = _stored(db_session, user.id)
+        assert stored == {"Python": (1, 0), "Rust": (1, 0)}
+        assert stored == _rebuilt(db_session, user.id)
+
+    def test_project_visibility_and_delete(self, user, db_session):
+        """公開設定の変更で公開件数が移り、プロジェクト削除で配下のタグが減る"""
+        from app.application.devlog_service import DevLogCreate, DevLogService
+        from app.application.project_service import ProjectCreate, ProjectService, ProjectUpdate
+
+        projects = ProjectService()
+        public = projects.create_project(user.id, ProjectCreate(title="pub", is_public=True))
+        private = projects.create_project(user.id, ProjectCreate(title="priv"))
+        for project in (public, private):
+            DevLogService().create_entry(
+                user.id,
+                project.id,
+                DevLogCreate(entry_type="a", summary="s", technologies=["TS"]),
+            )
+        assert _stored(db_session, user.id) == {"TS": (2, 1)}
+
+        projects.update_project(user.id, private.id, ProjectUpdate(is_public=True))
+        assert _stored(db_session, user.id) == {"TS": (2, 2)}
+
+        projects.delete_project(user.id, public.id)
+        stored = _stored(db_session, user.id)
+        assert stored == {"TS": (1, 1)}
+        assert stored == _rebuilt(db_session, user.id)
+
+
+class TestTopSkills:
+    """トップスキルの読み出し"""
+
+    def test_dashboard_and_portfolio_top_skills(self, user, db_session):
+        """ダッシュボードは全件、公開ポートフォリオは公開プロジェクト分のみで並べる"""
+        from fastapi.testclient import TestClient
+
+        from app.application.devlog_service import DevLogCreate, DevLogService
+        from app.application.project_service import ProjectCreate, ProjectService
+        from app.application.usage_service import DashboardService
+        from app.main import app
+
+        public = ProjectService().create_project(
+            user.id, ProjectCreate(title="pub", is_public=True)
+        )
+        private = ProjectService().create_project(user.id, ProjectCreate(title="priv"))
+        for project, techs in (
+            (public, ["Python"]),
+            (private, ["Go"]),
+            (private, ["Go", "Python"]),
+            (private, ["Go"]),
+        ):
+            DevLogService().create_entry(
+                user.id, project.id, DevLogCreate(entry_type="a", summary="s", technologies=techs)
+            )
+
+        skills = DashboardService().get_dashboard(user.id).top_skills
+        assert [(s.name, s.entry_count) for s in skills] == [("Go", 3), ("Python", 2)]
+        assert all(s.last_used_at is not None for s in skills)
+
+        body = TestClient(app).get("/api/portfolio/margaret").json()
+        assert body["top_skills"] == [{"name": "Python", "entry_count": 1}]
+
+    def test_dashboard_api_returns_top_skills(self, user, db_session):
+        """ダッシュボードAPIのレスポンスに含まれる"""
+        from fastapi.testclient import TestClient
+
+        from app.application.devlog_service import DevLogCreate, DevLogService
+        from app.application.project_service import ProjectCreate, ProjectService
+        from app.auth.dependencies import CurrentUser, get_current_user_dependency
+        from app.main import app
+
+        project = ProjectService().create_project(user.id, ProjectCreate(title="p"))
+        DevLogService().create_entry(
+            user.id, project.id, DevLogCreate(entry_type="a", summary="s", technologies=["Vue"])
+        )
+        app.dependency_overrides[get_current_user_dependency] = lambda: CurrentUser(user_id=user.id)
+        try:
+            response = TestClient(app).get("/api/dashboard")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        [skill] = response.json()["top_skills"]
+        assert (skill["name"], skill["entry_count"]) == ("Vue", 1)
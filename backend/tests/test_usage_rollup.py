@@ -0,0 +1,136 @@
+"""
+利用量の日次・月次集計（usage_rollup）と月間上限ガードのテスト
+"""
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+
+@pytest.fixture
+def user(db_session):
+    from app.infrastructure.database.models import User
+
+    user = User(email="edsger@example.com", display_name="Edsger")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def _row(user_id, action, tokens, created_at):
+    from app.infrastructure.database.models import generate_uuid
+
+    return {
+        "id": generate_uuid(),
+        "user_id": user_id,
+        "action": action,
+        "tokens_used": tokens,
+        "created_at": created_at,
+    }
+
+
+class TestUsageRollups:
+    """書き込み時の集計加算と月間利用量の読み出し"""
+
+    def test_rollups_follow_writes_per_month(self, user, db_session):
+        """月をまたぐログは別々の月次集計になり、日次集計はアクション別に分かれる"""
+        from app.application.usage_rollup import get_monthly_usage, write_usage_rows
+        from app.infrastructure.database.models import UsageDailyRollup
+
+        oct_31 = datetime(2026, 10, 31, 23, 59, tzinfo=timezone.utc)
+        nov_1 = datetime(2026, 11, 1, 0, 1, tzinfo=timezone.utc)
+        write_usage_rows(
+            db_session,
+            [
+                _row(user.id, "search", 100, oct_31),
+                _row(user.id, "search", 50, oct_31),
+                _row(user.id, "summary", 7, oct_31),
+            ],
+        )
+        write_usage_rows(db_session, [_row(user.id, "search", 30, nov_1)])
+        db_session.commit()
+
+        october = get_monthly_usage(db_session, user.id, date(2026, 10, 15))
+        assert (october.tokens_used, october.event_count) == (157, 3)
+        assert october.by_action == {"search": 150, "summary": 7}
+        assert get_monthly_usage(db_session, user.id, date(2026, 11, 1)).tokens_used == 30
+
+        daily = db_session.get(UsageDailyRollup, (user.id, date(2026, 10, 31), "search"))
+        assert (daily.tokens_used, daily.event_count) == (150, 2)
+
+    def test_log_usage_updates_current_month(self, user, db_session):
+        """log_usage（同期経路）でも今月の集計に加算される"""
+        from app.application.usage_rollup import get_monthly_usage
+        from app.application.usage_tracking import log_usage
+
+        log_usage(user.id, "search", tokens_used=42)
+        log_usage(user.id, "search", tokens_used=8)
+
+        db_session.expire_all()
+        usage = get_monthly_usage(db_session, user.id)
+        assert (usage.tokens_used, usage.event_count) == (50, 2)
+
+    def test_rebuild_matches_incremental(self, user, db_session):
+        """usage_logsからの再集計が差分加算と一致する"""
+        from app.application.usage_rollup import (
+            get_monthly_usage,
+            rebuild_usage_rollups,
+            write_usage_rows,
+        )
+
+        at = datetime(2026, 9, 3, 12, tzinfo=timezone.utc)
+        write_usage_rows(db_session, [_row(user.id, "a", 5, at), _row(user.id, "b", 6, at)])
+        db_session.commit()
+        before = get_monthly_usage(db_session, user.id, date(2026, 9, 1))
+
+        assert rebuild_usage_rollups(db_session, date(2026, 9, 20)) == 2
+        db_session.commit()
+        assert get_monthly_usage(db_session, user.id, date(2026, 9, 1)) == before
+
+    def test_partition_helpers(self, db_session):
+        """パーティション名の規則と、PostgreSQL以外での作成スキップ"""
+        from app.application.usage_rollup import ensure_usage_log_partitions, partition_name
+
+        assert partition_name(date(2026, 1, 1)) == "usage_logs_2026_01"
+        assert ensure_usage_log_partitions(db_session) == []
+
+    def test_partition_bounds_are_utc(self):
+        """境界はUTCオフセット付きのタイムスタンプで書く"""
+        from app.application.usage_rollup import partition_bound
+
+        assert partition_bound(date(2026, 12, 1)) == "2026-12-01 00:00:00+00"
+
+    def test_maintenance_skips_non_postgres(self, db_session):
+        """起動時の先行作成はPostgreSQL以外では何もしない"""
+        from app.application.usage_rollup import maintain_usage_log_partitions
+
+        assert maintain_usage_log_partitions(3) == []
+
+
+class TestMonthlyUsageGuard:
+    """プランガードでの月間上限チェック"""
+
+    @pytest.mark.asyncio
+    async def test_free_plan_blocked_at_limit(self, user, db_session):
+        """Freeプランは上限到達で429、Proプランは制限なし"""
+        from fastapi import HTTPException
+
+        from app.application.usage_tracking import log_usage
+        from app.auth.dependencies import CurrentUser
+        from app.auth.plan_guards import FREE_MONTHLY_TOKEN_LIMIT, check_monthly_usage_limit
+
+        current = CurrentUser(user_id=user.id)
+        assert await check_monthly_usage_limit(current, db_session) is current
+
+        log_usage(user.id, "search", tokens_used=FREE_MONTHLY_TOKEN_LIMIT)
+        db_session.expire_all()
+        with pytest.raises(HTTPException) as exc:
+            await check_monthly_usage_limit(current, db_session)
+        assert exc.value.status_code == 429
+
+        from app.application.entitlements import invalidate_entitlement
+
+        user.plan = "pro"
+        db_session.commit()
+        invalidate_entitlement(user.id)
+        assert await check_monthly_usage_limit(current, db_session) is current
@@ -0,0 +1,198 @@
+"""
+利用量ログのバッファ付き一括書き込み（UsageLogWriter）のテスト
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def user(db_session):
+    from app.infrastructure.database.models import User
+
+    user = User(email="barbara@example.com", display_name="Barbara")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def _usage_count(db_session) -> int:
+    from sqlalchemy import func
+
+    from app.infrastructure.database.models import UsageLog
+
+    db_session.expire_all()
+    return db_session.query(func.count(UsageLog.id)).scalar()
+
+
+class TestUsageLogWriter:
+    """バッチ化・フラッシュ・障害時の挙動"""
+
+    @pytest.mark.asyncio
+    async def test_flushes_in_batches_and_on_stop(self, user, db_session):
+        """batch_size件ごとにまとめて書き、停止時に残りを書き切る"""
+        from app.application.usage_tracking import UsageLogWriter
+
+        writer = UsageLogWriter(batch_size=3, flush_interval_ms=60_000)
+        await writer.start()
+        for _ in range(7):
+            assert writer.submit(user.id, "devlog_created")
+        await writer.stop()
+
+        stats = writer.stats()
+        assert (stats.enqueued, stats.written, stats.dropped) == (7, 7, 0)
+        assert stats.batches == 3
+        assert _usage_count(db_session) == 7
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_interval(self, user, db_session):
+        """batch_sizeに満たなくても flush_interval_ms で書き込む"""
+        from app.application.usage_tracking import UsageLogWriter
+
+        writer = UsageLogWriter(batch_size=100, flush_interval_ms=20)
+        await writer.start()
+        writer.submit(user.id, "search", tokens_used=12)
+        for _ in range(50):
+            if writer.stats().written:
+                break
+            await asyncio.sleep(0.02)
+        assert writer.stats().written == 1
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_drops_with_counters_when_db_down(self):
+        """DBに書けない場合は再試行後に破棄し、失敗回数と破棄件数を数える"""
+        from app.application.usage_tracking import UsageLogWriter
+
+        def broken_session():
+            raise ConnectionError("database is down")
+
+        writer = UsageLogWriter(
+            batch_size=2,
+            flush_interval_ms=10,
+            max_retries=2,
+            retry_backoff_ms=1,
+            session_factory=broken_session,
+        )
+        await writer.start()
+        writer.submit("u", "a")
+        writer.submit("u", "b")
+        await writer.stop()
+
+        stats = writer.stats()
+        assert stats.written == 0
+        assert stats.failed_flushes == 3
+        assert stats.dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_or_applies_back_pressure(self):
+        """キュー満杯時、submit()は破棄して数え、write()は空きを待つ"""
+        from app.application.usage_tracking import UsageLogWriter
+
+        release = threading.Event()
+
+        def stalled_session():
+            release.wait(5)
+            raise ConnectionError("stalled")
+
+        writer = UsageLogWriter(
+            batch_size=1,
+            flush_interval_ms=1,
+            max_queue_size=2,
+            max_retries=0,
+            session_factory=stalled_session,
+        )
+        await writer.start()
+        writer.submit("u", "first")
+        await asyncio.sleep(0.05)  # 1件目がフラッシュ中で止まる
+        assert writer.submit("u", "a")
+        assert writer.submit("u", "b")
+        assert not writer.submit("u", "c")
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(writer.write("u", "d"), 0.05)
+
+        release.set()
+        await writer.stop()
+        assert writer.stats().dropped == 4  # c と、DBエラーで破棄された first / a / b
+
+    def test_log_usage_without_writer_is_synchronous(self, user, db_session):
+        """ライター未起動時は1件ずつ同期で書き込む"""
+        from app.application.usage_tracking import log_usage
+
+        log_usage(user.id, "retrospective", tokens_used=5)
+        assert _usage_count(db_session) == 1
+
+    def test_failed_log_usage_keeps_request_changes(self, user, monkeypatch):
+        """同期書き込みが失敗しても、リクエストの共有セッションの未確定の変更は残る"""
+        from app.application import usage_tracking
+        from app.infrastructure.database import session as session_module
+        from app.infrastructure.database.models import Project
+
+        def fail(db, rows):
+            raise RuntimeError("usage insert failed")
+
+        monkeypatch.setattr(usage_tracking, "write_usage_rows", fail)
+        request_session = session_module.RequestSession()
+        token = session_module._request_session.set(request_session)
+        try:
+            db = session_module.open_session()
+            project = Project(user_id=user.id, title="pending")
+            db.add(project)
+
+            usage_tracking.log_usage(user.id, "search")
+
+            assert project in db.new
+            db.commit()
+            assert db.get(Project, project.id).title == "pending"
+        finally:
+            session_module._request_session.reset(token)
+            request_session.close()
+
+
+class TestLifespanAndMetrics:
+    """lifespanでの起動・停止と /api/metrics"""
+
+    def test_lifespan_runs_writer_and_exposes_metrics(self, user, db_session, monkeypatch):
+        """起動中はバッファ経由で書き、終了時にフラッシュ、カウンタは /api/metrics で見える"""
+        from fastapi.testclient import TestClient
+
+        from app.application.usage_tracking import get_usage_writer, log_usage
+        from app.main import app
+
+        writer = get_usage_writer()
+        monkeypatch.setattr(writer, "flush_interval_ms", 60_000)
+        with TestClient(app) as client:
+            assert writer.running
+            client.portal.call(lambda: log_usage(user.id, "search"))
+            metrics = client.get("/api/metrics").json()
+            assert metrics["usage_log_writer"]["enqueued"] >= 1
+
+        assert not writer.running
+        assert _usage_count(db_session) == 1
+
+    def test_metrics_token_required_when_configured(self, monkeypatch):
+        """METRICS_TOKEN設定時はBearerトークンが必要"""
+        from fastapi.testclient import TestClient
+
+        from app.config import get_settings
+        from app.main import app
+
+        monkeypatch.setattr(get_settings(), "metrics_token", "s3cret")
+        client = TestClient(app)
+        assert client.get("/api/metrics").status_code == 401
+        response = client.get("/api/metrics", headers={"Authorization": "Bearer s3cret"})
+        assert response.status_code == 200
+
+    def test_metrics_hidden_in_production_without_token(self, monkeypatch):
+        """本番でMETRICS_TOKEN未設定なら /api/metrics は404"""
+        from fastapi.testclient import TestClient
+
+        from app.config import get_settings
+        from app.main import app
+
+        monkeypatch.setattr(get_settings(), "metrics_token", "")
+        monkeypatch.setattr(get_settings(), "app_env", "production")
+        client = TestClient(app)
+        assert client.get("/api/metrics").status_code == 404
@@ -0,0 +1,160 @@
+"""
+ユーザー統計（user_stats）の差分更新・整合性チェック・ダッシュボード集約のテスト
+"""
+
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def user(db_session):
+    from app.infrastructure.database.models import User
+
+    user = User(email="grace@example.com", display_name="Grace", username="grace", plan="pro")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def _stored(db_session, user_id):
+    from app.application.user_stats import _snapshot
+    from app.infrastructure.database.models import UserStats
+
+    db_session.expire_all()
+    return _snapshot(db_session.get(UserStats, user_id))
+
+
+class TestIncrementalStats:
+    """書き込み時の差分更新"""
+
+    def test_tracks_project_and_devlog_writes(self, user, db_session):
+        """作成・更新・削除に追従し実件数と一致する"""
+        from app.application.devlog_service import DevLogCreate, DevLogService, DevLogUpdate
+        from app.application.project_service import ProjectCreate, ProjectService
+        from app.application.user_stats import compute_user_stats
+
+        projects = ProjectService()
+        devlogs = DevLogService()
+        p1 = projects.create_project(user.id, ProjectCreate(title="p1"))
+        p2 = projects.create_project(user.id, ProjectCreate(title="p2"))
+        e1 = devlogs.create_entry(
+            user.id, p1.id, DevLogCreate(entry_type="a", summary="s", metadata={"notebook_id": "n"})
+        )
+        devlogs.create_entry(user.id, p1.id, DevLogCreate(entry_type="a", summary="s"))
+        e3 = devlogs.create_entry(user.id, p2.id, DevLogCreate(entry_type="a", summary="s"))
+        devlogs.create_entry(
+            user.id, p2.id, DevLogCreate(entry_type="a", summary="s", metadata={"notebook_id": "m"})
+        )
+
+        devlogs.update_entry(user.id, e3.id, DevLogUpdate(metadata={"notebook_id": "x"}))
+        devlogs.update_entry(user.id, e1.id, DevLogUpdate(metadata={"notebook_id": None}))
+        stored = _stored(db_session, user.id)
+        assert (stored.project_count, stored.devlog_count, stored.notebook_count) == (2, 4, 2)
+
+        devlogs.delete_entry(user.id, e3.id)
+        projects.delete_project(user.id, p1.id)
+
+        stored = _stored(db_session, user.id)
+        assert stored == compute_user_stats(db_session, user.id)
+        assert (stored.project_count, stored.devlog_count, stored.notebook_count) == (1, 1, 1)
+
+
+class TestConsistencyChecker:
+    """整合性チェッカー"""
+
+    def test_detects_and_fixes_drift(self, user, db_session):
+        """ずれを検出し、fix=Trueで実件数に修復する"""
+        from app.application.project_service import ProjectCreate, ProjectService
+        from app.application.user_stats import apply_stats_delta, check_consistency
+
+        ProjectService().create_project(user.id, ProjectCreate(title="p"))
+        assert check_consistency(db_session) == []
+
+        apply_stats_delta(db_session, user.id, projects=5)
+        db_session.commit()
+
+        drifts = check_consistency(db_session, fix=True)
+        assert [d.user_id for d in drifts] == [user.id]
+        assert drifts[0].stored.project_count == 6
+        assert _stored(db_session, user.id).project_count == 1
+        assert check_consistency(db_session) == []
+
+    def test_rebuild_overwrites_existing_row(self, user, db_session):
+        """他のリクエストが先に行を作っていても一意制約違反にならず実件数で上書きする"""
+        from app.application.user_stats import apply_stats_delta, rebuild_user_stats
+
+        apply_stats_delta(db_session, user.id, projects=3)
+        db_session.commit()
+
+        rebuild_user_stats(db_session, user.id)
+        rebuild_user_stats(db_session, user.id)
+        db_session.commit()
+
+        assert _stored(db_session, user.id).project_count == 0
+
+    def test_user_without_row_is_consistent(self, user, db_session):
+        """書き込みの無いユーザー（行なし・実件数0）はずれとしない"""
+        from app.application.user_stats import check_consistency
+
+        assert check_consistency(db_session) == []
+
+
+class TestDashboardAggregate:
+    """ダッシュボードの1クエリ集約"""
+
+    def test_dashboard_is_single_statement(self, user, db_session, sqlite_engine):
+        """統計行があればダッシュボード本体は1文（＋技術タグ集計1文）で取得できる"""
+        from app.application.devlog_service import DevLogCreate, DevLogService
+        from app.application.project_service import ProjectCreate, ProjectService
+        from app.application.usage_service import DashboardService
+
+        for i in range(7):
+            project = ProjectService().create_project(user.id, ProjectCreate(title=f"p{i}"))
+        DevLogService().create_entry(
+            user.id,
+            project.id,
+            DevLogCreate(entry_type="a", summary="s", metadata={"notebook_id": "n"}),
+        )
+
+        statements: list[str] = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(sqlite_engine, "before_cursor_execute", capture)
+        try:
+            data = DashboardService().get_dashboard(user.id)
+        finally:
+            event.remove(sqlite_engine, "before_cursor_execute", capture)
+
+        assert len(statements) == 2
+        assert data.stats.total_projects == 7
+        assert data.stats.total_devlog_entries == 1
+        assert data.stats.total_notebooks == 1
+        assert data.stats.has_mcp_tokens is False
+        assert len(data.recent_projects) == DashboardService.RECENT_PROJECTS_LIMIT
+        assert data.recent_projects[0].title == "p6"
+        assert data.recent_projects[0].devlog_count == 1
+
+    def test_dashboard_without_stats_row(self, user, db_session):
+        """統計行の無いユーザーは実件数から作成して返す"""
+        from app.application.usage_service import DashboardService
+        from app.infrastructure.database.models import MCPToken, UserStats
+
+        db_session.add(MCPToken(user_id=user.id, token_hash="h"))
+        db_session.commit()
+
+        data = DashboardService().get_dashboard(user.id)
+
+        assert data.recent_projects == []
+        assert data.stats.total_projects == 0
+        assert data.stats.has_mcp_tokens is True
+        db_session.expire_all()
+        assert db_session.get(UserStats, user.id) is not None
+
+    def test_unknown_user_raises(self, db_session):
+        """存在しないユーザーはValueError"""
+        from app.application.usage_service import DashboardService
+
+        with pytest.raises(ValueError):
+            DashboardService().get_dashboard("missing")
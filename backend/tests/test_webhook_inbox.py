@@ -0,0 +1,220 @@
+"""
+Stripe Webhookの受信箱（WebhookInboxWorker）のテスト
+"""
+
+import json
+
+import pytest
+
+
+def _event(event_id: str, customer: str | None, created: int, type_: str = "test.event") -> bytes:
+    return json.dumps(
+        {
+            "id": event_id,
+            "type": type_,
+            "created": created,
+            "data": {"object": {"id": f"obj_{event_id}", "customer": customer}},
+        }
+    ).encode()
+
+
+def _statuses(db_session) -> dict[str, str]:
+    from app.infrastructure.database.models import StripeWebhookEvent
+
+    db_session.expire_all()
+    return {e.stripe_event_id: e.status for e in db_session.query(StripeWebhookEvent)}
+
+
+def _enqueue(db_session, *payloads: bytes) -> list[bool]:
+    from app.application.webhook_inbox import enqueue_event
+
+    inserted = [enqueue_event(db_session, payload) for payload in payloads]
+    db_session.commit()
+    return inserted
+
+
+class TestEnqueue:
+    """受信時の保存と重複排除"""
+
+    def test_duplicate_event_is_ignored(self, db_session):
+        """同じイベントIDは1件だけ保存される"""
+        from app.infrastructure.database.models import StripeWebhookEvent
+
+        assert _enqueue(db_session, _event("evt_1", "cus_a", 100)) == [True]
+        assert _enqueue(db_session, _event("evt_1", "cus_a", 100)) == [False]
+
+        event = db_session.query(StripeWebhookEvent).one()
+        assert (event.status, event.customer_id, event.attempts) == ("pending", "cus_a", 0)
+        assert event.payload["data"]["object"]["id"] == "obj_evt_1"
+
+
+class TestWorker:
+    """顧客ごとの順序・再試行・デッドレター"""
+
+    @pytest.mark.asyncio
+    async def test_processes_each_customer_in_created_order(self, db_session):
+        """同一顧客のイベントは作成日時順、先行が失敗中なら後続は待つ"""
+        from app.application.webhook_inbox import WebhookInboxWorker
+
+        handled: list[str] = []
+        failing = {"obj_evt_a1"}
+
+        async def handler(obj):
+            if obj["id"] in failing:
+                raise RuntimeError("stripe down")
+            handled.append(obj["id"])
+
+        _enqueue(
+            db_session,
+            _event("evt_a2", "cus_a", 200),
+            _event("evt_a1", "cus_a", 100),
+            _event("evt_b1", "cus_b", 150),
+        )
+        worker = WebhookInboxWorker(
+            handlers={"test.event": handler}, backoff_base_seconds=0, backoff_max_seconds=0
+        )
+
+        await worker.process_due()
+        # evt_a1 が失敗し再試行待ちの間、evt_a2 は取り出されない
+        assert handled == ["obj_evt_b1"]
+        assert _statuses(db_session) == {
+            "evt_a1": "pending",
+            "evt_a2": "pending",
+            "evt_b1": "processed",
+        }
+
+        failing.clear()
+        await worker.process_due()
+        await worker.process_due()
+        assert handled == ["obj_evt_b1", "obj_evt_a1", "obj_evt_a2"]
+        assert set(_statuses(db_session).values()) == {"processed"}
+        assert (worker.processed, worker.failed_attempts) == (3, 1)
+
+    @pytest.mark.asyncio
+    async def test_backoff_and_dead_letter(self, db_session):
+        """失敗ごとに待機時間が伸び、上限回数で dead になる"""
+        from datetime import timedelta
+
+        from app.application.webhook_inbox import WebhookInboxWorker
+        from app.infrastructure.database.models import StripeWebhookEvent, utc_now
+
+        async def handler(obj):
+            raise RuntimeError("boom")
+
+        _enqueue(db_session, _event("evt_1", "cus_a", 100))
+        worker = WebhookInboxWorker(handlers={"test.event": handler}, max_attempts=2)
+        assert [worker.backoff(n) for n in (1, 2, 3)] == [5.0, 10.0, 20.0]
+
+        assert await worker.process_due() == 1
+        # 再試行時刻まではスキップされる
+        assert await worker.process_due() == 0
+        db_session.query(StripeWebhookEvent).update(
+            {"next_attempt_at": utc_now() - timedelta(seconds=1)}
+        )
+        db_session.commit()
+        assert await worker.process_due() == 1
+
+        db_session.expire_all()
+        event = db_session.query(StripeWebhookEvent).one()
+        assert (event.status, event.attempts) == ("dead", 2)
+        assert "RuntimeError: boom" in event.last_error
+        stats = worker.stats()
+        assert (stats.pending, stats.dead, stats.failed_attempts) == (0, 1, 2)
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed(self, db_session):
+        """処理中のまま止まったイベントはリース切れ後に再取得される"""
+        from datetime import timedelta
+
+        from app.application.webhook_inbox import WebhookInboxWorker
+        from app.infrastructure.database.models import StripeWebhookEvent, utc_now
+
+        handled: list[str] = []
+
+        async def handler(obj):
+            handled.append(obj["id"])
+
+        _enqueue(db_session, _event("evt_1", "cus_a", 100))
+        db_session.query(StripeWebhookEvent).update(
+            {"status": "processing", "locked_until": utc_now() + timedelta(minutes=1)}
+        )
+        db_session.commit()
+
+        worker = WebhookInboxWorker(handlers={"test.event": handler})
+        assert await worker.process_due() == 0
+        db_session.query(StripeWebhookEvent).update(
+            {"locked_until": utc_now() - timedelta(seconds=1)}
+        )
+        db_session.commit()
+        assert await worker.process_due() == 1
+        assert handled == ["obj_evt_1"]
+        assert _statuses(db_session) == {"evt_1": "processed"}
+
+    @pytest.mark.asyncio
+    async def test_unknown_event_type_is_marked_processed(self, db_session):
+        """ハンドラーの無いイベント種別は処理済みにする"""
+        from app.application.webhook_inbox import WebhookInboxWorker
+
+        _enqueue(db_session, _event("evt_1", None, 100, type_="invoice.created"))
+        worker = WebhookInboxWorker(handlers={})
+        await worker.process_due()
+        assert _statuses(db_session) == {"evt_1": "processed"}
+        stats = worker.stats()
+        assert (stats.pending, stats.oldest_pending_age_seconds) == (0, 0.0)
+
+
+class TestWebhookEndpoint:
+    """受信エンドポイントは保存だけして応答する"""
+
+    def test_endpoint_enqueues_without_processing(self, db_session, monkeypatch):
+        """署名検証後に受信箱へ保存し、二重送信は duplicate を返す"""
+        import stripe
+        from fastapi.testclient import TestClient
+
+        from app.application.billing_service import BillingService
+        from app.main import app
+
+        monkeypatch.setattr(stripe.Webhook, "construct_event", lambda *args: None)
+
+        async def fail(*args):
+            raise AssertionError("handler must not run in the request")
+
+        monkeypatch.setattr(BillingService, "handle_subscription_updated", fail)
+        client = TestClient(app)
+        payload = _event("evt_1", "cus_a", 100, type_="customer.subscription.updated")
+
+        first = client.post("/api/billing/webhook", content=payload)
+        second = client.post("/api/billing/webhook", content=payload)
+        assert first.json() == {"status": "ok", "duplicate": False}
+        assert second.json() == {"status": "ok", "duplicate": True}
+        assert _statuses(db_session) == {"evt_1": "pending"}
+
+    def test_disabled_worker_is_not_notified(self, db_session, monkeypatch):
+        """ワーカー無効時は保存のみで、ワーカーを生成・起床しない"""
+        import stripe
+        from fastapi.testclient import TestClient
+
+        from app.application import webhook_inbox
+        from app.config import get_settings
+        from app.main import app
+
+        monkeypatch.setattr(stripe.Webhook, "construct_event", lambda *args: None)
+        monkeypatch.setattr(get_settings(), "stripe_webhook_worker_enabled", False)
+        monkeypatch.setattr(webhook_inbox, "_worker", None)
+
+        response = TestClient(app).post("/api/billing/webhook", content=_event("evt_2", "c", 1))
+
+        assert response.json() == {"status": "ok", "duplicate": False}
+        assert webhook_inbox._worker is None
+        assert _statuses(db_session) == {"evt_2": "pending"}
+
+    def test_invalid_payload_is_rejected(self, db_session, monkeypatch):
+        """イベントIDの無いペイロードは400"""
+        import stripe
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        monkeypatch.setattr(stripe.Webhook, "construct_event", lambda *args: None)
+        response = TestClient(app).post("/api/billing/webhook", content=b"{}")
+        assert response.status_code == 400
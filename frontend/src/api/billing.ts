@@ -7,6 +7,8 @@ export interface PlanInfo {
   plan: string;
   project_limit: number | null;
   project_count: number;
+  monthly_token_limit: number | null;
+  monthly_tokens_used: number;
   llm_model: string;
   subscription_status: string | null;
   current_period_end: string | null;
@@ -107,6 +107,12 @@ export interface MCPTokenListResponse {
 }
 
 // ダッシュボード
+export interface SkillCount {
+  name: string;
+  entry_count: number;
+  last_used_at: string | null;
+}
+
 export interface DashboardData {
   user: {
     display_name: string;
@@ -121,6 +127,7 @@ export interface DashboardData {
     has_mcp_tokens: boolean;
   };
   recent_projects: Project[];
+  top_skills: SkillCount[];
 }
 
 // 公開ポートフォリオ
@@ -131,6 +138,7 @@ export interface PublicPortfolio {
     github_url: string | null;
   };
   projects: Project[];
+  top_skills: SkillCount[];
 }
 
 export interface PublicProjectDetail {